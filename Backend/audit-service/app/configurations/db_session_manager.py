@@ -1,65 +1,190 @@
-# import contextlib
-# from typing import Any, AsyncIterator, Optional
-# from sqlalchemy.engine import URL
-# from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, async_sessionmaker, create_async_engine
-# from sqlalchemy.orm import declarative_base
-# from app.utils.logger import logging
-# from app.configurations.dbconfig import get_connection_url
-
-# BASE = declarative_base()
-# logger = logging.getLogger(__name__)
-
-# class DatabaseSessionManager:
-#     def __init__(self, host: str, **engine_kwargs):  # CHANGED: host should be string, not URL
-#         if engine_kwargs is None:
-#             engine_kwargs = {}
-#         # CHANGED: Use async engine with async driver
-#         self._engine = create_async_engine(host, **engine_kwargs)
-#         self._sessionmaker = async_sessionmaker(
-#             self._engine, 
-#             expire_on_commit=False,
-#             class_=AsyncSession
-#         )
-    
-#     async def close(self):
-#         if self._engine is None:
-#             raise Exception("DatabaseSessionManager is not initialized")
-#         await self._engine.dispose()
-#         self._engine = None
-#         self._sessionmaker = None
-    
-#     @contextlib.asynccontextmanager
-#     async def connect(self) -> AsyncIterator[AsyncConnection]:
-#         if self._engine is None:
-#             raise Exception("DatabaseSessionManager is not initialized")
-#         async with self._engine.begin() as connection:
-#             try:
-#                 yield connection
-#             except Exception as e:
-#                 await connection.rollback()
-#                 logger.error(f"Error during connection: {e}")
-#                 raise
-    
-#     @contextlib.asynccontextmanager
-#     async def session(self) -> AsyncIterator[AsyncSession]:
-#         if self._sessionmaker is None:
-#             raise Exception("DatabaseSessionManager is not initialized")
-#         session = self._sessionmaker()
-#         try:
-#             yield session
-#         except Exception as e:
-#             await session.rollback()
-#             logger.error(f"Error during session: {e}")
-#             raise
-#         finally:
-#             await session.close()
-
-# # Initialize the DatabaseSessionManager with the connection URL string
-# url = str(get_connection_url())  # CHANGED: Convert URL to string
-# logger.info(f"Database URL: {url}")
-# sessionmanager = DatabaseSessionManager(url)
-
-# # Dependency to get a session for async database operations
-# async def get_db_session() -> AsyncIterator[AsyncSession]:
-#     async with sessionmanager.session() as session:
-#         yield session
\ No newline at end of file
+import contextlib
+import threading
+import time
+from typing import AsyncIterator
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from app.configurations.dbconfig import get_postgres_async_engine, get_sqlserver_async_engine
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class PoolWaitStats:
+    """Counters describing how connections are handed out by one pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.connects = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_seconds += seconds
+            if seconds > self.max_wait_seconds:
+                self.max_wait_seconds = seconds
+
+    def record_connect(self):
+        with self._lock:
+            self.connects += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            avg_wait = self.total_wait_seconds / self.checkouts if self.checkouts else 0.0
+            return {
+                "checkouts": self.checkouts,
+                "new_connections": self.connects,
+                "avg_checkout_wait_ms": round(avg_wait * 1000, 3),
+                "max_checkout_wait_ms": round(self.max_wait_seconds * 1000, 3),
+            }
+
+
+class _TimedCheckoutMixin:
+    """Records the time spent waiting for (or opening) a connection on every checkout"""
+    wait_stats: PoolWaitStats = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            if self.wait_stats is not None:
+                self.wait_stats.record_wait(time.perf_counter() - started)
+
+    def recreate(self):
+        # engine.dispose() swaps in a recreated pool, keep counting into the same stats
+        pool = super().recreate()
+        pool.wait_stats = self.wait_stats
+        return pool
+
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+class DatabaseSessionManager:
+    """
+    Process-wide registry of the PostgreSQL and SQL Server engines and their session factories.
+    Engines are created once in the FastAPI lifespan and disposed on shutdown, so every request
+    reuses pooled connections instead of building a new pool (and resolving secrets) per call.
+    """
+
+    def __init__(self):
+        self._postgres_engine = None
+        self._postgres_sessionmaker = None
+        self._sqlserver_engine = None
+        self._sqlserver_sessionmaker = None
+        self._wait_stats = {"postgres": PoolWaitStats(), "sqlserver": PoolWaitStats()}
+
+    def init(self):
+        """Create both engines and session factories (idempotent)"""
+        if self._postgres_engine is not None:
+            return
+
+        self._postgres_engine = get_postgres_async_engine(poolclass=TimedAsyncAdaptedQueuePool)
+        self._attach_stats(self._postgres_engine.sync_engine, self._wait_stats["postgres"])
+        self._postgres_sessionmaker = async_sessionmaker(
+            self._postgres_engine,
+            class_=AsyncSession,
+            expire_on_commit=False
+        )
+
+        self._sqlserver_engine = get_sqlserver_async_engine(poolclass=TimedAsyncAdaptedQueuePool)
+        self._attach_stats(self._sqlserver_engine.sync_engine, self._wait_stats["sqlserver"])
+        self._sqlserver_sessionmaker = async_sessionmaker(
+            self._sqlserver_engine,
+            class_=AsyncSession,
+            expire_on_commit=False
+        )
+
+        logger.info("Database engines initialized")
+
+    async def close(self):
+        """Dispose both engines and close every pooled connection"""
+        if self._postgres_engine is not None:
+            await self._postgres_engine.dispose()
+        if self._sqlserver_engine is not None:
+            await self._sqlserver_engine.dispose()
+
+        self._postgres_engine = None
+        self._postgres_sessionmaker = None
+        self._sqlserver_engine = None
+        self._sqlserver_sessionmaker = None
+        logger.info("Database engines disposed")
+
+    @staticmethod
+    def _attach_stats(sync_engine, stats: PoolWaitStats):
+        sync_engine.pool.wait_stats = stats
+        event.listen(sync_engine, "connect", lambda dbapi_connection, connection_record: stats.record_connect())
+
+    @contextlib.asynccontextmanager
+    async def postgres_session(self) -> AsyncIterator[AsyncSession]:
+        if self._postgres_sessionmaker is None:
+            raise Exception("DatabaseSessionManager is not initialized")
+        async with self._postgres_sessionmaker() as session:
+            try:
+                yield session
+            finally:
+                await session.close()
+
+    @contextlib.asynccontextmanager
+    async def postgres_autocommit_connection(self) -> AsyncIterator[AsyncConnection]:
+        """Postgres connection outside a transaction block, for statements such as DETACH PARTITION CONCURRENTLY"""
+        if self._postgres_engine is None:
+            raise Exception("DatabaseSessionManager is not initialized")
+        async with self._postgres_engine.connect() as connection:
+            yield await connection.execution_options(isolation_level="AUTOCOMMIT")
+
+    @contextlib.asynccontextmanager
+    async def sqlserver_session(self) -> AsyncIterator[AsyncSession]:
+        if self._sqlserver_sessionmaker is None:
+            raise Exception("DatabaseSessionManager is not initialized")
+        async with self._sqlserver_sessionmaker() as session:
+            try:
+                yield session
+            finally:
+                await session.close()
+
+    def pool_stats(self) -> dict:
+        """Current pool occupancy plus checkout counters for each engine"""
+        stats = {}
+        engines = {
+            "postgres": self._postgres_engine.sync_engine if self._postgres_engine is not None else None,
+            "sqlserver": self._sqlserver_engine.sync_engine if self._sqlserver_engine is not None else None,
+        }
+        for name, engine in engines.items():
+            if engine is None:
+                stats[name] = {"initialized": False}
+                continue
+            pool = engine.pool
+            stats[name] = {
+                "initialized": True,
+                "pool_size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+                **self._wait_stats[name].snapshot(),
+            }
+        return stats
+
+
+# Global registry, initialized and disposed in the FastAPI lifespan (app/main.py)
+sessionmanager = DatabaseSessionManager()
+
+
+# PostgreSQL Dependency for FastAPI
+async def get_postgres_db() -> AsyncIterator[AsyncSession]:
+    """Dependency to get PostgreSQL database session from the shared pool"""
+    async with sessionmanager.postgres_session() as session:
+        yield session
+
+
+# SQL Server Dependency for FastAPI
+async def get_sqlserver_db() -> AsyncIterator[AsyncSession]:
+    """Dependency to get SQL Server database session (aioodbc) from the shared pool"""
+    async with sessionmanager.sqlserver_session() as session:
+        yield session
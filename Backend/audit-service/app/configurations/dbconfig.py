@@ -90,11 +90,10 @@
 # dbconfig.py - Fix BASE declarations
 import json
 import boto3
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
 from sqlalchemy import create_engine, URL
-from sqlalchemy.orm import sessionmaker as sync_sessionmaker
 
 from app.configurations.settings import Settings
 from app.utils.logger import logging
@@ -130,37 +129,30 @@ def get_postgres_connection_url():
     logger.info(f"construct url: {url}")
     return url
 
-def get_postgres_async_engine():
+def _pool_options(poolclass) -> dict:
+    """Pool sizing settings, NullPool (one connection per checkout) accepts none of them"""
+    if poolclass is NullPool:
+        return {"poolclass": poolclass}
+    return {
+        "pool_size": settings.pool_size,
+        "max_overflow": settings.pool_max_overflow,
+        "pool_recycle": settings.pool_recycle,
+        "pool_pre_ping": True,
+        "pool_timeout": settings.pool_timeout,
+        "poolclass": poolclass,
+    }
+
+def get_postgres_async_engine(poolclass=AsyncAdaptedQueuePool):
     """Create async engine for PostgreSQL"""
     url = get_postgres_connection_url()
     return create_async_engine(
         url,
-        pool_size=settings.pool_size,
-        max_overflow=settings.pool_max_overflow,
-        pool_recycle=settings.pool_recycle,
-        pool_pre_ping=True,
-        pool_timeout=settings.pool_timeout,
-        poolclass=AsyncAdaptedQueuePool,
+        **_pool_options(poolclass),
         echo=False,
         future=True
     )
 
-def get_postgres_async_session():
-    """Create async session factory for PostgreSQL"""
-    engine = get_postgres_async_engine()
-    return sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-
-# PostgreSQL Dependency for FastAPI
-async def get_postgres_db():
-    """Dependency to get PostgreSQL database session"""
-    async_session = get_postgres_async_session()
-    async with async_session() as session:
-        try:
-            yield session
-        finally:
-            await session.close()
-
-# ==================== SQL SERVER CONFIGURATION (SYNC - Since models are sync) ====================
+# ==================== SQL SERVER CONFIGURATION (ASYNC for the API, SYNC for table creation) ====================
 
 def get_sqlserver_connection_string():
     """Get SQL Server ODBC connection string"""
@@ -175,26 +167,36 @@ def get_sqlserver_connection_string():
     )
     return connection_string
 
-def get_sqlserver_sync_engine():
-    """Create sync engine for SQL Server (since company/store models are sync)"""
+def get_sqlserver_async_engine(poolclass=AsyncAdaptedQueuePool):
+    """Create async engine for SQL Server (aioodbc), so SQL Server round trips don't block the event loop"""
+    connection_string = get_sqlserver_connection_string()
+    url = URL.create(
+        "mssql+aioodbc", 
+        query={"odbc_connect": connection_string}
+    )
+    return create_async_engine(
+        url,
+        **_pool_options(poolclass),
+        echo=False,
+        future=True
+    )
+
+def get_sqlserver_sync_engine(poolclass=QueuePool):
+    """Create sync engine for SQL Server (used by base.py to create the tables)"""
     connection_string = get_sqlserver_connection_string()
     url = URL.create(
         "mssql+pyodbc", 
         query={"odbc_connect": connection_string}
     )
-    return create_engine(url)
-
-def get_sqlserver_sync_session():
-    """Create sync session factory for SQL Server"""
-    engine = get_sqlserver_sync_engine()
-    return sync_sessionmaker(engine, expire_on_commit=False)
-
-# SQL Server Dependency for FastAPI (sync)
-def get_sqlserver_db():
-    """Sync dependency for SQL Server"""
-    session_factory = get_sqlserver_sync_session()
-    session = session_factory()
-    try:
-        yield session
-    finally:
-        session.close()
\ No newline at end of file
+    return create_engine(
+        url,
+        pool_size=settings.pool_size,
+        max_overflow=settings.pool_max_overflow,
+        pool_recycle=settings.pool_recycle,
+        pool_pre_ping=True,
+        pool_timeout=settings.pool_timeout,
+        poolclass=poolclass
+    )
+
+# Session factories and FastAPI dependencies live in db_session_manager.py, which creates
+# each engine once per process instead of once per request.
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from pydantic import Field, ConfigDict
+from typing import Optional
 
 
 class Settings(BaseSettings):
@@ -47,4 +48,75 @@ class Settings(BaseSettings):
     health_check_login_service_session_validate_url: str = Field(..., alias="HEALTH_CHECK_LOGIN_SERVICE_SESSION_VALIDATE_URL")
     health_check_login_service_session_validate_url_expire_seconds: int = Field(..., alias="HEALTH_CHECK_LOGIN_SERVICE_SESSION_VALIDATE_URL_EXPIRE_SECONDS")
 
+    # Login service HTTP client (connection pool limits, keep-alive expiry in seconds, optional HTTP/2 - needs 'h2')
+    login_service_max_connections: int = Field(100, alias="LOGIN_SERVICE_MAX_CONNECTIONS")
+    login_service_max_keepalive_connections: int = Field(20, alias="LOGIN_SERVICE_MAX_KEEPALIVE_CONNECTIONS")
+    login_service_keepalive_expiry_seconds: float = Field(30, alias="LOGIN_SERVICE_KEEPALIVE_EXPIRY_SECONDS")
+    login_service_http2: bool = Field(False, alias="LOGIN_SERVICE_HTTP2")
+
+    # Validated token cache (seconds a validation is reused, 0 disables the cache; max cached tokens, LRU evicted)
+    token_cache_ttl_seconds: float = Field(5, alias="TOKEN_CACHE_TTL_SECONDS")
+    token_cache_max_entries: int = Field(10000, alias="TOKEN_CACHE_MAX_ENTRIES")
+
+    # Local JWT verification (same SECRET_KEY/ALGORITHM as the login service, skipped while SECRET_KEY is unset)
+    secret_key: Optional[str] = Field(None, alias="SECRET_KEY")
+    algorithm: str = Field("HS256", alias="ALGORITHM")
+    jwt_local_verification_enabled: bool = Field(True, alias="JWT_LOCAL_VERIFICATION_ENABLED")
+    # Remote session liveness check, false = stateless mode (signature and expiry only, needs SECRET_KEY)
+    session_remote_validation_enabled: bool = Field(True, alias="SESSION_REMOTE_VALIDATION_ENABLED")
+
+    # StoreName/CompanyName cache settings (refresh interval in seconds, max entries per dimension)
+    dimension_cache_refresh_seconds: int = Field(900, alias="DIMENSION_CACHE_REFRESH_SECONDS")
+    dimension_cache_max_entries: int = Field(100000, alias="DIMENSION_CACHE_MAX_ENTRIES")
+
+    # Functionality/EventType name -> ID cache settings (background refresh, minimum seconds between reloads on a miss)
+    lookup_cache_refresh_seconds: int = Field(300, alias="LOOKUP_CACHE_REFRESH_SECONDS")
+    lookup_cache_miss_reload_seconds: int = Field(10, alias="LOOKUP_CACHE_MISS_RELOAD_SECONDS")
+
+    # Write-behind ingestion for /audit-events/create (queue size in events, flush interval and drain timeout in seconds)
+    ingestion_write_behind_enabled: bool = Field(False, alias="INGESTION_WRITE_BEHIND_ENABLED")
+    ingestion_queue_max_size: int = Field(10000, alias="INGESTION_QUEUE_MAX_SIZE")
+    ingestion_batch_size: int = Field(500, alias="INGESTION_BATCH_SIZE")
+    ingestion_flush_interval_seconds: float = Field(0.5, alias="INGESTION_FLUSH_INTERVAL_SECONDS")
+    ingestion_drain_timeout_seconds: float = Field(30, alias="INGESTION_DRAIN_TIMEOUT_SECONDS")
+    # Failed write-behind flushes (attempts per batch, backoff in seconds, file for the events given up)
+    ingestion_max_attempts: int = Field(5, alias="INGESTION_MAX_ATTEMPTS")
+    ingestion_retry_backoff_seconds: float = Field(0.5, alias="INGESTION_RETRY_BACKOFF_SECONDS")
+    ingestion_retry_backoff_max_seconds: float = Field(30, alias="INGESTION_RETRY_BACKOFF_MAX_SECONDS")
+    ingestion_dead_letter_path: str = Field("ingestion_dead_letter.ndjson", alias="INGESTION_DEAD_LETTER_PATH")
+
+    # auditevents partition maintenance (months created ahead of the current month, seconds between runs)
+    partition_months_ahead: int = Field(5, alias="PARTITION_MONTHS_AHEAD")
+    partition_maintenance_interval_seconds: int = Field(21600, alias="PARTITION_MAINTENANCE_INTERVAL_SECONDS")
+
+    # Archival of aged events into AuditEvents_Archival (disabled by default, retention in whole months)
+    archival_enabled: bool = Field(False, alias="ARCHIVAL_ENABLED")
+    archival_retention_months: int = Field(12, alias="ARCHIVAL_RETENTION_MONTHS")
+    archival_batch_size: int = Field(5000, alias="ARCHIVAL_BATCH_SIZE")
+    archival_batch_pause_seconds: float = Field(0.5, alias="ARCHIVAL_BATCH_PAUSE_SECONDS")
+    archival_interval_seconds: int = Field(3600, alias="ARCHIVAL_INTERVAL_SECONDS")
+    archival_drop_empty_partitions: bool = Field(True, alias="ARCHIVAL_DROP_EMPTY_PARTITIONS")
+
+    # Search result cache (max cached searches, 0 disables; seconds to keep closed past ranges and open ranges)
+    search_cache_max_entries: int = Field(1000, alias="SEARCH_CACHE_MAX_ENTRIES")
+    search_cache_closed_ttl_seconds: float = Field(3600, alias="SEARCH_CACHE_CLOSED_TTL_SECONDS")
+    search_cache_open_ttl_seconds: float = Field(15, alias="SEARCH_CACHE_OPEN_TTL_SECONDS")
+    # Cross-process invalidation (LISTEN on auditevents_changed; seconds before reconnecting, between connection probes)
+    search_cache_listener_reconnect_seconds: float = Field(5, alias="SEARCH_CACHE_LISTENER_RECONNECT_SECONDS")
+    search_cache_listener_check_seconds: float = Field(30, alias="SEARCH_CACHE_LISTENER_CHECK_SECONDS")
+
+    # Live event stream (max connected SSE clients, frames buffered per client, seconds between heartbeats)
+    event_stream_max_subscribers: int = Field(200, alias="EVENT_STREAM_MAX_SUBSCRIBERS")
+    event_stream_client_queue_size: int = Field(1000, alias="EVENT_STREAM_CLIENT_QUEUE_SIZE")
+    event_stream_heartbeat_seconds: float = Field(15, alias="EVENT_STREAM_HEARTBEAT_SECONDS")
+    # Seconds a stream ticket (the ?ticket= the stream is opened with) can be used to connect
+    event_stream_ticket_ttl_seconds: float = Field(30, alias="EVENT_STREAM_TICKET_TTL_SECONDS")
+
+    # In-memory buffer behind /audit-events/recent (enabled, seconds between reloads from GetLatestAuditEvents())
+    recent_events_buffer_enabled: bool = Field(True, alias="RECENT_EVENTS_BUFFER_ENABLED")
+    recent_events_reload_seconds: int = Field(300, alias="RECENT_EVENTS_RELOAD_SECONDS")
+
+    # Exports (rows read, enriched and written per chunk; the Excel column widths are sized from the first chunk)
+    export_chunk_rows: int = Field(1000, alias="EXPORT_CHUNK_ROWS")
+
     model_config = ConfigDict(env_file=".env", case_sensitive=True)
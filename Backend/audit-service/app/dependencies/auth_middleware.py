@@ -1,49 +1,202 @@
 from fastapi import Request
 from fastapi.responses import JSONResponse
-import requests
+import asyncio
+import hashlib
+import secrets
+import time
+import httpx
+from jose import JWTError, jwt
+from typing import Optional
 from app.configurations.settings import Settings
 from app.utils.logger import get_logger
-from app.dependencies.paths import JWT_PATHS, EXCLUDE_PATHS
+from app.utils.token_cache import TokenCache, hash_token
+from app.dependencies.paths import JWT_PATHS, EXCLUDE_PATHS, STREAM_TICKET_PATHS
 
 logger = get_logger(__name__)
 settings = Settings()
 
+# Audience of the stream tickets, a ticket opens the event stream and nothing else
+STREAM_TICKET_AUDIENCE = "audit-event-stream"
+
 
 class AuthMiddleware:
     def __init__(self):
         logger.info("Auth Middleware initialized")
         self.validate_url = settings.health_check_login_service_session_validate_url
+        # Shared keep-alive client for the login service, opened/closed in the FastAPI lifespan
+        self.http_client: Optional[httpx.AsyncClient] = None
+        # Recently validated tokens, a repeated token skips the login service round trip
+        self.token_cache = TokenCache(
+            ttl_seconds=settings.token_cache_ttl_seconds,
+            max_entries=settings.token_cache_max_entries
+        )
+        # Validations in flight, parallel requests with the same token share one login service call
+        self._pending: dict = {}
+        # Signature/expiry check in-process, a bad or expired token never reaches the login service
+        self.local_verification = bool(settings.secret_key) and settings.jwt_local_verification_enabled
+        self.remote_validation = settings.session_remote_validation_enabled
+        if not self.remote_validation and not self.local_verification:
+            logger.warning("Stateless mode needs local JWT verification (SECRET_KEY), keeping the login service check")
+            self.remote_validation = True
+        # metrics
+        self.local_rejections = 0
+        self.remote_validations = 0
+        self.stream_tickets_issued = 0
+        self.stream_tickets_rejected = 0
+        # Stream tickets are signed with a key derived from SECRET_KEY, so a ticket is never a valid session token.
+        # Without SECRET_KEY the key is random per process and a ticket only opens the stream on the issuing worker.
+        if settings.secret_key:
+            self.stream_ticket_key = hashlib.sha256(f"{settings.secret_key}:{STREAM_TICKET_AUDIENCE}".encode("utf-8")).hexdigest()
+        else:
+            self.stream_ticket_key = secrets.token_hex(32)
         # Define JWT protected paths here
         self.jwt_paths = JWT_PATHS
     
+    async def start(self):
+        """Create the pooled HTTP client used for session validation"""
+        if self.http_client is not None:
+            return
+        limits = httpx.Limits(
+            max_connections=settings.login_service_max_connections,
+            max_keepalive_connections=settings.login_service_max_keepalive_connections,
+            keepalive_expiry=settings.login_service_keepalive_expiry_seconds
+        )
+        timeout = httpx.Timeout(settings.health_check_login_service_session_validate_url_expire_seconds)
+        try:
+            self.http_client = httpx.AsyncClient(limits=limits, timeout=timeout, http2=settings.login_service_http2)
+        except ImportError:
+            # http2=True needs the optional 'h2' package, fall back to HTTP/1.1 keep-alive
+            logger.warning("HTTP/2 requested for the login service but 'h2' is not installed, using HTTP/1.1")
+            self.http_client = httpx.AsyncClient(limits=limits, timeout=timeout)
+        logger.info(f"Login service HTTP client started (max connections {settings.login_service_max_connections}, "
+                    f"http2={settings.login_service_http2})")
+
+    async def close(self):
+        """Close the pooled HTTP client and its keep-alive connections"""
+        if self.http_client is not None:
+            await self.http_client.aclose()
+            self.http_client = None
+            logger.info("Login service HTTP client closed")
+
     async def validate_token(self, token: str) -> dict:
+        """Validate JWT token, from the token cache or by calling login service session validation"""
+        user_data = self.token_cache.get(token)
+        if user_data is not None:
+            return user_data
+
+        payload = None
+        if self.local_verification:
+            payload = self.decode_token(token)
+            if payload is None:
+                self.local_rejections += 1
+                return None
+        # A cached validation never outlives the token itself
+        expires_in = payload["exp"] - time.time() if payload and payload.get("exp") else None
+
+        if not self.remote_validation:
+            user_data = {
+                'username': payload.get('sub'),
+                'last_seen': None,
+                'validated': True
+            }
+            self.token_cache.set(token, user_data, ttl_seconds=expires_in)
+            return user_data
+
+        key = hash_token(token)
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._validate_with_login_service(token, expires_in))
+            self._pending[key] = pending
+            pending.add_done_callback(lambda _: self._pending.pop(key, None))
+        # shield: a client disconnecting must not cancel the call other requests are waiting on
+        return await asyncio.shield(pending)
+
+    def invalidate_token(self, token: str) -> bool:
+        """Forget a cached validation (logout), the next request with this token goes to the login service"""
+        return self.token_cache.invalidate(token)
+
+    def decode_token(self, token: str) -> Optional[dict]:
+        """Check the JWT signature and exp locally, returns the claims or None"""
+        try:
+            return jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+        except JWTError as e:
+            logger.warning(f"Token rejected by local verification: {str(e)}")
+            return None
+
+    @staticmethod
+    def token_expires_at(token: str) -> Optional[float]:
+        """exp of an already validated token (epoch seconds), None when it has none"""
+        try:
+            exp = jwt.get_unverified_claims(token).get("exp")
+        except JWTError:
+            return None
+        return float(exp) if exp is not None else None
+
+    def issue_stream_ticket(self, username: str, session_expires_at: Optional[float]) -> tuple:
+        """
+        Short-lived ticket opening the event stream for `username`, returns (ticket, seconds it can be used).
+        The stream it opens ends when the session token expires (`session_expires_at`).
+        """
+        now = time.time()
+        expires_at = now + settings.event_stream_ticket_ttl_seconds
+        if session_expires_at is not None:
+            expires_at = min(expires_at, session_expires_at)
+        claims = {"sub": username, "aud": STREAM_TICKET_AUDIENCE, "exp": int(expires_at), "session_exp": session_expires_at}
+        self.stream_tickets_issued += 1
+        return jwt.encode(claims, self.stream_ticket_key, algorithm="HS256"), max(0, int(expires_at - now))
+
+    def verify_stream_ticket(self, ticket: str) -> Optional[dict]:
+        """Claims of a valid, unexpired stream ticket, None otherwise"""
+        try:
+            return jwt.decode(ticket, self.stream_ticket_key, algorithms=["HS256"], audience=STREAM_TICKET_AUDIENCE)
+        except JWTError as e:
+            self.stream_tickets_rejected += 1
+            logger.warning(f"Stream ticket rejected: {str(e)}")
+            return None
+
+    async def _validate_with_login_service(self, token: str, expires_in: Optional[float] = None) -> dict:
         """Validate JWT token by calling login service session validation"""
+        if self.http_client is None:
+            await self.start()
+        self.remote_validations += 1
         try:
-            response = requests.get(
+            response = await self.http_client.get(
                 self.validate_url,
-                params={"token": token},
-                timeout=settings.health_check_login_service_session_validate_url_expire_seconds
+                params={"token": token}
             )
             
             if response.status_code == 200:
                 data = response.json()
                 if data.get("statusCode") == 200:
-                    return {
+                    user_data = {
                         'username': data.get('username'),
                         'last_seen': data.get('last_seen'),
                         'validated': True
                     }
+                    self.token_cache.set(token, user_data, ttl_seconds=expires_in)
+                    return user_data
             
             logger.warning(f"Session validation failed: {response.status_code}, response:{response.text}")
             return None
                 
-        except requests.exceptions.RequestException as e:
+        except httpx.RequestError as e:
             logger.error(f"Login service unavailable: {str(e)}")
             return None
         except Exception as e:
             logger.error(f"Token validation error: {str(e)}")
             return None
     
+    def stats(self) -> dict:
+        return {
+            "local_verification": self.local_verification,
+            "remote_validation": self.remote_validation,
+            "local_rejections": self.local_rejections,
+            "remote_validations": self.remote_validations,
+            "stream_tickets_issued": self.stream_tickets_issued,
+            "stream_tickets_rejected": self.stream_tickets_rejected,
+            "token_cache": self.token_cache.stats(),
+        }
+
     async def __call__(self, request: Request, call_next):
         # Allow CORS preflight requests
         if request.method == "OPTIONS":
@@ -55,6 +208,16 @@ class AuthMiddleware:
         
         # Check for auth header
         auth_header = request.headers.get("Authorization")
+        if not auth_header and request.url.path in STREAM_TICKET_PATHS and request.query_params.get("ticket"):
+            claims = self.verify_stream_ticket(request.query_params["ticket"])
+            if not claims:
+                return JSONResponse(
+                    status_code=401,
+                    content={"detail": "Invalid or expired stream ticket"}
+                )
+            request.state.user = {'username': claims.get('sub'), 'last_seen': None, 'validated': True}
+            request.state.token_expires_at = claims.get("session_exp")
+            return await call_next(request)
         if not auth_header:
             return JSONResponse(
                 status_code=401,
@@ -84,6 +247,7 @@ class AuthMiddleware:
             
             # Add user to request state
             request.state.user = user_data
+            request.state.token_expires_at = self.token_expires_at(token)
             logger.info(f"User {user_data['username']} accessed {request.url.path}")
             
             return await call_next(request)
@@ -93,4 +257,8 @@ class AuthMiddleware:
             return JSONResponse(
                 status_code=401,
                 content={"detail": "Authentication failed"}
-            )
\ No newline at end of file
+            )
+
+
+# Global instance, shared by the path router in app/main.py and the metrics endpoint
+auth_middleware = AuthMiddleware()
@@ -2,18 +2,29 @@
 
 # API Key protected endpoints
 API_KEY_PATHS = [
-    "/pyaudit/api/audit-events/create"
+    "/pyaudit/api/audit-events/create",
+    "/pyaudit/api/audit-events/create-batch"
 ]
 
 # JWT protected endpoints  
 JWT_PATHS = [
     "/pyaudit/api/audit-events/recent",
+    "/pyaudit/api/audit-events/stream",
+    "/pyaudit/api/audit-events/stream/ticket",
     "/pyaudit/api/audit-events/get-eventtypenames-by-functionalityname",
     "/pyaudit/api/audit-events/search",
     "/pyaudit/api/audit-events/get-all-auditfunctionalities",
     "/pyaudit/api/audit-events/export",
     "/pyaudit/api/audit-events/get-all-companies",
-    "/pyaudit/api/audit-events/get-storelocations-by-company"
+    "/pyaudit/api/audit-events/get-storelocations-by-company",
+    "/pyaudit/api/metrics",
+    "/pyaudit/api/partitions"
+]
+
+# JWT protected endpoints that also accept a stream ticket as `ticket` query parameter (EventSource cannot send
+# headers, and the session token itself must not end up in URLs and access logs)
+STREAM_TICKET_PATHS = [
+    "/pyaudit/api/audit-events/stream"
 ]
 
 # Public endpoints (no auth)
@@ -21,5 +32,6 @@ EXCLUDE_PATHS = [
     "/pyaudit/docs",
     "/pyaudit/redoc", 
     "/pyaudit/openapi.json",
-    "/pyaudit/api/healthcheck"
+    "/pyaudit/api/healthcheck",
+    "/pyaudit/api/session/invalidate"
 ]
\ No newline at end of file
@@ -22,6 +22,14 @@ class AuditEventCreate(BaseModel):
             value = pytz.UTC.localize(value)
         ct_timestamp = value.astimezone(central_tz)
         return ct_timestamp.strftime("%Y-%m-%d %H:%M:%S")
+
+
+# Upper bound on events accepted by one /audit-events/create-batch request
+AUDIT_EVENT_BATCH_MAX_SIZE = 1000
+
+
+class AuditEventBatchCreate(BaseModel):
+    events: List[AuditEventCreate] = Field(..., min_length=1, max_length=AUDIT_EVENT_BATCH_MAX_SIZE)
     
 
 class AuditEventSearch(BaseModel):
@@ -67,6 +75,7 @@ class SearchResponse(BaseModel):
     # current_page: int
     # total_pages: int
     # page_size: int
+    next_cursor: Optional[str] = None  # only set in cursor pagination mode when another page exists
     events: List[AuditEventResponse]
     
     
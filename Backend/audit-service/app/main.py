@@ -3,8 +3,20 @@ from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from app.routers import audit_router
 from app.dependencies.api_key_middleware import APIKeyMiddleware 
-from app.dependencies.auth_middleware import AuthMiddleware
+from app.dependencies.auth_middleware import auth_middleware
 from app.configurations.settings import Settings
+from app.configurations.db_session_manager import sessionmanager
+from app.services.dimension_cache import dimension_cache
+from app.services.lookup_cache import lookup_cache
+from app.services.ingestion_queue import ingestion_queue
+from app.services.partition_manager import partition_manager
+from app.services.archival_service import archival_job
+from app.services.event_broadcaster import event_broadcaster
+from app.services.audit_service import enrich_inserted_events, reload_recent_events
+from app.services.recent_events import recent_events
+from app.services.search_cache import search_cache
+from app.services.search_cache_listener import search_cache_listener
+from app.utils.periodic_task import PeriodicTask
 from app.utils.logger import get_logger
 from app.dependencies.paths import API_KEY_PATHS, JWT_PATHS, EXCLUDE_PATHS
 import uvicorn
@@ -14,13 +26,74 @@ settings = Settings()
 
 # Create middleware instances
 api_key_middleware = APIKeyMiddleware()
-auth_middleware = AuthMiddleware()
+
+# Background reload of the StoreName/CompanyName cache
+dimension_cache_refresher = PeriodicTask("dimension-cache-refresh", settings.dimension_cache_refresh_seconds, dimension_cache.refresh)
+# Background reload of the functionality/event type ID cache used by inserts
+lookup_cache_refresher = PeriodicTask("lookup-cache-refresh", settings.lookup_cache_refresh_seconds, lookup_cache.refresh)
+# Background creation of upcoming auditevents partitions
+partition_maintainer = PeriodicTask("partition-maintenance", settings.partition_maintenance_interval_seconds, partition_manager.ensure_partitions)
+# Background archival of events older than the retention window (only when ARCHIVAL_ENABLED)
+archival_runner = PeriodicTask("auditevents-archival", settings.archival_interval_seconds, archival_job.run)
+# Background reload of the /audit-events/recent buffer (picks up events inserted by other workers and the bulk loader)
+recent_events_reloader = PeriodicTask("recent-events-reload", settings.recent_events_reload_seconds, reload_recent_events)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Application starting up...")
+    # Create the database engines once per process, every request shares their pools
+    sessionmanager.init()
+    # Pooled HTTP client for login service session validation
+    await auth_middleware.start()
+    # Make sure the current and upcoming monthly partitions exist before accepting inserts
+    try:
+        await partition_manager.ensure_partitions()
+    except Exception:
+        logger.exception("Initial partition maintenance failed:")
+    partition_maintainer.start()
+    if archival_job.enabled:
+        archival_runner.start()
+    # Warm up the StoreName/CompanyName cache, lookups fall back to SQL Server while it is empty
+    try:
+        await dimension_cache.refresh()
+    except Exception:
+        logger.exception("Initial dimension cache load failed:")
+    dimension_cache_refresher.start()
+    # Preload the functionality/event type IDs, a miss reloads them on demand
+    try:
+        await lookup_cache.refresh()
+    except Exception:
+        logger.exception("Initial lookup cache load failed:")
+    lookup_cache_refresher.start()
+    # Drop cached searches on inserts made by any process (workers, replicas, bulk loader)
+    if search_cache.enabled:
+        search_cache_listener.start()
+    # Background writer for write-behind ingestion (no-op unless INGESTION_WRITE_BEHIND_ENABLED)
+    ingestion_queue.start()
+    # Fan-out of newly inserted events to the /audit-events/stream clients and the recent events buffer
+    if settings.recent_events_buffer_enabled:
+        event_broadcaster.add_listener(recent_events.add, on_missed=recent_events.mark_stale)
+    event_broadcaster.start(enrich=enrich_inserted_events)
+    # Seed the /audit-events/recent buffer, the endpoint queries the database until it is loaded
+    if settings.recent_events_buffer_enabled:
+        try:
+            await reload_recent_events()
+        except Exception:
+            logger.exception("Initial recent events load failed:")
+        recent_events_reloader.start()
     yield
     logger.info("Application shutting down...")
+    # Write the queued events before the database pools are closed
+    await ingestion_queue.stop()
+    await recent_events_reloader.stop()
+    await event_broadcaster.stop()
+    await search_cache_listener.stop()
+    await lookup_cache_refresher.stop()
+    await dimension_cache_refresher.stop()
+    await partition_maintainer.stop()
+    await archival_runner.stop()
+    await auth_middleware.close()
+    await sessionmanager.close()
 
 API_PATH_PREFIX = "/pyaudit"
 
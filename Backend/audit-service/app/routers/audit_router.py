@@ -1,11 +1,21 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response
+from typing import Literal, Optional
 from datetime import datetime
-from app.dtos.audit_req_res import AuditEventCreate, SearchResponse
+from app.dtos.audit_req_res import AuditEventCreate, AuditEventBatchCreate, SearchResponse
 from app.services import audit_service
 from app.dependencies.db_session_dependency import PostgresDBSession , SqlServerDBSession
+from app.configurations.db_session_manager import sessionmanager
+from app.services.dimension_cache import dimension_cache
+from app.services.lookup_cache import lookup_cache
+from app.services.ingestion_queue import ingestion_queue
+from app.services import partition_manager
+from app.services.archival_service import archival_job
+from app.services.search_cache import search_cache
+from app.services.search_cache_listener import search_cache_listener
+from app.services.event_broadcaster import event_broadcaster, StreamFullError
+from app.services.recent_events import recent_events
+from app.dependencies.auth_middleware import auth_middleware
 from fastapi.responses import StreamingResponse
-import io
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -20,17 +30,103 @@ async def healthcheck():
         "message": "python audit service is running"
     }
 
+# This endpoint exposes runtime metrics (connection pool usage, caches, ingestion queue, archival) to verify connection and cache reuse.
+@router.get("/metrics", tags=["Health Check"])
+async def get_metrics():
+    """Get database connection pool and cache statistics"""
+    return {
+        "StatusCode": 200,
+        "message": "Metrics fetched successfully",
+        "Data": {
+            "db_pool": sessionmanager.pool_stats(),
+            "dimension_cache": dimension_cache.stats(),
+            "lookup_cache": lookup_cache.stats(),
+            "ingestion_queue": ingestion_queue.stats(),
+            "archival": archival_job.stats(),
+            "search_cache": {**search_cache.stats(), "listener": search_cache_listener.stats()},
+            "event_stream": event_broadcaster.stats(),
+            "recent_events": recent_events.stats(),
+            "auth": auth_middleware.stats()
+        }
+    }
+
+# This endpoint drops a token from the validated token cache, the login service calls it on logout.
+@router.post("/session/invalidate", tags=["Health Check"])
+async def invalidate_session(authorization: str = Header("")):
+    """
+    Invalidate the cached validation of the bearer token (the token being logged out). Not JWT protected:
+    the token may already be logged out, and removing a cache entry never grants access.
+    """
+    token = authorization.split(" ")[-1]
+    if not token:
+        raise HTTPException(status_code=400, detail="Missing bearer token")
+    removed = auth_middleware.invalidate_token(token)
+    return {
+        "StatusCode": 200,
+        "message": "Session invalidated" if removed else "Session was not cached"
+    }
+
+# This endpoint lists the auditevents partitions with their date ranges, estimated row counts and sizes.
+@router.get("/partitions", tags=["Health Check"])
+async def get_partitions(db_session: PostgresDBSession):
+    """Get auditevents partition statistics"""
+    return await partition_manager.get_partition_stats(session=db_session)
+
+
 # This endpoint is used to create the audit events.
 @router.post("/audit-events/create", response_model=dict, status_code=201, tags=["Audit Events"])
-async def create_audit_event(request: AuditEventCreate, db_session: PostgresDBSession):
+async def create_audit_event(request: AuditEventCreate, db_session: PostgresDBSession, response: Response):
     """Create a new audit event --> This endpoint only uses API-KEY validation"""
+    # In write-behind mode the event is queued and written by the background worker
+    if ingestion_queue.enabled:
+        response.status_code = 202
+        return await ingestion_queue.enqueue(event=request, session=db_session)
     return await audit_service.insert_audit_event(event=request, session=db_session)
 
 
+# This endpoint is used to create many audit events in one request.
+@router.post("/audit-events/create-batch", response_model=dict, status_code=201, tags=["Audit Events"])
+async def create_audit_events_batch(request: AuditEventBatchCreate, db_session: PostgresDBSession):
+    """Create a batch of audit events in one transaction --> This endpoint only uses API-KEY validation"""
+    return await audit_service.insert_audit_events_batch(batch=request, session=db_session)
+
+
+# This endpoint issues the short-lived ticket the event stream is opened with (EventSource cannot send headers).
+@router.post("/audit-events/stream/ticket", tags=["Audit Events"])
+async def create_stream_ticket(request: Request):
+    """Ticket for /audit-events/stream?ticket=..., valid for EVENT_STREAM_TICKET_TTL_SECONDS"""
+    ticket, expires_in = auth_middleware.issue_stream_ticket(
+        request.state.user["username"], getattr(request.state, "token_expires_at", None)
+    )
+    return {
+        "StatusCode": 200,
+        "Data": {"ticket": ticket, "expires_in": expires_in}
+    }
+
+
+# This endpoint streams newly created audit events to the client as Server-Sent Events.
+@router.get("/audit-events/stream", tags=["Audit Events"])
+async def stream_audit_events(request: Request):
+    """Live tail of new audit events (text/event-stream) until the session token expires, a comment line is sent as heartbeat"""
+    try:
+        queue = event_broadcaster.subscribe()
+    except StreamFullError as e:
+        logger.warning(f"Event stream subscription rejected: {str(e)}")
+        raise HTTPException(status_code=503, detail="Too many stream clients connected")
+    return StreamingResponse(
+        event_broadcaster.stream(queue, expires_at=getattr(request.state, "token_expires_at", None)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 # This endpoint is used to search the recent 500 events by default.
 @router.get("/audit-events/recent", tags=["Audit Events"])
 async def get_recent_audit_events(db_session: PostgresDBSession, sqlserver_session: SqlServerDBSession):
     """Get most recent audit events (up to 500)"""
+    # Served from the in-memory buffer (pre-serialized) once it is loaded
+    if recent_events.ready:
+        return Response(content=recent_events.payload(), media_type="application/json")
     return await audit_service.get_recent_events(session=db_session, sqlserver_session=sqlserver_session)
 
 
@@ -55,8 +151,16 @@ async def search_audit_events(
     user: Optional[str] = None,
     message_pattern: Optional[str] = None,
     page_number: int = Query(1, ge=1),
-    page_size: int = Query(500, ge=1, le=5000)
-    
+    page_size: int = Query(500, ge=1, le=5000),
+    use_cursor: bool = Query(
+        False,
+        description="If true, pages are fetched with a keyset cursor; follow `next_cursor` instead of `page_number`."
+    ),
+    cursor: Optional[str] = Query(None, description="`next_cursor` returned by the previous page (implies use_cursor)."),
+    include_archive: bool = Query(
+        False,
+        description="If true, archived events are searched too (keyset pagination, follow `next_cursor`)."
+    )
 ):
     """Search audit events using search criteria"""
     return await audit_service.search_audit_events(
@@ -71,15 +175,16 @@ async def search_audit_events(
         page_number=page_number,
         page_size=page_size,
         session=db_session,
-        sqlserver_session=sqlserver_session
+        sqlserver_session=sqlserver_session,
+        cursor=cursor,
+        use_cursor=use_cursor,
+        include_archive=include_archive
     )
 
 
-# This endpoint is used to export the audit event data to an Excel sheet.
+# This endpoint is used to export the audit event data to an Excel sheet, CSV, NDJSON or Parquet file.
 @router.get("/audit-events/export", tags=["Audit Events"])
 async def export_audit_events_to_excel(
-    db_session: PostgresDBSession,
-    sqlserver_session: SqlServerDBSession,
     from_date: Optional[str] = None,
     to_date: Optional[str] = None,
     functionality: Optional[str] = None,
@@ -90,60 +195,69 @@ async def export_audit_events_to_excel(
     message_pattern: Optional[str] = None,
     page_number: int = Query(1, ge=1),
     page_size: int = Query(500, ge=1, le=5000),
+    use_cursor: bool = Query(False, description="If true, exports the page addressed by `cursor` (keyset pagination)."),
+    cursor: Optional[str] = None,
+    include_archive: bool = Query(False, description="If true, archived events are exported too (keyset pagination)."),
     recent: bool = Query(
         False,
         description="If true, exports the most recent 500 events instead of search results."
     ),
+    export_format: Literal["xlsx", "csv", "ndjson", "parquet"] = Query("xlsx", alias="format", description="File format of the export."),
+    gzip: bool = Query(False, description="If true, csv/ndjson are gzipped and parquet uses gzip compression."),
 ):
     """
-    Export audit events to an Excel file.
+    Export audit events to an Excel, CSV, NDJSON or Parquet file.
 
     - If `recent=True`, exports the latest 500 audit events.
     - Otherwise, exports events matching the given search criteria.
+    The file is streamed while the rows are read, the database sessions are opened by the export itself.
     """
     try:
         if recent:
-            logger.info("Exporting the most recent 500 audit events to Excel...")
-            search_result = await audit_service.get_recent_events(session=db_session, sqlserver_session=sqlserver_session)
+            logger.info(f"Exporting the most recent 500 audit events to {export_format}...")
         else:
-            logger.info("Exporting filtered audit event search results to Excel...")
-            search_result = await audit_service.search_audit_events(
-                from_date=from_date,
-                to_date=to_date,
-                functionality=functionality,
-                event_type=event_type,
-                store_id=store_id,
-                company_id=company_id,
-                user=user,
-                message_pattern=message_pattern,
-                page_number=page_number,
-                page_size=page_size,
-                session=db_session,
-                sqlserver_session=sqlserver_session
-            )
-
-        # Generate Excel file
-        excel_file = await audit_service.export_audit_events_to_excel(search_result, sqlserver_session)
+            logger.info(f"Exporting filtered audit event search results to {export_format}...")
+        search_params = dict(
+            from_date=from_date,
+            to_date=to_date,
+            functionality=functionality,
+            event_type=event_type,
+            store_id=store_id,
+            user=user,
+            message_pattern=message_pattern,
+            page_number=page_number,
+            page_size=page_size,
+            company_id=company_id,
+            cursor=cursor,
+            use_cursor=use_cursor,
+            include_archive=include_archive
+        )
+
+        # Generate the export file
+        export_chunks = await audit_service.export_audit_events(recent, search_params, export_format, gzip)
+        media_type, extension = audit_service.export_file_type(export_format, gzip)
 
         # Create a timestamped filename
         timestamp = datetime.now().strftime("%m%d%Y_%H%M%S")
         filename = (
-            f"audit_events_recent_{timestamp}.xlsx"
+            f"audit_events_recent_{timestamp}.{extension}"
             if recent
-            else f"audit_events_search_{timestamp}.xlsx"
+            else f"audit_events_search_{timestamp}.{extension}"
         )
 
-        logger.info(f"Audit events exported successfully: {filename}")
+        logger.info(f"Audit events export started: {filename}")
 
-        # Return the Excel file as a download response
+        # Return the file as a download response
         return StreamingResponse(
-            io.BytesIO(excel_file),
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            export_chunks,
+            media_type=media_type,
             headers={"Content-Disposition": f"attachment; filename={filename}"}
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.exception("Error exporting audit events to Excel:")
+        logger.exception("Error exporting audit events:")
         raise HTTPException(status_code=500, detail="Something went wrong")
 
     
@@ -0,0 +1,219 @@
+"""
+Bulk loader for historical audit event backfills.
+
+Streams NDJSON or CSV input (one AuditEventCreate payload per line/row), resolves functionality and event type
+IDs in bulk through the lookup cache and writes the rows into the partitioned auditevents table with asyncpg's
+binary COPY, one chunk at a time, so memory use stays flat regardless of the input size.
+
+Usage (from the audit-service directory, with the usual .env):
+    python -m app.scripts.bulk_load_audit_events events.ndjson
+    python -m app.scripts.bulk_load_audit_events events.csv --chunk-size 20000
+    cat events.ndjson | python -m app.scripts.bulk_load_audit_events - --format ndjson
+
+Before each COPY the monthly partitions covering the chunk's EventTimestamps are created when missing
+(ensure_auditevents_partitions_for_range), so backfills of past months work. Each chunk is committed on its own; when a run stops half way, --skip-rows resumes after the rows already loaded.
+"""
+import argparse
+import asyncio
+import csv
+import io
+import json
+import sys
+import time
+from itertools import islice
+from pydantic import ValidationError
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.pool import NullPool
+from app.configurations.dbconfig import get_postgres_async_engine
+from app.dtos.audit_req_res import AuditEventCreate
+from app.services.audit_service import _to_central_naive
+from app.services.lookup_cache import LookupCache
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+COPY_COLUMNS = [
+    "eventtimestamp", "functionalityid", "eventtypeid", "storelocationid", "companyid",
+    "username", "message", "status", "additionaldata",
+]
+
+
+# This function is used to read NDJSON input line by line
+def _read_ndjson(stream):
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+# This function is used to read CSV input row by row (header row with AuditEventCreate field names)
+def _read_csv(stream):
+    for row in csv.DictReader(stream):
+        # Empty cells mean "not set", additional_data holds a JSON object
+        payload = {key: value for key, value in row.items() if value not in (None, "")}
+        if "additional_data" in payload:
+            payload["additional_data"] = json.loads(payload["additional_data"])
+        yield payload
+
+
+# This function is used to split the input rows into lists of at most chunk_size rows
+def _iter_chunks(rows, chunk_size: int):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# This function is used to get the first day of every month the records' EventTimestamps fall in
+def _record_months(records: list) -> set:
+    return {record[0].date().replace(day=1) for record in records}
+
+
+async def _ensure_partitions(records: list, ensured_months: set, session: AsyncSession):
+    """Create the monthly partitions of the chunk's EventTimestamp range that this run has not ensured yet"""
+    months = _record_months(records)
+    if months <= ensured_months:
+        return
+    timestamps = [record[0] for record in records]
+    created = await session.scalar(
+        text("SELECT ensure_auditevents_partitions_for_range(:from_timestamp, :to_timestamp)"),
+        {"from_timestamp": min(timestamps), "to_timestamp": max(timestamps)},
+    )
+    await session.commit()
+    ensured_months |= months
+    if created:
+        logger.info(f"Created {created} auditevents partitions between {min(timestamps)} and {max(timestamps)}")
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk load audit events into PostgreSQL with COPY")
+    parser.add_argument("path", help="NDJSON or CSV file, '-' reads from stdin")
+    parser.add_argument("--format", choices=["ndjson", "csv"], help="Input format (default: from the file extension)")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="Rows per COPY (default: 10000)")
+    parser.add_argument("--skip-rows", type=int, default=0, help="Skip this many input rows first, to resume a run")
+    args = parser.parse_args(argv)
+    if args.format is None:
+        if args.path.lower().endswith(".csv"):
+            args.format = "csv"
+        elif args.path.lower().endswith((".ndjson", ".jsonl", ".json")):
+            args.format = "ndjson"
+        else:
+            parser.error("cannot infer --format from the file name")
+    return args
+
+
+async def _prepare_chunk(payloads: list, first_row: int, lookup_cache: LookupCache, session: AsyncSession) -> tuple[list, int]:
+    """Validate one chunk and resolve its IDs in bulk. Returns (COPY records, skipped rows)."""
+    events = []
+    skipped = 0
+    for offset, payload in enumerate(payloads):
+        try:
+            events.append(AuditEventCreate(**payload))
+        except (ValidationError, TypeError) as e:
+            skipped += 1
+            logger.warning(f"Row {first_row + offset}: invalid audit event skipped: {e}")
+
+    resolved = await lookup_cache.resolve(((event.functionality, event.event_type) for event in events), session)
+
+    records = []
+    for event in events:
+        func_id, event_type_id = resolved[(event.functionality, event.event_type)]
+        if not func_id or not event_type_id:
+            skipped += 1
+            logger.warning(f"Unknown functionalityname/eventtypename '{event.functionality}'/'{event.event_type}', row skipped")
+            continue
+        records.append((
+            _to_central_naive(event.event_timestamp),
+            func_id,
+            event_type_id,
+            event.store_id,
+            event.company_id,
+            event.user,
+            event.message,
+            event.status if event.status else "Success",
+            json.dumps(event.additional_data) if event.additional_data else None,
+        ))
+
+    return records, skipped
+
+
+async def _copy_records(copy_conn, records: list) -> int:
+    await copy_conn.copy_records_to_table("auditevents", records=records, columns=COPY_COLUMNS)
+    return len(records)
+
+
+async def bulk_load(stream, input_format: str, chunk_size: int, skip_rows: int = 0) -> dict:
+    """Load every event from the stream, returns the load summary"""
+    reader = _read_ndjson(stream) if input_format == "ndjson" else _read_csv(stream)
+    rows = islice(reader, skip_rows, None)
+
+    engine = get_postgres_async_engine(poolclass=NullPool)
+    lookup_cache = LookupCache(miss_reload_seconds=60)
+    ensured_months = set()
+    loaded = skipped = 0
+    row_number = skip_rows
+    started = time.perf_counter()
+    try:
+        async with AsyncSession(engine) as session, engine.connect() as conn:
+            await lookup_cache.load(session)
+            # asyncpg connection underneath SQLAlchemy, each COPY runs in its own implicit transaction
+            raw_connection = await conn.get_raw_connection()
+            copy_conn = raw_connection.driver_connection
+
+            # The next chunk is parsed while the previous COPY is still running, at most two chunks are in memory.
+            # committed_rows counts the input rows whose COPY has finished, that is the --skip-rows value to resume from.
+            pending_copy = None
+            committed_rows = row_number
+            chunks = _iter_chunks(rows, chunk_size)
+            while True:
+                payloads = next(chunks, [])
+                records = []
+                if payloads:
+                    records, chunk_skipped = await _prepare_chunk(payloads, row_number, lookup_cache, session)
+                    skipped += chunk_skipped
+                if records:
+                    await _ensure_partitions(records, ensured_months, session)
+                if pending_copy is not None:
+                    loaded += await pending_copy
+                    committed_rows = row_number
+                    elapsed = time.perf_counter() - started
+                    logger.info(f"Loaded {loaded} rows ({skipped} skipped), {committed_rows} input rows done, "
+                                f"{loaded / elapsed:.0f} rows/s")
+                    pending_copy = None
+                if not payloads:
+                    break
+                row_number += len(payloads)
+                if records:
+                    pending_copy = asyncio.create_task(_copy_records(copy_conn, records))
+                else:
+                    committed_rows = row_number
+    finally:
+        await engine.dispose()
+
+    elapsed = time.perf_counter() - started
+    return {
+        "loaded": loaded,
+        "skipped": skipped,
+        "rows_read": row_number,
+        "seconds": round(elapsed, 2),
+        "rows_per_second": round(loaded / elapsed) if elapsed else None,
+    }
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+    if args.path == "-":
+        stream = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", newline="")
+        summary = asyncio.run(bulk_load(stream, args.format, args.chunk_size, args.skip_rows))
+    else:
+        with open(args.path, encoding="utf-8", newline="") as stream:
+            summary = asyncio.run(bulk_load(stream, args.format, args.chunk_size, args.skip_rows))
+    logger.info(f"Bulk load finished: {summary}")
+    print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    main()
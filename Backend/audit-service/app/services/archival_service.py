@@ -0,0 +1,241 @@
+import asyncio
+import time
+from collections import deque
+from datetime import date, datetime
+from sqlalchemy import text
+from app.configurations.settings import Settings
+from app.configurations.db_session_manager import sessionmanager
+from app.services.partition_manager import PARTITION_STATS_QUERY, PARTITION_BOUND_PATTERN
+from app.services.search_cache import search_cache
+from app.services.search_cache_listener import CHANGES_CHANNEL, CLEAR_PAYLOAD
+from app.utils.logger import get_logger
+
+settings = Settings()
+logger = get_logger(__name__)
+
+# Partitions left half detached by an interrupted DETACH PARTITION CONCURRENTLY
+DETACH_PENDING_QUERY = text("""
+    SELECT c.relname
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = 'auditevents'::regclass AND i.inhdetachpending
+""")
+
+# Moves one batch of the oldest events before the cutoff. Delete and insert run in one statement (and one
+# transaction), so an interrupted run never loses or duplicates events and the next run resumes where it stopped.
+ARCHIVE_BATCH_QUERY = text("""
+    WITH batch AS (
+        SELECT Id, EventTimestamp
+        FROM AuditEvents
+        WHERE EventTimestamp < :cutoff
+        ORDER BY EventTimestamp, Id
+        LIMIT :batch_size
+    ),
+    moved AS (
+        DELETE FROM AuditEvents ae
+        USING batch b
+        WHERE ae.Id = b.Id AND ae.EventTimestamp = b.EventTimestamp
+        RETURNING ae.Id, ae.EventTimestamp, ae.FunctionalityId, ae.EventTypeId, ae.StoreLocationID,
+                  ae.CompanyId, ae.UserName, ae.Message, ae.Status, ae.AdditionalData
+    ),
+    archived AS (
+        INSERT INTO AuditEvents_Archival
+            (Id, EventTimestamp, FunctionalityId, EventTypeId, StoreLocationID,
+             CompanyId, UserName, Message, Status, AdditionalData)
+        SELECT Id, EventTimestamp, FunctionalityId, EventTypeId, StoreLocationID,
+               CompanyId, UserName, Message, Status, AdditionalData
+        FROM moved
+        ON CONFLICT (Id) DO NOTHING
+        RETURNING 1
+    )
+    SELECT (SELECT count(*) FROM moved) AS moved_count,
+           (SELECT count(*) FROM archived) AS archived_count
+""")
+
+# Columns copied from a detached partition into the archive
+ARCHIVE_COLUMNS = ("Id, EventTimestamp, FunctionalityId, EventTypeId, StoreLocationID, "
+                   "CompanyId, UserName, Message, Status, AdditionalData")
+
+# Names of the last dropped partitions reported by /metrics
+DROPPED_PARTITIONS_KEPT = 24
+
+
+def retention_cutoff(retention_months: int, today: date = None) -> datetime:
+    """First day of the oldest month that stays in auditevents, events before it are archived"""
+    today = today or date.today()
+    month_index = today.year * 12 + (today.month - 1) - retention_months
+    return datetime(month_index // 12, month_index % 12 + 1, 1)
+
+
+class ArchivalJob:
+    """
+    Moves events older than `retention_months` (whole months) from auditevents into AuditEvents_Archival
+    in batches of `batch_size`, pausing `pause_seconds` between batches so live ingestion keeps the upper hand.
+    Partitions left empty below the cutoff are dropped afterwards when `drop_empty_partitions` is set.
+    """
+
+    def __init__(self, enabled: bool, retention_months: int, batch_size: int, pause_seconds: float, drop_empty_partitions: bool):
+        self.enabled = enabled
+        self.retention_months = retention_months
+        self.batch_size = batch_size
+        self.pause_seconds = pause_seconds
+        self.drop_empty_partitions = drop_empty_partitions
+        self._lock = asyncio.Lock()
+        # progress metrics
+        self.running = False
+        self.cutoff = None
+        self.last_run_started_at = None
+        self.last_run_finished_at = None
+        self.last_run_moved = 0
+        self.total_moved = 0
+        self.total_duplicates = 0
+        self.batches = 0
+        self.last_batch_ms = None
+        self.dropped_partitions = deque(maxlen=DROPPED_PARTITIONS_KEPT)
+        self.total_dropped_partitions = 0
+        self.last_error = None
+
+    async def run(self):
+        """Archive everything older than the retention window, one committed batch at a time"""
+        if self._lock.locked():
+            logger.info("Archival run already in progress, skipping")
+            return
+        async with self._lock:
+            self.running = True
+            self.cutoff = retention_cutoff(self.retention_months)
+            self.last_run_started_at = datetime.now()
+            self.last_run_moved = 0
+            self.last_error = None
+            logger.info(f"Archival run started, moving events before {self.cutoff}")
+            try:
+                while True:
+                    moved = await self._archive_batch()
+                    if moved < self.batch_size:
+                        break
+                    await asyncio.sleep(self.pause_seconds)
+
+                if self.drop_empty_partitions:
+                    await self._drop_empty_partitions()
+            except Exception as e:
+                self.last_error = str(e)
+                raise
+            finally:
+                if self.last_run_moved:
+                    # Cached searches may list events that now live in the archive tier, in every process
+                    search_cache.clear()
+                    await self._notify_search_caches()
+                self.running = False
+                self.last_run_finished_at = datetime.now()
+                logger.info(f"Archival run finished, {self.last_run_moved} events moved")
+
+    async def _notify_search_caches(self):
+        """Tell the search caches of the other processes to clear (app/services/search_cache_listener.py)"""
+        try:
+            async with sessionmanager.postgres_session() as session:
+                await session.execute(text("SELECT pg_notify(:channel, :payload)"),
+                                      {"channel": CHANGES_CHANNEL, "payload": CLEAR_PAYLOAD})
+                await session.commit()
+        except Exception:
+            logger.exception("Search cache clear notification failed:")
+
+    async def _archive_batch(self) -> int:
+        started = time.perf_counter()
+        async with sessionmanager.postgres_session() as session:
+            row = (await session.execute(ARCHIVE_BATCH_QUERY, {"cutoff": self.cutoff, "batch_size": self.batch_size})).one()
+            await session.commit()
+
+        self.batches += 1
+        self.last_batch_ms = round((time.perf_counter() - started) * 1000, 3)
+        self.last_run_moved += row.moved_count
+        self.total_moved += row.moved_count
+        # Ids already present in the archive (e.g. copied by sp_auditevents_maintain) are not inserted twice
+        self.total_duplicates += row.moved_count - row.archived_count
+        logger.debug(f"Archived batch: {row.moved_count} moved, {row.archived_count} inserted, {self.last_batch_ms} ms")
+        return row.moved_count
+
+    async def _drop_empty_partitions(self):
+        """
+        Detach the empty partitions older than the cutoff with DETACH PARTITION CONCURRENTLY, then drop the
+        detached tables. A plain DROP TABLE would take an ACCESS EXCLUSIVE lock on auditevents and block
+        inserts and searches while it waits; the concurrent detach only takes SHARE UPDATE EXCLUSIVE on it.
+        Events that reach a partition between its emptiness check and its detach are moved to the archive.
+        """
+        cutoff = self.cutoff.strftime("%Y-%m-%d %H:%M:%S")
+        async with sessionmanager.postgres_session() as session:
+            partitions = (await session.execute(PARTITION_STATS_QUERY)).mappings().all()
+            detach_pending = set((await session.execute(DETACH_PENDING_QUERY)).scalars().all())
+            await session.commit()
+
+        candidates = []
+        for partition in partitions:
+            match = PARTITION_BOUND_PATTERN.search(partition["partition_bound"] or "")
+            if match and match.group(2) <= cutoff:
+                candidates.append((partition["partition_name"], match.group(2)))
+
+        # DETACH ... CONCURRENTLY cannot run inside a transaction block
+        async with sessionmanager.postgres_autocommit_connection() as connection:
+            for name, ends in candidates:
+                if name in detach_pending:
+                    # An earlier concurrent detach was interrupted, complete it
+                    await connection.execute(text(f'ALTER TABLE auditevents DETACH PARTITION "{name}" FINALIZE'))
+                else:
+                    has_rows = await connection.scalar(text(f'SELECT EXISTS (SELECT 1 FROM ONLY "{name}")'))
+                    if has_rows:
+                        continue
+                    await connection.execute(text(f'ALTER TABLE auditevents DETACH PARTITION "{name}" CONCURRENTLY'))
+
+                # Rows inserted between the check and the detach are no longer reachable through auditevents,
+                # they are older than the cutoff: move them into the archive together with the drop
+                moved = await self._archive_and_drop(name)
+                self.dropped_partitions.append(name)
+                self.total_dropped_partitions += 1
+                if moved:
+                    logger.warning(f"Partition {name} received {moved} events while it was detached, moved them to the archive")
+                logger.info(f"Detached and dropped partition {name} (ends {ends})")
+
+    async def _archive_and_drop(self, name: str) -> int:
+        """Copy the rows of a detached partition into AuditEvents_Archival and drop it, in one transaction"""
+        async with sessionmanager.postgres_session() as session:
+            moved = await session.scalar(text(f'SELECT count(*) FROM ONLY "{name}"'))
+            archived = 0
+            if moved:
+                result = await session.execute(text(
+                    f'INSERT INTO AuditEvents_Archival ({ARCHIVE_COLUMNS}) '
+                    f'SELECT {ARCHIVE_COLUMNS} FROM ONLY "{name}" ON CONFLICT (Id) DO NOTHING'
+                ))
+                archived = result.rowcount
+            await session.execute(text(f'DROP TABLE IF EXISTS "{name}"'))
+            await session.commit()
+
+        self.last_run_moved += moved
+        self.total_moved += moved
+        self.total_duplicates += moved - archived
+        return moved
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "running": self.running,
+            "retention_months": self.retention_months,
+            "cutoff": self.cutoff,
+            "last_run_started_at": self.last_run_started_at,
+            "last_run_finished_at": self.last_run_finished_at,
+            "last_run_moved": self.last_run_moved,
+            "total_moved": self.total_moved,
+            "total_duplicates": self.total_duplicates,
+            "batches": self.batches,
+            "last_batch_ms": self.last_batch_ms,
+            "dropped_partitions": list(self.dropped_partitions),
+            "total_dropped_partitions": self.total_dropped_partitions,
+            "last_error": self.last_error,
+        }
+
+
+# Global job instance, scheduled from the FastAPI lifespan (app/main.py) when ARCHIVAL_ENABLED is set
+archival_job = ArchivalJob(
+    enabled=settings.archival_enabled,
+    retention_months=settings.archival_retention_months,
+    batch_size=settings.archival_batch_size,
+    pause_seconds=settings.archival_batch_pause_seconds,
+    drop_empty_partitions=settings.archival_drop_empty_partitions,
+)
@@ -1,3 +1,4 @@
+import heapq
 import json
 from datetime import datetime
 import pytz
@@ -5,61 +6,66 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
 from app.configurations import dbconfig as config
 from app.utils.logger import get_logger
-from sqlalchemy import text, select
-from app.dtos.audit_req_res import AuditEventCreate, AuditEventResponse
-from typing import Optional
-import pandas as pd
+from sqlalchemy import text, select, insert
+from app.dtos.audit_req_res import AuditEventCreate, AuditEventBatchCreate, AuditEventResponse
+from typing import AsyncIterator, Optional
 from app.db_models import audit_event_models, auditeventarchival_models, auditeventtype_models, auditfunctionality_models,\
     company_models, store_location_models
-import io
+from itertools import islice
 from app.dependencies.db_session_dependency import SqlServerDBSession
-from openpyxl.styles import Font 
+from app.utils.cursor_util import encode_cursor, decode_cursor
+from app.services.dimension_cache import dimension_cache
+from app.services.lookup_cache import lookup_cache
+from app.services.archival_service import retention_cutoff
+from app.services.search_cache import search_cache
+from app.services.event_broadcaster import event_broadcaster
+from app.services.recent_events import recent_events
+from app.configurations.db_session_manager import sessionmanager
+from app.utils.export_writers import XlsxStreamWriter, CsvStreamWriter, NdjsonStreamWriter, ParquetStreamWriter, \
+    GzipStreamWriter
 
 settings = config.Settings()
 logger = get_logger(__name__)
 
+# AuditEvents timestamps are stored as naive Central Time values
+CENTRAL_TZ = pytz.timezone("America/Chicago")
 
-# This function is used to fetch the storelocationname from sqlserver based on storelocationid
-def get_store_name(store_id: int, session) -> str | None:
-    """
-    Fetch StoreName from SQL Server using a regular (sync) session.
-    """
-    # If storelocationid is None returning None
-    if store_id is None:
-        return None
-        
-    try:
-        logger.info(f"Fetching storeName for storelocationid:{store_id}")
-        row = session.query(store_location_models.StoreLocation.StoreLocationID, store_location_models.StoreLocation.StoreName)\
-                     .filter(store_location_models.StoreLocation.StoreLocationID == store_id)\
-                     .first()
-        if row:
-            logger.debug(f"StoreName: {row.StoreName} for storelocationid:{store_id}")
-            return row.StoreName
-        return None
-    except Exception as e:
-        logger.exception(f"Error fetching StoreName for StoreLocationID={store_id}: {e}")
-        return None
-    
-# This function is used to fetch the companyname from sqlserver based on companyid
-def get_company_name(company_id: int, session) -> str | None:
+
+# This function is used to convert an incoming event timestamp to the naive Central Time value stored in AuditEvents
+def _to_central_naive(event_timestamp: datetime) -> datetime:
+    ct_timestamp = event_timestamp.astimezone(CENTRAL_TZ)
+    return ct_timestamp.replace(tzinfo=None, microsecond=0)
+
+
+# This function is used to update the in-process consumers once inserted events are committed
+def _after_insert(rows: list[dict]):
     """
-    Fetch CompanyName from SQL Server using a regular (sync) session.
+    Called with the committed events as GetAuditEvents_Func style rows (naive Central Time timestamps).
+    Never raises: the events are already committed, an error here must not turn the insert into a 500
+    (which the caller or the write-behind queue would retry, inserting the events twice).
     """
-    if company_id is None:
-        return None
     try:
-        logger.info(f"Fetching CompanyName for companyid:{company_id}")
-        row = session.query(company_models.Company.CompanyID, company_models.Company.CompanyName)\
-                     .filter(company_models.Company.CompanyID == company_id)\
-                     .first()
-        if row:
-            logger.debug(f"CompanyName: {row.CompanyName} for companyid:{company_id}")
-            return row.CompanyName
-        return None
-    except Exception as e:
-        logger.exception(f"Error fetching CompanyName for companyid={company_id}: {e}")
-        return None
+        search_cache.invalidate_window(row["eventtimestamp"] for row in rows)
+        event_broadcaster.publish(rows)
+    except Exception:
+        logger.exception("Post-insert update failed, clearing the search cache:")
+        search_cache.clear()
+
+
+# This function is used to build the GetAuditEvents_Func style row of an event inserted by this service
+def _inserted_row(event_id: int, event: AuditEventCreate, values: dict) -> dict:
+    return {
+        "id": event_id,
+        "eventtimestamp": values["eventtimestamp"],
+        "functionality": event.functionality,
+        "eventtype": event.event_type,
+        "storelocationid": values["storelocationid"],
+        "companyid": values["companyid"],
+        "username": values["username"],
+        "message": values["message"],
+        "status": values["status"],
+        "additionaldata": values["additionaldata"],
+    }
 
 
 # This function is used to insert audit events.
@@ -71,31 +77,18 @@ async def insert_audit_event(event: AuditEventCreate, session: AsyncSession):
         status_value = event.status if event.status else "Success"
 
         # Convert event_timestamp to Central Time and make it timezone-naive
-        central_tz = pytz.timezone("America/Chicago")
-        ct_timestamp = event.event_timestamp.astimezone(central_tz)
-        naive_timestamp = ct_timestamp.replace(tzinfo=None, microsecond=0)
-
-        # Lookup functionality ID
-        func_id = await session.scalar(
-            select(auditfunctionality_models.AuditFunctionality.functionalityid).where(
-                auditfunctionality_models.AuditFunctionality.functionalityname == event.functionality
-            )
-        )
-        logger.debug(f"FunctionalityID lookup for '{event.functionality}': {func_id}")
+        naive_timestamp = _to_central_naive(event.event_timestamp)
+
+        # Lookup functionality and event type IDs from the in-process cache
+        resolved = await lookup_cache.resolve([(event.functionality, event.event_type)], session)
+        func_id, event_type_id = resolved[(event.functionality, event.event_type)]
+        logger.debug(f"FunctionalityID lookup for '{event.functionality}': {func_id}, EventTypeID lookup for '{event.event_type}': {event_type_id}")
         if not func_id:
             logger.warning(f"Unknown functionalityname found: {event.functionality}")
             return {
                 "StatusCode": 400,
                 "message": f"Unknown functionalityname found: {event.functionality}"
             }
-
-        # Lookup event type ID
-        event_type_id = await session.scalar(
-            select(auditeventtype_models.AuditEventType.eventtypeid).where(
-                auditeventtype_models.AuditEventType.eventtypename == event.event_type
-            )
-        )
-        logger.debug(f"EventTypeID lookup for '{event.event_type}': {event_type_id}")
         if not event_type_id:
             logger.warning(f"Unknown eventtypename found: {event.event_type}")
             return {
@@ -120,6 +113,15 @@ async def insert_audit_event(event: AuditEventCreate, session: AsyncSession):
         session.add(audit_event)
         await session.commit()
         # await session.refresh(audit_event)  # get generated Id
+        _after_insert([_inserted_row(audit_event.id, event, {
+            "eventtimestamp": audit_event.eventtimestamp,
+            "storelocationid": audit_event.storelocationid,
+            "companyid": audit_event.companyid,
+            "username": audit_event.username,
+            "message": audit_event.message,
+            "status": audit_event.status,
+            "additionaldata": audit_event.additionaldata,
+        })])
 
         logger.info(f"Audit event inserted successfully with ID={audit_event.id}, Timestamp={audit_event.eventtimestamp}")
 
@@ -134,6 +136,127 @@ async def insert_audit_event(event: AuditEventCreate, session: AsyncSession):
         raise HTTPException(status_code=500, detail=f"Something went wrong")
 
 
+# This function is used to insert a batch of audit events in one transaction.
+async def insert_audit_events_batch(batch: AuditEventBatchCreate, session: AsyncSession):
+    """
+    Insert many audit events with a single multi-row INSERT.
+    Functionality and event type IDs come from the lookup cache. Events with unknown names are
+    reported as failed items and skipped, the rest are inserted together in one commit.
+    """
+    try:
+        events = batch.events
+        logger.debug(f"Batch insert request with {len(events)} audit events")
+
+        # Resolve functionality and event type IDs once per distinct name pair from the in-process cache
+        resolved = await lookup_cache.resolve(((event.functionality, event.event_type) for event in events), session)
+        logger.debug(f"Resolved {len(resolved)} distinct functionality/event type pairs")
+
+        results = [None] * len(events)
+        params = []
+        param_indexes = []
+        for index, event in enumerate(events):
+            func_id, event_type_id = resolved[(event.functionality, event.event_type)]
+            if not func_id:
+                results[index] = {"Index": index, "StatusCode": 400, "message": f"Unknown functionalityname found: {event.functionality}"}
+                continue
+
+            if not event_type_id:
+                results[index] = {"Index": index, "StatusCode": 400, "message": f"Unknown eventtypename found: {event.event_type}"}
+                continue
+
+            params.append({
+                "eventtimestamp": _to_central_naive(event.event_timestamp),
+                "functionalityid": func_id,
+                "eventtypeid": event_type_id,
+                "storelocationid": event.store_id,
+                "companyid": event.company_id,
+                "username": event.user,
+                "message": event.message,
+                "status": event.status if event.status else "Success",
+                "additionaldata": event.additional_data if event.additional_data else None,
+            })
+            param_indexes.append(index)
+
+        if params:
+            # One multi-row INSERT ... RETURNING, ids come back in parameter order
+            inserted = await session.execute(
+                insert(audit_event_models.AuditEvent).returning(audit_event_models.AuditEvent.id, sort_by_parameter_order=True),
+                params,
+            )
+            inserted_ids = inserted.scalars().all()
+            await session.commit()
+            _after_insert([
+                _inserted_row(event_id, events[index], param)
+                for index, event_id, param in zip(param_indexes, inserted_ids, params)
+            ])
+
+            for index, event_id in zip(param_indexes, inserted_ids):
+                results[index] = {"Index": index, "StatusCode": 201, "Id": event_id, "message": "Audit event created successfully"}
+
+        logger.info(f"Batch insert completed: {len(params)} of {len(events)} audit events inserted")
+
+        return {
+            "StatusCode": 201 if params else 400,
+            "message": f"{len(params)} of {len(events)} audit events created successfully",
+            "count": len(params),
+            "Data": results
+        }
+
+    except Exception as e:
+        await session.rollback()
+        logger.exception(f"Exception during batch audit event insertion:")
+        raise HTTPException(status_code=500, detail=f"Something went wrong")
+
+
+# This function is used to map audit event rows to the API response format enriched with StoreName/CompanyName
+async def _map_event_rows(rows, sqlserver_session: AsyncSession) -> list[dict]:
+    """
+    Format timestamps and resolve StoreName/CompanyName for GetAuditEvents_Func style rows.
+    Names come from the shared dimension cache, IDs it does not know are resolved with one bulk query each.
+    """
+    store_names, company_names = await dimension_cache.resolve(
+        (row["storelocationid"] for row in rows),
+        (row["companyid"] for row in rows),
+        sqlserver_session,
+    )
+
+    events = []
+    for row in rows:
+        ts = row["eventtimestamp"]
+        formatted_ts = ts.strftime("%m-%d-%Y %H:%M:%S") if ts else None
+
+        store_location_id = row["storelocationid"]
+        company_id = row["companyid"]
+
+        events.append({
+            "Id": row["id"],
+            "EventTimestamp": formatted_ts,
+            "Functionality": row["functionality"],
+            "EventType": row["eventtype"],
+            "StoreLocationID": store_location_id,
+            "StoreName": store_names.get(store_location_id),  # This will be None when store_location_id is None
+            "CompanyId": company_id,
+            "CompanyName": company_names.get(company_id),
+            "UserName": row["username"],
+            "Message": row["message"],
+            "Status": row["status"],
+            "AdditionalData": row["additionaldata"],
+        })
+    return events
+
+
+# This function is used to enrich newly inserted events for the live event stream
+async def enrich_inserted_events(rows: list[dict]) -> list[dict]:
+    """Same mapping as the search endpoints, SQL Server is only queried for IDs missing from the dimension cache"""
+    lookup_failures = dimension_cache.lookup_failures
+    async with sessionmanager.sqlserver_session() as sqlserver_session:
+        events = await _map_event_rows(rows, sqlserver_session)
+    if dimension_cache.lookup_failures != lookup_failures:
+        # The recent events buffer must not keep blank names until its next reload
+        recent_events.mark_stale()
+    return events
+
+
 # This function is used to search the audit events based on request parameters
 async def search_audit_events(
     from_date: Optional[str] = None,
@@ -147,31 +270,98 @@ async def search_audit_events(
     page_size: int = 500,
     company_id: Optional[int] = None,
     session: AsyncSession = None,           # Postgres session
-    sqlserver_session=None                  # SQL Server session (sync)
+    sqlserver_session=None,                 # SQL Server session (async)
+    cursor: Optional[str] = None,
+    use_cursor: bool = False,
+    include_archive: bool = False
+):
+    """
+    Search audit events, repeated searches (paging back and forth, exports of the same search)
+    are answered from the search cache without touching Postgres.
+    """
+    search_params = dict(
+        from_date=from_date,
+        to_date=to_date,
+        functionality=functionality,
+        event_type=event_type,
+        store_id=store_id,
+        user=user,
+        message_pattern=message_pattern,
+        page_number=page_number,
+        page_size=page_size,
+        company_id=company_id,
+        cursor=cursor,
+        use_cursor=use_cursor,
+        include_archive=include_archive
+    )
+    cache_key = search_cache.make_key(**search_params)
+    cached = search_cache.get(cache_key)
+    if cached is not None:
+        logger.info("Search served from the search cache")
+        return cached
+
+    generation = search_cache.generation
+    lookup_failures = dimension_cache.lookup_failures
+    response = await _search_audit_events_uncached(session=session, sqlserver_session=sqlserver_session, **search_params)
+    if dimension_cache.lookup_failures != lookup_failures:
+        # StoreName/CompanyName could not be resolved, do not keep the blanks around
+        return response
+    search_cache.set(cache_key, response, now=datetime.now(CENTRAL_TZ).replace(tzinfo=None), generation=generation)
+    return response
+
+
+# This function is used to run the audit events search against Postgres
+async def _search_audit_events_uncached(
+    from_date: Optional[str] = None,
+    to_date: Optional[str] = None,
+    functionality: Optional[str] = None,
+    event_type: Optional[str] = None,
+    store_id: Optional[int] = None,
+    user: Optional[str] = None,
+    message_pattern: Optional[str] = None,
+    page_number: int = 1,
+    page_size: int = 500,
+    company_id: Optional[int] = None,
+    session: AsyncSession = None,           # Postgres session
+    sqlserver_session=None,                 # SQL Server session (async)
+    cursor: Optional[str] = None,
+    use_cursor: bool = False,
+    include_archive: bool = False
 ):
-    """Execute the GetAuditEvents_Func stored function and enrich with StoreName"""
+    """
+    Execute the GetAuditEvents_Func stored function and enrich with StoreName.
+    When `use_cursor` is set or a `cursor` is given, keyset pagination is used instead of page numbers.
+    `include_archive` also searches AuditEvents_Archival and always uses keyset pagination.
+    """
     try:
         logger.debug(
             "Searching audit events from_date=%s, to_date=%s, functionality=%s, eventtype=%s, "
-            "store_id=%s, user=%s, message_pattern=%s, page_number=%s, page_size=%s, company_id=%s",
+            "store_id=%s, user=%s, message_pattern=%s, page_number=%s, page_size=%s, company_id=%s, cursor=%s",
             from_date, to_date, functionality, event_type,
             store_id, user, message_pattern,
-            page_number, page_size, company_id
+            page_number, page_size, company_id, cursor
         )
 
-        # Call the stored function to search audit events
-        stored_function = text("""
-            SELECT * FROM GetAuditEvents_Func(
-                :from_date,
-                :to_date,
-                :functionality,
-                :eventtype,
-                :store_id,
-                :user,
-                :message_pattern,
-                :company_id
+        if use_cursor or cursor or include_archive:
+            return await _search_audit_events_by_cursor(
+                from_date=from_date,
+                to_date=to_date,
+                functionality=functionality,
+                event_type=event_type,
+                store_id=store_id,
+                user=user,
+                message_pattern=message_pattern,
+                company_id=company_id,
+                cursor=cursor,
+                page_size=page_size,
+                session=session,
+                sqlserver_session=sqlserver_session,
+                include_archive=include_archive
             )
-        """)
+
+        # Call the stored function to search audit events, it returns only the requested page
+        # along with the total match count so the full match set never leaves the database
+        stored_function = PAGED_SEARCH_QUERY
 
         params = {
             "from_date": from_date,
@@ -181,15 +371,19 @@ async def search_audit_events(
             "store_id": store_id,
             "user": user,
             "message_pattern": message_pattern,
-            "company_id": company_id
+            "company_id": company_id,
+            "page_number": page_number,
+            "page_size": page_size
         }
 
         result = await session.execute(stored_function, params)
-        results = result.mappings().all()
-        total_count = len(results)
-        logger.info(f"Search completed successfully. Total rows fetched: {total_count}")
+        rows = result.mappings().all()
+        total_count = rows[0]["totalcount"] if rows else 0
+        # An empty page comes back as a single row carrying only the total count
+        paged_results = [row for row in rows if row["id"] is not None]
+        logger.info(f"Search completed successfully. Total matches: {total_count}, rows fetched: {len(paged_results)}")
 
-        if not results:
+        if not total_count:
             return {
                 "StatusCode": 200,
                 "message": "No audit events found",
@@ -200,58 +394,8 @@ async def search_audit_events(
                 "events": []
             }
 
-        # Manual pagination
-        start = (page_number - 1) * page_size
-        end = start + page_size
-        paged_results = results[start:end]
-
-        # Cache for already fetched StoreNames (only for valid store IDs)
-        store_cache = {}
-        
-        company_cache = {}  # cache to avoid repeated SQL Server lookups
-
-        # Format timestamp, map rows, and fetch StoreName from SQL Server
-        events = []
-        for row in paged_results:
-            ts = row["eventtimestamp"]
-            formatted_ts = ts.strftime("%m-%d-%Y %H:%M:%S") if ts else None
-
-            store_location_id = row["storelocationid"]
-            company_id = row["companyid"]
-
-            # Handle null store_location_id
-            store_name = None
-            if store_location_id is not None:
-                # Fetch StoreName using cache only for valid store IDs
-                if store_location_id in store_cache:
-                    store_name = store_cache[store_location_id]
-                else:
-                    store_name = get_store_name(store_location_id, sqlserver_session)
-                    store_cache[store_location_id] = store_name
-            else:
-                logger.debug("storelocationid is None, skipping StoreName...")
-                
-            # Fetch CompanyName with caching
-            if company_id in company_cache:
-                company_name = company_cache[company_id]
-            else:
-                company_name = get_company_name(company_id, sqlserver_session)
-                company_cache[company_id] = company_name
-
-            events.append({
-                "Id": row["id"],
-                "EventTimestamp": formatted_ts,
-                "Functionality": row["functionality"],
-                "EventType": row["eventtype"],
-                "StoreLocationID": store_location_id,
-                "StoreName": store_name,  # This will be None when store_location_id is None
-                "CompanyId": row["companyid"],
-                "CompanyName": company_name,
-                "UserName": row["username"],
-                "Message": row["message"],
-                "Status": row["status"],
-                "AdditionalData": row["additionaldata"],
-            })
+        # Format timestamp, map rows, and fetch StoreName/CompanyName from SQL Server
+        events = await _map_event_rows(paged_results, sqlserver_session)
 
         total_pages = (total_count + page_size - 1) // page_size
 
@@ -280,22 +424,183 @@ async def search_audit_events(
             "events": events
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Exception during audit events search:")
         raise HTTPException(status_code=500, detail="Something went wrong")
+
+
+# Search query of the page number pagination
+PAGED_SEARCH_QUERY = text("""
+    SELECT * FROM GetAuditEvents_Func(
+        :from_date,
+        :to_date,
+        :functionality,
+        :eventtype,
+        :store_id,
+        :user,
+        :message_pattern,
+        :company_id,
+        :page_number,
+        :page_size
+    )
+""")
+
+
+# This function is used to build the search query of a keyset pagination stored function
+def _keyset_search_query(function_name: str):
+    return text(f"""
+        SELECT * FROM {function_name}(
+            :from_date,
+            :to_date,
+            :functionality,
+            :eventtype,
+            :store_id,
+            :user,
+            :message_pattern,
+            :company_id,
+            :cursor_timestamp,
+            :cursor_id,
+            :page_size
+        )
+    """)
+
+
+# This function is used to decide whether a search reaches into the archive tier
+def _search_reaches_archive(from_date: Optional[str]) -> bool:
+    """
+    Events before the retention cutoff may have been moved to AuditEvents_Archival.
+    A search whose from_date is on or after the cutoff only needs the live table.
+    """
+    if not from_date:
+        return True
+    try:
+        from_timestamp = datetime.strptime(from_date, "%m-%d-%Y %H:%M:%S")
+    except ValueError:
+        # GetAuditEvents*_Func ignore an unparsable from_date, so the search is unbounded
+        return True
+    return from_timestamp < retention_cutoff(settings.archival_retention_months)
+
+
+# This function is used to read the (EventTimestamp, Id) position out of a search cursor
+def _decode_search_cursor(cursor: Optional[str]) -> tuple:
+    if not cursor:
+        return None, None
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        logger.warning(f"Invalid search cursor received: {cursor}")
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+# This function is used to search the audit events page by page using a keyset cursor
+async def _search_audit_events_by_cursor(
+    from_date: Optional[str],
+    to_date: Optional[str],
+    functionality: Optional[str],
+    event_type: Optional[str],
+    store_id: Optional[int],
+    user: Optional[str],
+    message_pattern: Optional[str],
+    company_id: Optional[int],
+    cursor: Optional[str],
+    page_size: int,
+    session: AsyncSession,
+    sqlserver_session,
+    include_archive: bool = False
+) -> dict:
+    """
+    Execute the GetAuditEventsKeyset_Func stored function, which seeks directly past the
+    (EventTimestamp, Id) encoded in the cursor, so every page costs the same however deep it is.
+    With `include_archive` the archive tier is searched too (GetAuditEventsArchiveKeyset_Func) when the date
+    range reaches before the retention cutoff; both tiers are merged by (EventTimestamp, Id) under one cursor.
+    """
+    cursor_timestamp, cursor_id = _decode_search_cursor(cursor)
+
+    params = {
+        "from_date": from_date,
+        "to_date": to_date,
+        "functionality": functionality,
+        "eventtype": event_type,
+        "store_id": store_id,
+        "user": user,
+        "message_pattern": message_pattern,
+        "company_id": company_id,
+        "cursor_timestamp": cursor_timestamp,
+        "cursor_id": cursor_id,
+        "page_size": page_size + 1  # one extra row tells whether another page exists
+    }
+
+    stored_functions = ["GetAuditEventsKeyset_Func"]
+    if include_archive and _search_reaches_archive(from_date):
+        stored_functions.append("GetAuditEventsArchiveKeyset_Func")
+
+    tiers = []
+    for function_name in stored_functions:
+        result = await session.execute(_keyset_search_query(function_name), params)
+        tiers.append(result.mappings().all())
+
+    if len(tiers) == 1:
+        rows = tiers[0]
+    else:
+        # Each tier is already sorted newest first, merge them and keep the page (+1) of newest rows
+        merged = heapq.merge(*tiers, key=lambda row: (row["eventtimestamp"], row["id"]), reverse=True)
+        rows = list(islice(merged, page_size + 1))
+
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    logger.info(f"Cursor search completed successfully. Tiers: {stored_functions}, rows fetched: {len(rows)}, has_more: {has_more}")
+
+    next_cursor = None
+    if has_more:
+        last_row = rows[-1]
+        next_cursor = encode_cursor(last_row["eventtimestamp"], last_row["id"])
+
+    events = await _map_event_rows(rows, sqlserver_session)
+
+    return {
+        "StatusCode": 200,
+        "message": "Search completed successfully" if events else "No audit events found",
+        "count": len(events),
+        "page_size": page_size,
+        "next_cursor": next_cursor,
+        "events": events
+    }
     
 
+# This function is used to reload the recent events buffer from GetLatestAuditEvents()
+async def reload_recent_events():
+    """Seed/refresh the in-memory buffer behind /audit-events/recent"""
+    recent_events.begin_reload()
+    lookup_failures = dimension_cache.lookup_failures
+    try:
+        async with sessionmanager.postgres_session() as session:
+            rows = (await session.execute(text("SELECT * FROM GetLatestAuditEvents()"))).mappings().all()
+        async with sessionmanager.sqlserver_session() as sqlserver_session:
+            events = await _map_event_rows(rows, sqlserver_session)
+        if dimension_cache.lookup_failures != lookup_failures:
+            raise RuntimeError("StoreName/CompanyName lookup failed, keeping the previous recent events")
+    except Exception:
+        recent_events.abort_reload()
+        raise
+    recent_events.replace(rows, events)
+    logger.info(f"Recent events buffer loaded with {len(rows)} events")
+
+
 # This function is used to fetch recent 500 records
 async def get_recent_events(
     session: AsyncSession,  # Postgres session for audit events
-    sqlserver_session: SqlServerDBSession  # Sync SQL Server session for store details
+    sqlserver_session: SqlServerDBSession  # SQL Server session for store details
 ) -> dict:
     """
-    Fetch the 500 most recent audit events from Postgres
-    and enrich with StoreName from SQL Server.
-    Implements caching for repeated StoreLocationIDs.
+    Fetch the 500 most recent audit events, from the in-memory buffer once it is loaded,
+    otherwise from Postgres enriched with StoreName/CompanyName from SQL Server.
     """
     try:
+        if recent_events.ready:
+            return recent_events.response()
+
         logger.info("Fetching the most recent 500 audit events...")
         query = text("SELECT * FROM GetLatestAuditEvents()")
         result = await session.execute(query)
@@ -304,47 +609,8 @@ async def get_recent_events(
         if not rows:
             return {"StatusCode": 200, "message": "Data not found", "count": 0, "events": []}
 
-        events = []
-        store_cache = {}  # key: StoreLocationID, value: StoreName
-        company_cache = {}  # cache to avoid repeated SQL Server lookups
-
-        for row in rows:
-            event_timestamp = row["eventtimestamp"]
-            formatted_timestamp = (
-                event_timestamp.strftime("%m-%d-%Y %H:%M:%S") if event_timestamp else None
-            )
-
-            store_id = row["storelocationid"]
-            company_id = row["companyid"]
-
-            # Fetch store name from cache if exists, else from SQL Server
-            if store_id in store_cache:
-                store_name = store_cache[store_id]
-            else:
-                store_name = get_store_name(store_id, sqlserver_session)
-                store_cache[store_id] = store_name  # save to cache
-                
-            # Fetch CompanyName with caching
-            if company_id in company_cache:
-                company_name = company_cache[company_id]
-            else:
-                company_name = get_company_name(company_id, sqlserver_session)
-                company_cache[company_id] = company_name
-
-            events.append({
-                "Id": row["id"],
-                "EventTimestamp": formatted_timestamp,
-                "Functionality": row["functionality"],
-                "EventType": row["eventtype"],
-                "StoreLocationID": store_id,
-                "StoreName": store_name,
-                "CompanyId": row["companyid"],
-                "CompanyName": company_name,
-                "UserName": row["username"],
-                "Message": row["message"],
-                "Status": row["status"],
-                "AdditionalData": row["additionaldata"],
-            })
+        # Format timestamps and enrich with StoreName/CompanyName (one bulk lookup per dimension)
+        events = await _map_event_rows(rows, sqlserver_session)
 
         return {
             "StatusCode": 200, 
@@ -358,140 +624,184 @@ async def get_recent_events(
         raise HTTPException(status_code=500, detail="Something went wrong")
 
 
-# This function is used to export the audit events to excel sheet.
-async def export_audit_events_to_excel(search_result: dict, sqlserver_session: SqlServerDBSession):
-    """Convert audit events search or recent results to Excel file"""
+# Columns of the exported files
+EXPORT_COLUMNS = [
+    "ID", "Event Timestamp", "Functionality", "Event Type",
+    "Store Name", "Company Name", "User", "Message", "Status", "Additional Data"
+]
+
+
+# Media type and file extension of every export format
+EXPORT_FORMATS = {
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+# This function is used to get the media type and file extension of an export
+def export_file_type(export_format: str, gzip: bool) -> tuple[str, str]:
+    media_type, extension = EXPORT_FORMATS[export_format]
+    # Parquet compresses its column chunks with gzip instead of being wrapped
+    if gzip and export_format != "parquet":
+        return "application/gzip", f"{extension}.gz"
+    return media_type, extension
+
+
+# This function is used to map an enriched event to an export row (EXPORT_COLUMNS order)
+def _export_row(event: dict) -> list:
+    additional_data = event.get("AdditionalData")
+    return [
+        event.get("Id"),
+        event.get("EventTimestamp"),
+        event.get("Functionality"),
+        event.get("EventType"),
+        event.get("StoreName"),
+        event.get("CompanyName"),
+        event.get("UserName"),
+        event.get("Message"),
+        event.get("Status"),
+        json.dumps(additional_data) if additional_data else None,
+    ]
+
+
+# This function is used to read the events of an export chunk by chunk
+async def _iter_export_events(recent: bool, search_params: dict) -> AsyncIterator[list[dict]]:
+    """
+    Yield the exported events (same shape as the search/recent responses) in batches of at most
+    EXPORT_CHUNK_ROWS. Single tier searches are read from a server side cursor and enriched batch by batch;
+    recent events, cached searches and archive searches are already bounded pages and come in one batch.
+    The sessions are opened here because the response body is streamed after the request has returned.
+    """
+    if recent:
+        if recent_events.ready:
+            yield recent_events.response()["events"]
+            return
+        async with sessionmanager.postgres_session() as session, sessionmanager.sqlserver_session() as sqlserver_session:
+            yield (await get_recent_events(session=session, sqlserver_session=sqlserver_session))["events"]
+        return
+
+    cached = search_cache.get(search_cache.make_key(**search_params))
+    if cached is not None:
+        logger.info("Export served from the search cache")
+        yield cached["events"]
+        return
+
+    keyset = search_params["use_cursor"] or search_params["cursor"] or search_params["include_archive"]
+    if keyset and search_params["include_archive"] and _search_reaches_archive(search_params["from_date"]):
+        # Both tiers are merged in memory by the cursor search, one page at most
+        async with sessionmanager.postgres_session() as session, sessionmanager.sqlserver_session() as sqlserver_session:
+            yield (await _search_audit_events_uncached(session=session, sqlserver_session=sqlserver_session, **search_params))["events"]
+        return
+
+    params = {
+        "from_date": search_params["from_date"],
+        "to_date": search_params["to_date"],
+        "functionality": search_params["functionality"],
+        "eventtype": search_params["event_type"],
+        "store_id": search_params["store_id"],
+        "user": search_params["user"],
+        "message_pattern": search_params["message_pattern"],
+        "company_id": search_params["company_id"],
+        "page_size": search_params["page_size"],
+    }
+    if keyset:
+        params["cursor_timestamp"], params["cursor_id"] = _decode_search_cursor(search_params["cursor"])
+        stored_function = _keyset_search_query("GetAuditEventsKeyset_Func")
+    else:
+        params["page_number"] = search_params["page_number"]
+        stored_function = PAGED_SEARCH_QUERY
+
+    exported = 0
+    async with sessionmanager.postgres_session() as session, sessionmanager.sqlserver_session() as sqlserver_session:
+        result = await session.stream(stored_function, params)
+        try:
+            async for partition in result.mappings().partitions(settings.export_chunk_rows):
+                # An empty page comes back as a single row carrying only the total count
+                rows = [row for row in partition if row["id"] is not None]
+                if rows:
+                    exported += len(rows)
+                    yield await _map_event_rows(rows, sqlserver_session)
+        finally:
+            # Release the server side cursor before the connection goes back to the pool
+            await result.close()
+    logger.info(f"Export read {exported} events from the database")
+
+
+# This function is used to create the file writer of an export format
+def _export_writer(export_format: str, gzip: bool):
+    """Returns (writer, event -> row mapper), raises 400 for a combination that cannot be produced"""
+    if export_format == "xlsx":
+        if gzip:
+            raise HTTPException(status_code=400, detail="gzip is not supported for xlsx, the file is already compressed")
+        writer = XlsxStreamWriter(EXPORT_COLUMNS, sheet_name="Audit Events", width_sample_rows=settings.export_chunk_rows)
+        return writer, _export_row
+    if export_format == "parquet":
+        writer = ParquetStreamWriter(EXPORT_COLUMNS, int_columns=["ID"], compression="gzip" if gzip else "snappy")
+        return writer, _export_row
+
+    if export_format == "csv":
+        writer, to_row = CsvStreamWriter(EXPORT_COLUMNS), _export_row
+    else:
+        # NDJSON keeps the API event shape, AdditionalData stays a nested object
+        writer, to_row = NdjsonStreamWriter(), dict
+    if gzip:
+        writer = GzipStreamWriter(writer)
+    return writer, to_row
+
+
+# This function is used to write the exported events as file chunks
+async def _export_chunks(event_batches: AsyncIterator[list[dict]], writer, to_row, export_format: str) -> AsyncIterator[bytes]:
     try:
-        # Extract events from search result
-        events = search_result.get("events", [])
-        event_count = len(events)
-        logger.debug(f"Events to export: {events}")
-        
-        logger.info(f"Starting Excel export for {event_count} audit events")
-        
-        store_cache = {}  # cache to avoid repeated SQL Server lookups
-        
-        company_cache = {}  # cache to avoid repeated SQL Server lookups
-        
-        # Handle no events case by creating an empty DataFrame with headers
-        if not events:
-            logger.warning("No events found for Excel export - creating empty template")
-            df = pd.DataFrame(columns=[
-                "ID", "Event Timestamp", "Functionality", "Event Type", 
-                "Store Name", "Company Name", "User", "Message", "Status", "Additional Data"
-            ])
-            
-        # Process events and convert timestamps
-        else:
-            logger.debug(f"Processing {event_count} events for Excel conversion")
-            data = []
-            for event in events:
-                # Handle both dicts and objects
-                if isinstance(event, dict):
-                    event_id = event.get("Id") or event.get("id")
-                    ts = event.get("EventTimestamp") or event.get("event_timestamp")
-                    functionality = event.get("Functionality") or event.get("functionality")
-                    event_type = event.get("EventType") or event.get("event_type")
-                    store_id = event.get("StoreLocationID") or event.get("store_id")
-                    company_id = event.get("CompanyId") or event.get("company_id")
-                    user = event.get("UserName") or event.get("user")
-                    message = event.get("Message") or event.get("message")
-                    status = event.get("Status") or event.get("status")
-                    additional_data = event.get("AdditionalData") or event.get("additional_data")
-                else:
-                    # Pydantic model
-                    event_id = event.Id
-                    ts = event.EventTimestamp
-                    functionality = event.Functionality
-                    event_type = event.EventType
-                    store_id = event.StoreLocationID
-                    company_id = event.CompanyId
-                    user = event.UserName
-                    message = event.Message
-                    status = event.Status
-                    additional_data = event.AdditionalData
-                
-                # Handle and format EventTimestamp (handles both datetime and string)
-                if ts:
-                    if hasattr(ts, "strftime"):
-                        timestamp_str = ts.strftime("%m-%d-%Y %H:%M:%S")
-                    else:
-                        try:
-                            # Parse from "mmddyy hhmmss" format used in get_recent_events()
-                            parsed_ts = datetime.strptime(ts, "%m%d%y %H%M%S")
-                            timestamp_str = parsed_ts.strftime("%m-%d-%Y %H:%M:%S")
-                        except Exception:
-                            timestamp_str = ts  # fallback to raw string if parsing fails
-                else:
-                    timestamp_str = None
-                    
-                # Fetch StoreLocationName with caching
-                if store_id in store_cache:
-                    store_name = store_cache[store_id]
-                else:
-                    store_name = get_store_name(store_id, sqlserver_session)
-                    store_cache[store_id] = store_name
-                    
-                # Fetch CompanyName with caching
-                if company_id in company_cache:
-                    company_name = company_cache[company_id]
-                else:
-                    company_name = get_company_name(company_id, sqlserver_session)
-                    company_cache[company_id] = company_name
-                
-                # Append processed row
-                data.append({
-                    "ID": event_id,
-                    "Event Timestamp": timestamp_str,
-                    "Functionality": functionality,
-                    "Event Type": event_type,
-                    # "Store ID": store_id,
-                    "Store Name": store_name,
-                    # "Company ID": company_id,
-                    "Company Name": company_name,
-                    "User": user,
-                    "Message": message,
-                    "Status": status,
-                    "Additional Data": json.dumps(additional_data) if additional_data else None
-                })
-            
-            # Create DataFrame
-            df = pd.DataFrame(data)
-            logger.debug("DataFrame created successfully with formatted timestamp strings")
-        
-        # Save Excel to memory
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='Audit Events', index=False)
-            
-            # Auto-adjust column widths
-            worksheet = writer.sheets['Audit Events']
-            
-            # Making header as bold
-            header_font = Font(bold=True)
-            for cell in next(worksheet.iter_rows(min_row=1, max_row=1)):
-                cell.font = header_font
-            
-            # Auto-adjust the column widths
-            for column in worksheet.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if cell.value and len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except Exception:
-                        pass
-                adjusted_width = min(max_length + 2, 50)
-                worksheet.column_dimensions[column_letter].width = adjusted_width
-        
-        logger.info(f"Excel export done. File size={len(output.getvalue())} bytes")
-        return output.getvalue()
-        
+        async for events in event_batches:
+            chunk = writer.write_rows(to_row(event) for event in events)
+            if chunk:
+                yield chunk
+    finally:
+        # Closes the result stream and releases the database sessions, also when the download is abandoned
+        await event_batches.aclose()
+    yield writer.close()
+    logger.info(f"Export done. Format={export_format}, rows={writer.rows_written}")
+
+
+# This function is used to keep streaming an export once its first chunk was produced
+async def _continue_export(first_chunk: bytes, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    try:
+        yield first_chunk
+        async for chunk in chunks:
+            yield chunk
+    except Exception:
+        # The response has started, the client sees a truncated download
+        logger.exception("Error while streaming the export:")
+        raise
+    finally:
+        # A client disconnect closes this generator, pass it on so the connections go back to the pool
+        await chunks.aclose()
+
+
+# This function is used to export the audit events to a file.
+async def export_audit_events(recent: bool, search_params: dict, export_format: str = "xlsx",
+                              gzip: bool = False) -> AsyncIterator[bytes]:
+    """
+    Stream recent events or search results (search_audit_events parameters) as an xlsx, csv, ndjson or
+    parquet file, csv and ndjson optionally gzipped. Rows are read, enriched and written chunk by chunk,
+    memory stays flat however many rows are exported.
+    The first chunk is produced before returning, so a failing query still turns into an HTTP error.
+    """
+    writer, to_row = _export_writer(export_format, gzip)
+    chunks = _export_chunks(_iter_export_events(recent, search_params), writer, to_row, export_format)
+    try:
+        first_chunk = await anext(chunks)
+    except HTTPException:
+        await chunks.aclose()
+        raise
     except Exception as e:
-        logger.exception("Error creating Excel file:")
+        await chunks.aclose()
+        logger.exception(f"Error creating {export_format} export:")
         raise HTTPException(status_code=500, detail="Something went wrong")
-    
+    return _continue_export(first_chunk, chunks)
+
 
 # This function is used to fetch the event type names based on functionality name
 async def get_eventtypenames_by_functionalityname(functionalityname: str, session: AsyncSession) -> dict:
@@ -593,7 +903,7 @@ async def get_all_auditfunctionalities(session: AsyncSession) -> dict:
     
 
 # This function is used to get all the companies.
-async def get_all_companies(session) -> dict:
+async def get_all_companies(session: AsyncSession) -> dict:
     """
     Fetch all companies from the company table.
     """
@@ -602,7 +912,7 @@ async def get_all_companies(session) -> dict:
 
         # Query to get all companies
         query = select(company_models.Company).order_by(company_models.Company.CompanyName)
-        result = session.execute(query)
+        result = await session.execute(query)
 
         # Convert to dict-like rows (so we can access by column name)
         rows = result.scalars().all()
@@ -640,7 +950,7 @@ async def get_all_companies(session) -> dict:
     
 
 # This function is used to get all store locations for a given company.
-async def get_store_locations_by_company(company_id: int, session) -> dict:
+async def get_store_locations_by_company(company_id: int, session: AsyncSession) -> dict:
     """
     Fetch all store locations for a given company from the storelocation table.
     """
@@ -651,7 +961,7 @@ async def get_store_locations_by_company(company_id: int, session) -> dict:
         query = select(store_location_models.StoreLocation).where(
             store_location_models.StoreLocation.CompanyID == company_id
         ).order_by(store_location_models.StoreLocation.StoreName)
-        result = session.execute(query)
+        result = await session.execute(query)
 
         # Convert to dict-like rows (so we can access by column name)
         rows = result.scalars().all()
@@ -0,0 +1,168 @@
+from datetime import datetime
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.configurations.settings import Settings
+from app.configurations.db_session_manager import sessionmanager
+from app.db_models import company_models, store_location_models
+from app.utils.logger import get_logger
+
+settings = Settings()
+logger = get_logger(__name__)
+
+# SQL Server accepts at most 2100 parameters per statement, so IN lists are sent in chunks of this size
+SQLSERVER_IN_CHUNK_SIZE = 1000
+
+
+def _chunked(values: list, size: int):
+    for index in range(0, len(values), size):
+        yield values[index:index + size]
+
+
+# This function is used to fetch the storelocationnames from sqlserver for a set of storelocationids
+async def get_store_names(store_ids, session: AsyncSession) -> dict:
+    """
+    Fetch StoreName for many StoreLocationIDs with one IN query per chunk.
+    Returns a StoreLocationID -> StoreName map, unknown IDs are left out. Raises when SQL Server fails.
+    """
+    ids = sorted({store_id for store_id in store_ids if store_id is not None})
+    store_names = {}
+    if not ids:
+        return store_names
+
+    try:
+        logger.info(f"Fetching StoreNames for {len(ids)} storelocationids")
+        for chunk in _chunked(ids, SQLSERVER_IN_CHUNK_SIZE):
+            rows = await session.execute(
+                select(store_location_models.StoreLocation.StoreLocationID, store_location_models.StoreLocation.StoreName)
+                .where(store_location_models.StoreLocation.StoreLocationID.in_(chunk))
+            )
+            store_names.update({row.StoreLocationID: row.StoreName for row in rows})
+        logger.debug(f"Resolved {len(store_names)} of {len(ids)} StoreNames")
+    except Exception as e:
+        logger.exception(f"Error fetching StoreNames for StoreLocationIDs={ids}: {e}")
+        raise
+    return store_names
+
+# This function is used to fetch the companynames from sqlserver for a set of companyids
+async def get_company_names(company_ids, session: AsyncSession) -> dict:
+    """
+    Fetch CompanyName for many CompanyIDs with one IN query per chunk.
+    Returns a CompanyID -> CompanyName map, unknown IDs are left out. Raises when SQL Server fails.
+    """
+    ids = sorted({company_id for company_id in company_ids if company_id is not None})
+    company_names = {}
+    if not ids:
+        return company_names
+
+    try:
+        logger.info(f"Fetching CompanyNames for {len(ids)} companyids")
+        for chunk in _chunked(ids, SQLSERVER_IN_CHUNK_SIZE):
+            rows = await session.execute(
+                select(company_models.Company.CompanyID, company_models.Company.CompanyName)
+                .where(company_models.Company.CompanyID.in_(chunk))
+            )
+            company_names.update({row.CompanyID: row.CompanyName for row in rows})
+        logger.debug(f"Resolved {len(company_names)} of {len(ids)} CompanyNames")
+    except Exception as e:
+        logger.exception(f"Error fetching CompanyNames for CompanyIDs={ids}: {e}")
+        raise
+    return company_names
+
+
+class DimensionCache:
+    """
+    Process-level StoreLocationID -> StoreName and CompanyID -> CompanyName maps.
+    Loaded at startup and reloaded in the background; each reload builds new maps and swaps them in,
+    so readers never see a half-loaded map. Each map holds at most `max_entries` IDs (newest IDs win),
+    IDs missing from the maps are resolved in bulk from SQL Server and remembered while there is room.
+    When that lookup fails the names come back as None but nothing is remembered, and `lookup_failures`
+    is bumped so callers can tell a degraded result from a complete one (and not cache it).
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._store_names: dict = {}
+        self._company_names: dict = {}
+        self.loaded_at = None
+        self.hits = 0
+        self.misses = 0
+        self.lookup_failures = 0
+
+    async def load(self, session: AsyncSession):
+        """Reload both maps from SQL Server"""
+        store_rows = (await session.execute(
+            select(store_location_models.StoreLocation.StoreLocationID, store_location_models.StoreLocation.StoreName)
+            .order_by(store_location_models.StoreLocation.StoreLocationID.desc())
+            .limit(self.max_entries)
+        )).all()
+        company_rows = (await session.execute(
+            select(company_models.Company.CompanyID, company_models.Company.CompanyName)
+            .order_by(company_models.Company.CompanyID.desc())
+            .limit(self.max_entries)
+        )).all()
+
+        self._store_names = {row.StoreLocationID: row.StoreName for row in store_rows}
+        self._company_names = {row.CompanyID: row.CompanyName for row in company_rows}
+        self.loaded_at = datetime.now()
+
+        if len(store_rows) >= self.max_entries or len(company_rows) >= self.max_entries:
+            logger.warning(f"Dimension cache is full ({self.max_entries} entries), older IDs will be looked up on demand")
+        logger.info(f"Dimension cache loaded: {len(self._store_names)} stores, {len(self._company_names)} companies")
+
+    async def refresh(self):
+        """Reload the maps with a session of its own (used at startup and by the background task)"""
+        async with sessionmanager.sqlserver_session() as session:
+            await self.load(session)
+
+    async def resolve(self, store_ids, company_ids, session: AsyncSession) -> tuple[dict, dict]:
+        """
+        Return (StoreLocationID -> StoreName, CompanyID -> CompanyName) for the given IDs.
+        Only IDs missing from the cache cost a (bulk) SQL Server query.
+        """
+        store_names = await self._lookup(self._store_names, store_ids, get_store_names, session)
+        company_names = await self._lookup(self._company_names, company_ids, get_company_names, session)
+        return store_names, company_names
+
+    async def _lookup(self, cache: dict, ids, fetch_names, session: AsyncSession) -> dict:
+        names = {}
+        missing = set()
+        for id_ in ids:
+            if id_ is None or id_ in names:
+                continue
+            if id_ in cache:
+                names[id_] = cache[id_]
+            else:
+                missing.add(id_)
+        self.hits += len(names)
+        self.misses += len(missing)
+
+        if missing:
+            try:
+                fetched = await fetch_names(missing, session)
+            except Exception:
+                # Served without names this once, the IDs are looked up again on the next request
+                self.lookup_failures += 1
+                names.update(dict.fromkeys(missing))
+                return names
+            for id_ in missing:
+                name = fetched.get(id_)
+                names[id_] = name
+                # IDs the query confirmed unknown are remembered as None too, until the next reload
+                if len(cache) < self.max_entries:
+                    cache[id_] = name
+        return names
+
+    def stats(self) -> dict:
+        return {
+            "stores": len(self._store_names),
+            "companies": len(self._company_names),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "lookup_failures": self.lookup_failures,
+            "loaded_at": self.loaded_at,
+        }
+
+
+# Global cache instance, loaded and refreshed from the FastAPI lifespan (app/main.py)
+dimension_cache = DimensionCache(max_entries=settings.dimension_cache_max_entries)
@@ -0,0 +1,189 @@
+import asyncio
+import json
+import time
+from typing import AsyncIterator, Awaitable, Callable, Optional
+from app.configurations.settings import Settings
+from app.utils.logger import get_logger
+
+settings = Settings()
+logger = get_logger(__name__)
+
+# Raw insert batches waiting for enrichment, older batches are dropped when the worker falls behind
+PENDING_BATCHES_MAX = 1000
+
+
+class StreamFullError(Exception):
+    """Raised when the maximum number of stream subscribers is connected"""
+
+
+class EventBroadcaster:
+    """
+    Fans newly inserted audit events out to the connected /audit-events/stream (SSE) clients and to the
+    in-process listeners (e.g. the recent events buffer). Inserts hand their rows to `publish` (no-op while
+    nobody listens); one background worker enriches each batch once (StoreName/CompanyName from the
+    dimension cache), calls the listeners, serializes every event once and puts the same SSE frame on
+    every subscriber queue. A client whose queue is full is disconnected instead of
+    slowing everyone down; the browser EventSource reconnects on its own.
+    """
+
+    def __init__(self, max_subscribers: int, client_queue_size: int, heartbeat_seconds: float):
+        self.max_subscribers = max_subscribers
+        self.client_queue_size = client_queue_size
+        self.heartbeat_seconds = heartbeat_seconds
+        self._subscribers: set = set()
+        self._pending: asyncio.Queue = asyncio.Queue(maxsize=PENDING_BATCHES_MAX)
+        self._enrich: Optional[Callable[[list], Awaitable[list]]] = None
+        self._listeners: list = []
+        self._task: Optional[asyncio.Task] = None
+        # metrics
+        self.published = 0
+        self.delivered = 0
+        self.dropped_batches = 0
+        self.dropped_clients = 0
+        self.last_error = None
+
+    def start(self, enrich: Callable[[list], Awaitable[list]]):
+        """Start the fan-out worker, `enrich` maps raw event rows to the API event format"""
+        self._enrich = enrich
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="event-broadcaster")
+            logger.info("Event broadcaster started")
+
+    def add_listener(self, listener: Callable[[list, list], None], on_missed: Optional[Callable[[], None]] = None):
+        """
+        `listener(rows, events)` is called with every enriched batch, `on_missed()` when a batch could not
+        be handed to it (dropped, enrichment or the listener failed)
+        """
+        self._listeners.append((listener, on_missed))
+
+    def _missed(self, listeners: Optional[list] = None):
+        for _, on_missed in listeners if listeners is not None else self._listeners:
+            if on_missed is not None:
+                on_missed()
+
+    async def stop(self):
+        for queue in list(self._subscribers):
+            self._disconnect(queue)
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            logger.info("Event broadcaster stopped")
+
+    def publish(self, rows: list):
+        """Queue committed event rows (GetAuditEvents_Func shape) for the stream subscribers"""
+        if not (self._subscribers or self._listeners) or self._task is None:
+            return
+        try:
+            self._pending.put_nowait(rows)
+        except asyncio.QueueFull:
+            self.dropped_batches += 1
+            self._missed()
+
+    def subscribe(self) -> asyncio.Queue:
+        if len(self._subscribers) >= self.max_subscribers:
+            raise StreamFullError(f"{self.max_subscribers} stream clients already connected")
+        queue = asyncio.Queue(maxsize=self.client_queue_size)
+        self._subscribers.add(queue)
+        logger.info(f"Event stream client connected ({len(self._subscribers)} connected)")
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        if queue in self._subscribers:
+            self._subscribers.discard(queue)
+            logger.info(f"Event stream client disconnected ({len(self._subscribers)} connected)")
+
+    def _disconnect(self, queue: asyncio.Queue):
+        """Drop what is queued for a client and tell its stream to end"""
+        self._subscribers.discard(queue)
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+
+    async def stream(self, queue: asyncio.Queue, expires_at: Optional[float] = None) -> AsyncIterator[str]:
+        """
+        SSE frames for one subscriber, a comment line is sent as heartbeat while no event arrives.
+        At `expires_at` (epoch seconds, the exp of the client's token) a `session-expired` event is sent and
+        the stream ends, the client needs a new ticket to reconnect.
+        """
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                timeout = self.heartbeat_seconds
+                if expires_at is not None:
+                    remaining = expires_at - time.time()
+                    if remaining <= 0:
+                        yield "event: session-expired\ndata: {}\n\n"
+                        break
+                    timeout = min(timeout, remaining)
+                try:
+                    frame = await asyncio.wait_for(queue.get(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    if expires_at is None or expires_at > time.time():
+                        yield ": keep-alive\n\n"
+                    continue
+                if frame is None:
+                    break
+                yield frame
+        finally:
+            self.unsubscribe(queue)
+
+    async def _run(self):
+        while True:
+            rows = await self._pending.get()
+            if not (self._subscribers or self._listeners):
+                continue
+            try:
+                events = await self._enrich(rows)
+            except Exception as e:
+                self.last_error = str(e)
+                logger.exception("Event stream enrichment failed:")
+                self._missed()
+                continue
+
+            for entry in self._listeners:
+                try:
+                    entry[0](rows, events)
+                except Exception:
+                    logger.exception("Event listener failed:")
+                    self._missed([entry])
+            if not self._subscribers:
+                continue
+
+            # Serialized once, the same frames go to every client
+            frames = "".join(
+                f"id: {event['Id']}\nevent: audit-event\ndata: {json.dumps(event, default=str)}\n\n"
+                for event in events
+            )
+            self.published += len(events)
+            for queue in list(self._subscribers):
+                try:
+                    queue.put_nowait(frames)
+                    self.delivered += len(events)
+                except asyncio.QueueFull:
+                    self.dropped_clients += 1
+                    logger.warning("Event stream client too slow, disconnecting it")
+                    self._disconnect(queue)
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self._subscribers),
+            "max_subscribers": self.max_subscribers,
+            "pending_batches": self._pending.qsize(),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped_batches": self.dropped_batches,
+            "dropped_clients": self.dropped_clients,
+            "last_error": self.last_error,
+        }
+
+
+# Global broadcaster instance, started/stopped from the FastAPI lifespan (app/main.py)
+event_broadcaster = EventBroadcaster(
+    max_subscribers=settings.event_stream_max_subscribers,
+    client_queue_size=settings.event_stream_client_queue_size,
+    heartbeat_seconds=settings.event_stream_heartbeat_seconds,
+)
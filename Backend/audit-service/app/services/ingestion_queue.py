@@ -0,0 +1,261 @@
+import asyncio
+import json
+import time
+from datetime import datetime
+from typing import Optional
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.configurations.settings import Settings
+from app.configurations.db_session_manager import sessionmanager
+from app.dtos.audit_req_res import AuditEventCreate, AuditEventBatchCreate
+from app.services import audit_service
+from app.services.lookup_cache import lookup_cache
+from app.utils.logger import get_logger
+
+settings = Settings()
+logger = get_logger(__name__)
+
+
+class IngestionQueue:
+    """
+    Write-behind buffer for /audit-events/create.
+    Accepted events are put on a bounded asyncio queue and a background worker writes them in micro-batches
+    (up to `batch_size` events, or whatever arrived within `flush_interval_seconds` of the first one)
+    with one multi-row INSERT each. A full queue rejects new events so callers can back off.
+    A batch whose INSERT fails is retried before anything else is taken from the queue, with a backoff
+    doubling from `retry_backoff_seconds` up to `retry_backoff_max_seconds`; after `max_attempts` attempts
+    (or when shutdown cuts the retries short) its events are appended to the dead-letter file, one JSON line
+    per event carrying the original create payload, so nothing that was answered 202 is silently lost.
+    An insert in flight at shutdown is allowed to finish, its batch is only dead-lettered if it failed.
+    """
+
+    def __init__(self, enabled: bool, max_size: int, batch_size: int, flush_interval_seconds: float, drain_timeout_seconds: float,
+                 max_attempts: int = 5, retry_backoff_seconds: float = 0.5, retry_backoff_max_seconds: float = 30,
+                 dead_letter_path: str = "ingestion_dead_letter.ndjson"):
+        self.enabled = enabled
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.drain_timeout_seconds = drain_timeout_seconds
+        self.max_attempts = max(1, max_attempts)
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.retry_backoff_max_seconds = retry_backoff_max_seconds
+        self.dead_letter_path = dead_letter_path
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._accepting = False
+        # metrics
+        self.accepted = 0
+        self.rejected = 0
+        self.flushed = 0
+        self.failed = 0
+        self.retries = 0
+        self.dead_lettered = 0
+        self.batches = 0
+        self.last_flush_ms = None
+        self.max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    def start(self):
+        if not self.enabled or self._worker is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._accepting = True
+        self._worker = asyncio.create_task(self._run(), name="audit-ingestion-writer")
+        logger.info(f"Write-behind ingestion started (queue size {self.max_size}, batch size {self.batch_size}, "
+                    f"flush interval {self.flush_interval_seconds}s)")
+
+    async def enqueue(self, event: AuditEventCreate, session: AsyncSession) -> dict:
+        """
+        Accept an event for write-behind insertion.
+        Unknown functionality/event type names are rejected up front (400) like the synchronous path,
+        a full queue is reported as 429 so producers back off and retry.
+        """
+        func_id, event_type_id = (await lookup_cache.resolve([(event.functionality, event.event_type)], session))[(event.functionality, event.event_type)]
+        if not func_id:
+            logger.warning(f"Unknown functionalityname found: {event.functionality}")
+            return {
+                "StatusCode": 400,
+                "message": f"Unknown functionalityname found: {event.functionality}"
+            }
+        if not event_type_id:
+            logger.warning(f"Unknown eventtypename found: {event.event_type}")
+            return {
+                "StatusCode": 400,
+                "message": f"Unknown eventtypename found: {event.event_type}"
+            }
+
+        if not self.submit(event):
+            logger.warning(f"Write-behind queue is full ({self.max_size} events), rejecting audit event")
+            raise HTTPException(status_code=429, detail="Too many audit events queued, retry later", headers={"Retry-After": "1"})
+
+        return {
+            "StatusCode": 202,
+            "message": "Audit event accepted"
+        }
+
+    def submit(self, event: AuditEventCreate) -> bool:
+        """Queue an event for the background writer, returns False when the queue is full or shutting down"""
+        if not self._accepting:
+            self.rejected += 1
+            return False
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            return False
+        self.accepted += 1
+        return True
+
+    async def stop(self):
+        """Stop accepting events, wait for the queued ones to be written, then stop the worker"""
+        if self._worker is None:
+            return
+        self._accepting = False
+        logger.info(f"Draining write-behind queue ({self._queue.qsize()} events)")
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=self.drain_timeout_seconds)
+        except asyncio.TimeoutError:
+            logger.error(f"Write-behind queue not drained within {self.drain_timeout_seconds}s, "
+                         f"{self._queue.qsize()} events go to the dead-letter file")
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        leftover = []
+        while not self._queue.empty():
+            leftover.append(self._queue.get_nowait())
+            self._queue.task_done()
+        if leftover:
+            await self._dead_letter(leftover, "not written before shutdown")
+        logger.info("Write-behind ingestion stopped")
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval_seconds
+            while len(batch) < self.batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await self._flush_with_retry(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _flush_with_retry(self, batch: list):
+        """Retry the batch (ahead of the queued events) until it is written or given up to the dead-letter file"""
+        attempt = 1
+        while True:
+            # Shielded, a shutdown cancel must not cut off an insert that may already be committing
+            flush = asyncio.ensure_future(self._flush(batch))
+            try:
+                written = await asyncio.shield(flush)
+            except asyncio.CancelledError:
+                # Shutdown gave up waiting, let the in-flight insert finish and keep only what it did not write
+                if not await flush:
+                    await self._dead_letter(batch, "not written before shutdown")
+                raise
+            if written:
+                return
+            if attempt >= self.max_attempts:
+                await self._dead_letter(batch, f"insert failed {attempt} times")
+                return
+            backoff = min(self.retry_backoff_seconds * 2 ** (attempt - 1), self.retry_backoff_max_seconds)
+            logger.warning(f"Retrying write-behind flush of {len(batch)} audit events in {backoff}s (attempt {attempt + 1} of {self.max_attempts})")
+            self.retries += 1
+            attempt += 1
+            try:
+                await asyncio.sleep(backoff)
+            except asyncio.CancelledError:
+                # Shutdown gave up waiting for the retries, the last attempt failed
+                await self._dead_letter(batch, "not written before shutdown")
+                raise
+
+    async def _flush(self, batch: list) -> bool:
+        """One insert attempt, False when it failed and can be retried"""
+        started = time.perf_counter()
+        try:
+            async with sessionmanager.postgres_session() as session:
+                # Events were validated when they were accepted, skip re-validation of the wrapper
+                result = await audit_service.insert_audit_events_batch(AuditEventBatchCreate.model_construct(events=batch), session)
+            self.flushed += result["count"]
+            rejected = [batch[item["Index"]] for item in result["Data"] if item["StatusCode"] != 201]
+            if rejected:
+                # Unknown names do not get better with a retry
+                logger.warning(f"Write-behind flush skipped {len(rejected)} events with unknown functionality/event type names")
+                await self._dead_letter(rejected, "unknown functionality/event type name")
+            return True
+        except Exception:
+            logger.exception(f"Write-behind flush of {len(batch)} audit events failed:")
+            return False
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.batches += 1
+            self.last_flush_ms = round(elapsed_ms, 3)
+            self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+            self._total_flush_ms += elapsed_ms
+
+    async def _dead_letter(self, events: list, reason: str):
+        """Append given up events to the dead-letter file, they count as failed from here on"""
+        self.failed += len(events)
+        failed_at = datetime.now().isoformat()
+        lines = "".join(
+            json.dumps({
+                "failed_at": failed_at,
+                "reason": reason,
+                # The create payload as received, ready to be posted again
+                "event": {**event.model_dump(mode="json"), "event_timestamp": event.event_timestamp.isoformat()},
+            }) + "\n"
+            for event in events
+        )
+        try:
+            await asyncio.to_thread(self._append_dead_letter, lines)
+            self.dead_lettered += len(events)
+            logger.error(f"{len(events)} audit events written to {self.dead_letter_path}: {reason}")
+        except Exception:
+            # Last resort, the events are at least in the service log
+            logger.exception(f"Could not write {len(events)} audit events to {self.dead_letter_path} ({reason}):\n{lines}")
+
+    def _append_dead_letter(self, lines: str):
+        with open(self.dead_letter_path, "a", encoding="utf-8") as dead_letter_file:
+            dead_letter_file.write(lines)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_size": self.max_size,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "flushed": self.flushed,
+            "failed": self.failed,
+            "retries": self.retries,
+            "dead_lettered": self.dead_lettered,
+            "batches": self.batches,
+            "last_flush_ms": self.last_flush_ms,
+            "avg_flush_ms": round(self._total_flush_ms / self.batches, 3) if self.batches else None,
+            "max_flush_ms": round(self.max_flush_ms, 3),
+        }
+
+
+# Global queue instance, started and drained from the FastAPI lifespan (app/main.py)
+ingestion_queue = IngestionQueue(
+    enabled=settings.ingestion_write_behind_enabled,
+    max_size=settings.ingestion_queue_max_size,
+    batch_size=settings.ingestion_batch_size,
+    flush_interval_seconds=settings.ingestion_flush_interval_seconds,
+    drain_timeout_seconds=settings.ingestion_drain_timeout_seconds,
+    max_attempts=settings.ingestion_max_attempts,
+    retry_backoff_seconds=settings.ingestion_retry_backoff_seconds,
+    retry_backoff_max_seconds=settings.ingestion_retry_backoff_max_seconds,
+    dead_letter_path=settings.ingestion_dead_letter_path,
+)
@@ -0,0 +1,115 @@
+import asyncio
+import time
+from datetime import datetime
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.configurations.settings import Settings
+from app.configurations.db_session_manager import sessionmanager
+from app.db_models import auditeventtype_models, auditfunctionality_models
+from app.utils.logger import get_logger
+
+settings = Settings()
+logger = get_logger(__name__)
+
+
+class LookupCache:
+    """
+    Process-level functionalityname -> FunctionalityId and eventtypename -> EventTypeId maps.
+    Preloaded at startup, reloaded in the background and reloaded on a miss (at most once every
+    `miss_reload_seconds`, so unknown names sent by a producer cannot trigger a reload per request).
+    """
+
+    def __init__(self, miss_reload_seconds: float):
+        self.miss_reload_seconds = miss_reload_seconds
+        self._functionality_ids: dict = {}
+        self._event_type_ids: dict = {}  # eventtypename -> {functionalityid: eventtypeid}
+        self._lock = asyncio.Lock()
+        self._last_load = 0.0
+        self.loaded_at = None
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+    async def load(self, session: AsyncSession):
+        """Reload both maps from PostgreSQL and swap them in"""
+        func_rows = await session.execute(
+            select(auditfunctionality_models.AuditFunctionality.functionalityname,
+                   auditfunctionality_models.AuditFunctionality.functionalityid)
+        )
+        event_type_rows = await session.execute(
+            select(auditeventtype_models.AuditEventType.eventtypename,
+                   auditeventtype_models.AuditEventType.functionalityid,
+                   auditeventtype_models.AuditEventType.eventtypeid)
+            .order_by(auditeventtype_models.AuditEventType.eventtypeid)
+        )
+
+        functionality_ids = {row.functionalityname: row.functionalityid for row in func_rows}
+        event_type_ids = {}
+        for row in event_type_rows:
+            event_type_ids.setdefault(row.eventtypename, {})[row.functionalityid] = row.eventtypeid
+
+        self._functionality_ids = functionality_ids
+        self._event_type_ids = event_type_ids
+        self._last_load = time.monotonic()
+        self.loaded_at = datetime.now()
+        self.reloads += 1
+        logger.info(f"Lookup cache loaded: {len(functionality_ids)} functionalities, {len(event_type_ids)} event types")
+
+    async def refresh(self):
+        """Reload the maps with a session of its own (used at startup and by the background task)"""
+        async with self._lock:
+            async with sessionmanager.postgres_session() as session:
+                await self.load(session)
+
+    async def resolve(self, pairs, session: AsyncSession) -> dict:
+        """
+        Resolve (functionalityname, eventtypename) pairs to (FunctionalityId, EventTypeId).
+        Unknown names resolve to None. An event type registered under the event's functionality is preferred,
+        like the unique key (functionalityid, eventtypename); otherwise any event type with that name is used.
+        """
+        pairs = set(pairs)
+        resolved = self._resolve_cached(pairs)
+        if any(func_id is None or event_type_id is None for func_id, event_type_id in resolved.values()):
+            if await self._reload_on_miss(session):
+                resolved = self._resolve_cached(pairs)
+
+        misses = sum(1 for func_id, event_type_id in resolved.values() if func_id is None or event_type_id is None)
+        self.misses += misses
+        self.hits += len(resolved) - misses
+        return resolved
+
+    def _resolve_cached(self, pairs) -> dict:
+        resolved = {}
+        for functionality, event_type in pairs:
+            func_id = self._functionality_ids.get(functionality)
+            candidates = self._event_type_ids.get(event_type)
+            event_type_id = None
+            if candidates:
+                event_type_id = candidates.get(func_id, next(iter(candidates.values())))
+            resolved[(functionality, event_type)] = (func_id, event_type_id)
+        return resolved
+
+    async def _reload_on_miss(self, session: AsyncSession) -> bool:
+        if time.monotonic() - self._last_load < self.miss_reload_seconds:
+            return False
+        async with self._lock:
+            # Another request may have reloaded while this one waited for the lock
+            if time.monotonic() - self._last_load < self.miss_reload_seconds:
+                return True
+            logger.debug("Lookup cache miss, reloading functionalities and event types")
+            await self.load(session)
+            return True
+
+    def stats(self) -> dict:
+        return {
+            "functionalities": len(self._functionality_ids),
+            "event_types": len(self._event_type_ids),
+            "hits": self.hits,
+            "misses": self.misses,
+            "reloads": self.reloads,
+            "loaded_at": self.loaded_at,
+        }
+
+
+# Global cache instance, loaded and refreshed from the FastAPI lifespan (app/main.py)
+lookup_cache = LookupCache(miss_reload_seconds=settings.lookup_cache_miss_reload_seconds)
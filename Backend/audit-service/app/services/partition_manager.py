@@ -0,0 +1,109 @@
+import re
+from datetime import datetime
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException
+from app.configurations.settings import Settings
+from app.configurations.db_session_manager import sessionmanager
+from app.utils.logger import get_logger
+
+settings = Settings()
+logger = get_logger(__name__)
+
+# Partition bound expression as returned by pg_get_expr, e.g. FOR VALUES FROM ('2025-09-01 00:00:00') TO ('2025-10-01 00:00:00')
+PARTITION_BOUND_PATTERN = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+PARTITION_STATS_QUERY = text("""
+    SELECT c.relname AS partition_name,
+           pg_get_expr(c.relpartbound, c.oid) AS partition_bound,
+           c.reltuples::BIGINT AS estimated_rows,
+           pg_total_relation_size(c.oid) AS total_bytes
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = 'auditevents'::regclass
+    ORDER BY c.relname
+""")
+
+
+class PartitionManager:
+    """
+    Keeps monthly auditevents partitions created `months_ahead` months in advance, so inserts always land in
+    a real partition and searches keep pruning by EventTimestamp. Runs at startup and from a background task.
+    """
+
+    def __init__(self, months_ahead: int):
+        self.months_ahead = months_ahead
+        self.last_run_at = None
+        self.last_created = None
+        self.last_error = None
+
+    async def ensure_partitions(self):
+        """Create the missing partitions for the current month and the next `months_ahead` months"""
+        try:
+            async with sessionmanager.postgres_session() as session:
+                created = await session.scalar(
+                    text("SELECT ensure_auditevents_partitions(:months_ahead)"),
+                    {"months_ahead": self.months_ahead},
+                )
+                await session.commit()
+            self.last_created = created
+            self.last_error = None
+            if created:
+                logger.info(f"Created {created} auditevents partitions ({self.months_ahead} months ahead)")
+        except Exception as e:
+            self.last_error = str(e)
+            raise
+        finally:
+            self.last_run_at = datetime.now()
+
+    def stats(self) -> dict:
+        return {
+            "months_ahead": self.months_ahead,
+            "last_run_at": self.last_run_at,
+            "last_created": self.last_created,
+            "last_error": self.last_error,
+        }
+
+
+# This function is used to get the auditevents partitions with their bounds, estimated row counts and sizes
+async def get_partition_stats(session: AsyncSession) -> dict:
+    """
+    List the auditevents partitions. Row counts are the planner estimates (pg_class.reltuples),
+    null until the partition has been analyzed; they avoid a full count(*) scan of every partition.
+    """
+    try:
+        result = await session.execute(PARTITION_STATS_QUERY)
+
+        partitions = []
+        for row in result.mappings():
+            match = PARTITION_BOUND_PATTERN.search(row["partition_bound"] or "")
+            partitions.append({
+                "PartitionName": row["partition_name"],
+                "FromDate": match.group(1) if match else None,
+                "ToDate": match.group(2) if match else None,
+                "EstimatedRows": row["estimated_rows"] if row["estimated_rows"] >= 0 else None,
+                "TotalBytes": row["total_bytes"],
+            })
+
+        # Upper bound of the newest partition, inserts at or after it would fail
+        covered_until = max((p["ToDate"] for p in partitions if p["ToDate"]), default=None)
+        logger.debug(f"Found {len(partitions)} auditevents partitions, covered until {covered_until}")
+
+        return {
+            "StatusCode": 200,
+            "message": "Partitions fetched successfully",
+            "count": len(partitions),
+            "Data": {
+                "covered_until": covered_until,
+                "partitions": partitions,
+                "maintenance": partition_manager.stats(),
+            }
+        }
+
+    except Exception as e:
+        logger.exception(f"Error fetching auditevents partitions:")
+        raise HTTPException(status_code=500, detail="Something went wrong")
+
+
+# Global instance, run from the FastAPI lifespan (app/main.py)
+partition_manager = PartitionManager(months_ahead=settings.partition_months_ahead)
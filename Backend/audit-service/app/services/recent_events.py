@@ -0,0 +1,144 @@
+import bisect
+import heapq
+import json
+from collections import deque
+from typing import Optional
+from app.configurations.settings import Settings
+from app.utils.logger import get_logger
+
+settings = Settings()
+logger = get_logger(__name__)
+
+# Row count returned by GetLatestAuditEvents()
+RECENT_EVENTS_LIMIT = 500
+
+
+class RecentEvents:
+    """
+    The newest `max_size` audit events by (EventTimestamp, Id), the same set GetLatestAuditEvents() returns,
+    held in memory so /audit-events/recent needs no database query. Seeded from the database at startup and
+    on every reload, extended with the enriched events of each insert (through the event broadcaster).
+
+    The events sit in a ring buffer (oldest first) together with their JSON, serialized once when they come in.
+    Inserts newer than everything buffered are appended and push the oldest event out; only an insert with
+    an older timestamp (events carry client supplied timestamps) falls back to a sorted insert.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        # ((eventtimestamp, id), event, serialized event), oldest first
+        self._entries: deque = deque(maxlen=max_size)
+        self._payload: Optional[bytes] = None
+        # Inserts seen while a reload query runs, merged into its result so they are not lost
+        self._appended_during_reload = None
+        # An insert batch was missed while the reload ran, its query may not include it
+        self._missed_during_reload = False
+        self.ready = False
+        # metrics
+        self.reloads = 0
+        self.appended = 0
+        self.out_of_order = 0
+        self.served = 0
+
+    @staticmethod
+    def _entries_of(rows: list, events: list) -> list:
+        return sorted(
+            (((row["eventtimestamp"], row["id"]), event, json.dumps(event, default=str))
+             for row, event in zip(rows, events)),
+            key=lambda entry: entry[0]
+        )
+
+    def add(self, rows: list, events: list):
+        """Add newly inserted events (raw rows and their enriched API form, in the same order)"""
+        entries = self._entries_of(rows, events)
+        if self._appended_during_reload is not None:
+            self._appended_during_reload.extend(entries)
+        for entry in entries:
+            if not self._entries or entry[0] > self._entries[-1][0]:
+                self._entries.append(entry)
+            else:
+                self._insert_out_of_order(entry)
+        self._payload = None
+        self.appended += len(entries)
+
+    def _insert_out_of_order(self, entry: tuple):
+        """Sorted insert of an event older than the newest buffered one"""
+        self.out_of_order += 1
+        if len(self._entries) == self.max_size and entry[0] <= self._entries[0][0]:
+            # Older than everything kept, not among the newest events
+            return
+        entries = [current for current in self._entries if current[0][1] != entry[0][1]]
+        bisect.insort(entries, entry, key=lambda current: current[0])
+        self._entries = deque(entries, maxlen=self.max_size)
+
+    def begin_reload(self):
+        self._appended_during_reload = []
+        self._missed_during_reload = False
+
+    def replace(self, rows: list, events: list):
+        """Replace the buffer with a fresh database result, keeping inserts that landed meanwhile"""
+        by_id = {entry[0][1]: entry for entry in self._entries_of(rows, events)}
+        for entry in self._appended_during_reload or []:
+            by_id[entry[0][1]] = entry
+        self._entries = deque(
+            sorted(heapq.nlargest(self.max_size, by_id.values(), key=lambda entry: entry[0]), key=lambda entry: entry[0]),
+            maxlen=self.max_size
+        )
+        self._payload = None
+        self._appended_during_reload = None
+        self.ready = not self._missed_during_reload
+        self.reloads += 1
+
+    def abort_reload(self):
+        self._appended_during_reload = None
+
+    def mark_stale(self):
+        """
+        Stop serving the buffer until the next reload: it took events without StoreName/CompanyName,
+        or an insert batch never reached it
+        """
+        self.ready = False
+        if self._appended_during_reload is not None:
+            self._missed_during_reload = True
+
+    def response(self) -> dict:
+        """Same body as audit_service.get_recent_events"""
+        events = [event for _, event, _ in reversed(self._entries)]
+        if not events:
+            return {"StatusCode": 200, "message": "Data not found", "count": 0, "events": []}
+        return {
+            "StatusCode": 200,
+            "message": "Data fetched successfully",
+            "count": len(events),
+            "events": events
+        }
+
+    def payload(self) -> bytes:
+        """Pre-serialized JSON response, rebuilt only after the buffer changed"""
+        if self._payload is None:
+            if self._entries:
+                # Same JSON as json.dumps(self.response()), from the events serialized when they were added
+                events = ", ".join(serialized for _, _, serialized in reversed(self._entries))
+                self._payload = (
+                    f'{{"StatusCode": 200, "message": "Data fetched successfully", "count": {len(self._entries)}, '
+                    f'"events": [{events}]}}'
+                ).encode("utf-8")
+            else:
+                self._payload = json.dumps(self.response(), default=str).encode("utf-8")
+        self.served += 1
+        return self._payload
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "reloads": self.reloads,
+            "appended": self.appended,
+            "out_of_order": self.out_of_order,
+            "served": self.served,
+        }
+
+
+# Global buffer instance, seeded and reloaded from the FastAPI lifespan (app/main.py) when RECENT_EVENTS_BUFFER_ENABLED
+recent_events = RecentEvents(max_size=RECENT_EVENTS_LIMIT)
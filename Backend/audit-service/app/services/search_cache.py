@@ -0,0 +1,171 @@
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Iterable, Optional
+from app.configurations.settings import Settings
+from app.utils.logger import get_logger
+
+settings = Settings()
+logger = get_logger(__name__)
+
+SEARCH_DATE_FORMAT = "%m-%d-%Y %H:%M:%S"
+
+
+def parse_search_date(value: Optional[str]) -> Optional[datetime]:
+    """Parse a from_date/to_date search parameter, None when missing or unparsable (the search functions ignore it then)"""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value.strip(), SEARCH_DATE_FORMAT)
+    except ValueError:
+        return None
+
+
+def _clean(value):
+    """Blank strings search like no filter at all"""
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    return value
+
+
+def _overlaps(from_timestamp, to_timestamp, earliest, latest) -> bool:
+    """Whether the search window [from, to] meets [earliest, latest], None bounds are open"""
+    return ((from_timestamp is None or latest is None or from_timestamp <= latest)
+            and (to_timestamp is None or earliest is None or to_timestamp >= earliest))
+
+
+class SearchCache:
+    """
+    Bounded LRU cache of search responses keyed by the normalized search parameters.
+    A search whose to_date is in the past (closed range) is kept for `closed_ttl_seconds`, any other search
+    for `open_ttl_seconds`. Every entry remembers its [from_date, to_date] window: inserts landing inside it
+    drop the entry, so a cached page never hides a new event. Timestamps are naive Central Time, like
+    EventTimestamp. `max_entries` of 0 disables the cache.
+    """
+
+    def __init__(self, max_entries: int, closed_ttl_seconds: float, open_ttl_seconds: float):
+        self.max_entries = max_entries
+        self.closed_ttl_seconds = closed_ttl_seconds
+        self.open_ttl_seconds = open_ttl_seconds
+        # key -> (expires_at, from_timestamp, to_timestamp, response)
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        # Bumped by every invalidation; the recent invalidation windows let a search that ran while events
+        # were inserted skip caching only when those events fall into its own window
+        self.generation = 0
+        self._recent_windows = deque(maxlen=256)
+        # metrics
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    @staticmethod
+    def make_key(from_date, to_date, functionality, event_type, store_id, user, message_pattern, company_id,
+                 page_number, page_size, cursor, use_cursor, include_archive) -> tuple:
+        """Equivalent searches map to the same key (parsed dates, trimmed filters, page_number only without a cursor)"""
+        keyset = bool(use_cursor or cursor or include_archive)
+        return (
+            parse_search_date(from_date), parse_search_date(to_date),
+            _clean(functionality), _clean(event_type), store_id, _clean(user), _clean(message_pattern), company_id,
+            None if keyset else page_number, page_size, keyset, cursor or None, bool(include_archive),
+        )
+
+    def get(self, key: tuple) -> Optional[dict]:
+        if not self.enabled:
+            return None
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[3]
+
+    def set(self, key: tuple, response: dict, now: datetime, generation: int):
+        """
+        Cache a search response. `now` is the current naive Central Time used to tell closed ranges,
+        `generation` the value read before the search ran.
+        """
+        if not self.enabled:
+            return
+        from_timestamp, to_timestamp = key[0], key[1]
+        if self._invalidated_since(generation, from_timestamp, to_timestamp):
+            return
+        closed = to_timestamp is not None and to_timestamp < now
+        ttl = self.closed_ttl_seconds if closed else self.open_ttl_seconds
+        if ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, from_timestamp, to_timestamp, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _invalidated_since(self, generation: int, from_timestamp, to_timestamp) -> bool:
+        missed = self.generation - generation
+        if missed <= 0:
+            return False
+        if missed > len(self._recent_windows):
+            return True
+        return any(
+            _overlaps(from_timestamp, to_timestamp, earliest, latest)
+            for earliest, latest in list(self._recent_windows)[-missed:]
+        )
+
+    def invalidate_window(self, timestamps: Iterable[datetime]):
+        """Drop the cached searches whose date window covers any of the inserted event timestamps"""
+        timestamps = [ts for ts in timestamps if ts is not None]
+        if not timestamps:
+            return
+        # One pass over the entries against the span of the inserted events
+        earliest, latest = min(timestamps), max(timestamps)
+        self.generation += 1
+        self._recent_windows.append((earliest, latest))
+        if not self._entries:
+            return
+        stale = [
+            key for key, (_, from_timestamp, to_timestamp, _) in self._entries.items()
+            if _overlaps(from_timestamp, to_timestamp, earliest, latest)
+        ]
+        for key in stale:
+            del self._entries[key]
+        if stale:
+            self.invalidated += len(stale)
+            logger.debug(f"Invalidated {len(stale)} cached searches for inserts between {earliest} and {latest}")
+
+    def clear(self):
+        """Drop every cached search (e.g. after archival moved events between tiers)"""
+        self.generation += 1
+        self._recent_windows.append((None, None))
+        self.invalidated += len(self._entries)
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "closed_ttl_seconds": self.closed_ttl_seconds,
+            "open_ttl_seconds": self.open_ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "invalidated": self.invalidated,
+            "evictions": self.evictions,
+        }
+
+
+# Global cache instance, filled by audit_service.search_audit_events and invalidated by its inserts
+search_cache = SearchCache(
+    max_entries=settings.search_cache_max_entries,
+    closed_ttl_seconds=settings.search_cache_closed_ttl_seconds,
+    open_ttl_seconds=settings.search_cache_open_ttl_seconds,
+)
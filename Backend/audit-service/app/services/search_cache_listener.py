@@ -0,0 +1,116 @@
+import asyncio
+from datetime import datetime
+from typing import Optional
+from sqlalchemy.pool import NullPool
+from app.configurations.dbconfig import get_postgres_async_engine
+from app.configurations.settings import Settings
+from app.services.search_cache import SearchCache, search_cache
+from app.utils.logger import get_logger
+
+settings = Settings()
+logger = get_logger(__name__)
+
+# Channel notified by the trg_auditevents_changed trigger (app/sql/create_tables.sql) and the archival job
+CHANGES_CHANNEL = "auditevents_changed"
+# Payload telling every process to drop all of its cached searches
+CLEAR_PAYLOAD = "clear"
+
+
+class SearchCacheListener:
+    """
+    Keeps the search cache of this process in step with the inserts of every process (other uvicorn workers,
+    replicas, the write-behind queue, the bulk loader): LISTENs on `auditevents_changed` over a dedicated
+    connection and invalidates the window of each notification. Notifications sent while the connection
+    was down are lost, so the cache is cleared every time listening (re)starts.
+    """
+
+    def __init__(self, cache: SearchCache, reconnect_seconds: float, check_seconds: float):
+        self.cache = cache
+        self.reconnect_seconds = reconnect_seconds
+        self.check_seconds = check_seconds
+        self._task: Optional[asyncio.Task] = None
+        self.listening = False
+        # metrics
+        self.notifications = 0
+        self.reconnects = 0
+        self.last_error = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="search-cache-listener")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self._listen()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = str(e)
+                logger.exception("Search cache listener failed:")
+            self.listening = False
+            self.reconnects += 1
+            await asyncio.sleep(self.reconnect_seconds)
+
+    async def _listen(self):
+        engine = get_postgres_async_engine(poolclass=NullPool)
+        try:
+            async with engine.connect() as connection:
+                raw_connection = (await connection.get_raw_connection()).driver_connection
+                closed = asyncio.Event()
+                raw_connection.add_termination_listener(lambda _: closed.set())
+                await raw_connection.add_listener(CHANGES_CHANNEL, self._on_notification)
+                # Whatever was committed before LISTEN took effect was not heard
+                self.cache.clear()
+                self.listening = True
+                logger.info(f"Search cache listening on '{CHANGES_CHANNEL}'")
+                while not closed.is_set():
+                    try:
+                        await asyncio.wait_for(closed.wait(), timeout=self.check_seconds)
+                    except asyncio.TimeoutError:
+                        # A silently dropped connection never reports termination, probe it
+                        await raw_connection.fetchval("SELECT 1", timeout=self.check_seconds)
+                raise ConnectionError("Search cache listener connection closed")
+        finally:
+            await engine.dispose()
+
+    def _on_notification(self, connection, pid, channel, payload: str):
+        self.notifications += 1
+        try:
+            self.apply(payload)
+        except Exception:
+            logger.exception(f"Invalid search cache notification '{payload}', clearing the cache:")
+            self.cache.clear()
+
+    def apply(self, payload: str):
+        """Invalidate what one notification payload ('<earliest>|<latest>' or 'clear') covers"""
+        if payload == CLEAR_PAYLOAD:
+            self.cache.clear()
+            return
+        earliest, latest = payload.split("|")
+        self.cache.invalidate_window([datetime.fromisoformat(earliest), datetime.fromisoformat(latest)])
+
+    def stats(self) -> dict:
+        return {
+            "listening": self.listening,
+            "notifications": self.notifications,
+            "reconnects": self.reconnects,
+            "last_error": self.last_error,
+        }
+
+
+# Global listener instance, started/stopped from the FastAPI lifespan (app/main.py) when the search cache is enabled
+search_cache_listener = SearchCacheListener(
+    search_cache,
+    reconnect_seconds=settings.search_cache_listener_reconnect_seconds,
+    check_seconds=settings.search_cache_listener_check_seconds,
+)
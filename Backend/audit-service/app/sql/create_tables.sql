@@ -58,6 +58,7 @@ PARTITION BY RANGE (EventTimestamp);
 
 -- Indexes
 CREATE INDEX idx_auditevents_timestamp ON auditevents(EventTimestamp DESC);
+CREATE INDEX idx_auditevents_timestamp_id ON auditevents(EventTimestamp DESC, Id DESC);  -- stable search ordering
 CREATE INDEX idx_auditevents_functionalityid ON auditevents(FunctionalityId);
 CREATE INDEX idx_auditevents_storelocationid ON auditevents(StoreLocationID);
 CREATE INDEX idx_auditevents_user ON auditevents(UserName);
@@ -69,9 +70,42 @@ CREATE INDEX idx_auditevents_eventtypeid ON auditevents(EventTypeId);
 -- ------------------------------------------------------------------------
 
 
+-- 3b) Change notifications for the search result caches
+-- Every INSERT or COPY into AuditEvents notifies channel 'auditevents_changed' with the EventTimestamp span of the
+-- statement ('<earliest>|<latest>'), delivered when the transaction commits. Every audit service process listens
+-- (app/services/search_cache_listener.py) and drops its cached searches covering that span, whichever process,
+-- worker or replica inserted the events. The archival job sends 'clear' after moving events.
+CREATE OR REPLACE FUNCTION notify_auditevents_changed()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_earliest TIMESTAMP;
+    v_latest TIMESTAMP;
+BEGIN
+    SELECT min(EventTimestamp), max(EventTimestamp) INTO v_earliest, v_latest FROM inserted_rows;
+    IF v_earliest IS NOT NULL THEN
+        PERFORM pg_notify('auditevents_changed', v_earliest::TEXT || '|' || v_latest::TEXT);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE TRIGGER trg_auditevents_changed
+    AFTER INSERT ON auditevents
+    REFERENCING NEW TABLE AS inserted_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION notify_auditevents_changed();
+
+
 -- 4) Function to ensure partitions exist
-CREATE OR REPLACE FUNCTION ensure_auditevents_partitions()
-RETURNS void LANGUAGE plpgsql AS
+-- Creates the monthly partitions for the current month and the next p_months_ahead months and returns how many
+-- were created. Called at startup and periodically by the audit service (app/services/partition_manager.py).
+-- Partitions inherit the indexes declared on AuditEvents, so no per-partition CREATE INDEX is needed.
+DROP FUNCTION IF EXISTS ensure_auditevents_partitions();
+
+CREATE OR REPLACE FUNCTION ensure_auditevents_partitions(p_months_ahead INT DEFAULT 5)
+RETURNS INT LANGUAGE plpgsql AS
 $$
 DECLARE
     i INT;                              
@@ -80,10 +114,14 @@ DECLARE
     partition_end DATE;                 
     partition_name TEXT;                
     partition_exists BOOLEAN;           
+    created_count INT := 0;
 BEGIN
+    -- Serialize concurrent callers (several service workers start at the same time)
+    PERFORM pg_advisory_xact_lock(hashtext('ensure_auditevents_partitions'));
+
     start_month := date_trunc('month', CURRENT_DATE)::DATE;
 
-    FOR i IN 0..5 LOOP
+    FOR i IN 0..COALESCE(p_months_ahead, 5) LOOP
         partition_start := (start_month + (i * INTERVAL '1 month'))::DATE; 
         partition_end   := (partition_start + INTERVAL '1 month')::DATE;   
         partition_name  := format('auditevents_%s', to_char(partition_start, 'YYYYMM'));
@@ -104,16 +142,13 @@ BEGIN
                  FOR VALUES FROM (%L) TO (%L);',
                 partition_name, partition_start, partition_end
             );
-
-            EXECUTE format('CREATE INDEX ON %I (EventTimestamp DESC);', partition_name);
-            EXECUTE format('CREATE INDEX ON %I (FunctionalityId);', partition_name); -- fixed
-            EXECUTE format('CREATE INDEX ON %I (StoreLocationID);', partition_name);
-            EXECUTE format('CREATE INDEX ON %I (UserName);', partition_name);
-            EXECUTE format('CREATE INDEX ON %I (CompanyId);', partition_name);
+            created_count := created_count + 1;
         ELSE
             RAISE NOTICE 'Partition already exists: %', partition_name;
         END IF;
     END LOOP;
+
+    RETURN created_count;
 END;
 $$;
 
@@ -121,6 +156,46 @@ $$;
 -- select * from ensure_auditevents_partitions();
 
 
+-- 4b) Function to ensure the partitions of a past or future date range exist
+-- Creates the missing monthly partitions covering [p_from, p_to] and returns how many were created.
+-- Used by the bulk loader (app/scripts/bulk_load_audit_events.py) before each COPY, so historical backfills
+-- do not fail on months ensure_auditevents_partitions() never created.
+CREATE OR REPLACE FUNCTION ensure_auditevents_partitions_for_range(p_from TIMESTAMP, p_to TIMESTAMP)
+RETURNS INT LANGUAGE plpgsql AS
+$$
+DECLARE
+    partition_start DATE;
+    partition_end DATE;
+    partition_name TEXT;
+    created_count INT := 0;
+BEGIN
+    -- Same lock as ensure_auditevents_partitions, so both never create the same partition at once
+    PERFORM pg_advisory_xact_lock(hashtext('ensure_auditevents_partitions'));
+
+    partition_start := date_trunc('month', p_from)::DATE;
+    WHILE partition_start <= p_to LOOP
+        partition_end  := (partition_start + INTERVAL '1 month')::DATE;
+        partition_name := format('auditevents_%s', to_char(partition_start, 'YYYYMM'));
+
+        IF NOT EXISTS (SELECT 1 FROM pg_class c WHERE c.relkind = 'r' AND c.relname = partition_name) THEN
+            RAISE NOTICE 'Creating partition: % (from % to %)', partition_name, partition_start, partition_end;
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF AuditEvents
+                 FOR VALUES FROM (%L) TO (%L);',
+                partition_name, partition_start, partition_end
+            );
+            created_count := created_count + 1;
+        END IF;
+        partition_start := partition_end;
+    END LOOP;
+
+    RETURN created_count;
+END;
+$$;
+
+-- select ensure_auditevents_partitions_for_range('2023-01-15', '2023-06-02');
+
+
 /*
 INSERT INTO auditevents (EventTimestamp, FunctionalityID, EventTypeID, StoreLocationID, CompanyId, UserName, Message, Status, AdditionalData) 
 VALUES 
@@ -256,6 +331,7 @@ $$;
 
 
 --7) Procedure to display the data based on parameters which contains top recent 5000 records 
+-- Returns only the requested page (p_PageNumber, p_PageSize) along with the total match count
 DROP FUNCTION IF EXISTS GetAuditEvents_Func;
 
 /*
@@ -318,7 +394,9 @@ CREATE OR REPLACE FUNCTION GetAuditEvents_Func(
     p_StoreLocationID BIGINT DEFAULT NULL,
     p_User VARCHAR(20) DEFAULT NULL,
     p_Message TEXT DEFAULT NULL,
-    p_CompanyId BIGINT DEFAULT NULL
+    p_CompanyId BIGINT DEFAULT NULL,
+    p_PageNumber INT DEFAULT 1,
+    p_PageSize INT DEFAULT 5001
 )
 RETURNS TABLE (
     Id BIGINT,
@@ -330,7 +408,8 @@ RETURNS TABLE (
     UserName VARCHAR(20),
     Message TEXT,
     Status VARCHAR(20),
-    AdditionalData JSONB
+    AdditionalData JSONB,
+    TotalCount BIGINT
 )
 LANGUAGE plpgsql
 AS $$
@@ -356,6 +435,41 @@ BEGIN
     END IF;
 
     RETURN QUERY
+    -- (1) Keys of the newest 5001 matching events only (5001 lets the caller detect the 5000 row search limit)
+    WITH matched AS (
+        SELECT ae.Id AS match_id, ae.EventTimestamp AS match_ts
+        FROM AuditEvents ae
+        INNER JOIN auditfunctionalities af ON ae.FunctionalityId = af.FunctionalityId
+        INNER JOIN auditeventtypes aet ON ae.EventTypeId = aet.EventTypeId
+        WHERE 
+            -- Apply date range dynamically depending on what's provided
+            (v_FromDate IS NULL OR ae.EventTimestamp >= v_FromDate)
+            AND (v_ToDate IS NULL OR ae.EventTimestamp <= v_ToDate)
+
+            -- Apply filters combinationally (AND logic)
+            AND (p_Functionality IS NULL OR af.functionalityname = p_Functionality)
+            AND (p_EventType IS NULL OR aet.eventtypename = p_EventType)
+            AND (p_StoreLocationID IS NULL OR ae.StoreLocationID = p_StoreLocationID)
+            AND (p_User IS NULL OR ae.UserName = p_User)
+            AND (p_Message IS NULL OR ae.Message ILIKE '%' || p_Message || '%')
+            AND (p_CompanyId IS NULL OR ae.CompanyId = p_CompanyId)
+        ORDER BY ae.EventTimestamp DESC, ae.Id DESC
+        LIMIT 5001
+    ),
+    -- (2) Total number of matches (capped at 5001)
+    counted AS (
+        SELECT COUNT(*) AS match_count FROM matched
+    ),
+    -- (3) Keys of the requested page
+    paged AS (
+        SELECT m.match_id, m.match_ts
+        FROM matched m
+        ORDER BY m.match_ts DESC, m.match_id DESC
+        OFFSET (GREATEST(p_PageNumber, 1) - 1) * p_PageSize
+        LIMIT p_PageSize
+    )
+    -- (4) Full rows for the page only. When the page is empty a single row carrying
+    --     only TotalCount is returned, so the caller always gets the count.
     SELECT 
         ae.Id,
         ae.EventTimestamp,
@@ -366,25 +480,14 @@ BEGIN
         ae.UserName,
         ae.Message,
         ae.Status,
-        ae.AdditionalData
-    FROM AuditEvents ae
-    INNER JOIN auditfunctionalities af ON ae.FunctionalityId = af.FunctionalityId
-    INNER JOIN auditeventtypes aet ON ae.EventTypeId = aet.EventTypeId
-    WHERE 
-        -- Apply date range dynamically depending on what's provided
-        (v_FromDate IS NULL OR ae.EventTimestamp >= v_FromDate)
-        AND (v_ToDate IS NULL OR ae.EventTimestamp <= v_ToDate)
-
-        -- Apply filters combinationally (AND logic)
-        AND (p_Functionality IS NULL OR af.functionalityname = p_Functionality)
-        AND (p_EventType IS NULL OR aet.eventtypename = p_EventType)
-        AND (p_StoreLocationID IS NULL OR ae.StoreLocationID = p_StoreLocationID)
-        AND (p_User IS NULL OR ae.UserName = p_User)
-        AND (p_Message IS NULL OR ae.Message ILIKE '%' || p_Message || '%')
-        AND (p_CompanyId IS NULL OR ae.CompanyId = p_CompanyId)
-
-    ORDER BY ae.EventTimestamp DESC
-    LIMIT 5001;
+        ae.AdditionalData,
+        c.match_count AS TotalCount
+    FROM counted c
+    LEFT JOIN paged p ON TRUE
+    LEFT JOIN AuditEvents ae ON ae.Id = p.match_id AND ae.EventTimestamp = p.match_ts
+    LEFT JOIN auditfunctionalities af ON ae.FunctionalityId = af.FunctionalityId
+    LEFT JOIN auditeventtypes aet ON ae.EventTypeId = aet.EventTypeId
+    ORDER BY p.match_ts DESC NULLS LAST, p.match_id DESC;
 END;
 $$;
 
@@ -393,6 +496,9 @@ $$;
 -- With Mandatory Feilds
 SELECT * FROM GetAuditEvents_Func('2025-08-31 23:45:00', '2025-09-05 21:45:00');
 
+-- Second page of 500 rows
+SELECT * FROM GetAuditEvents_Func('08-31-2025 23:45:00', '09-05-2025 21:45:00', p_PageNumber => 2, p_PageSize => 500);
+
 -- With Optional Feilds
 SELECT * 
 FROM GetAuditEvents_Func(
@@ -516,3 +622,196 @@ $$;
 
 -- SELECT * FROM fun_get_eventtypes_by_functionality('Authenticate');
 -- select * from auditeventtypes;
+
+
+-- ----------------------------------------------------------
+--11) Keyset (cursor) search: returns the page of events that sorts right after the given
+--    (EventTimestamp, Id) cursor, seeking through idx_auditevents_timestamp_id instead of
+--    walking every skipped row like OFFSET does. Pass NULL cursor values for the first page.
+CREATE OR REPLACE FUNCTION GetAuditEventsKeyset_Func(
+    p_FromDate TEXT DEFAULT NULL,
+    p_ToDate TEXT DEFAULT NULL,
+    p_Functionality VARCHAR(100) DEFAULT NULL,
+    p_EventType VARCHAR(250) DEFAULT NULL,
+    p_StoreLocationID BIGINT DEFAULT NULL,
+    p_User VARCHAR(20) DEFAULT NULL,
+    p_Message TEXT DEFAULT NULL,
+    p_CompanyId BIGINT DEFAULT NULL,
+    p_CursorTimestamp TIMESTAMP DEFAULT NULL,
+    p_CursorId BIGINT DEFAULT NULL,
+    p_PageSize INT DEFAULT 500
+)
+RETURNS TABLE (
+    Id BIGINT,
+    EventTimestamp TIMESTAMP,
+    Functionality VARCHAR(100),
+    EventType VARCHAR(250),
+    StoreLocationID BIGINT,
+    CompanyId BIGINT,
+    UserName VARCHAR(20),
+    Message TEXT,
+    Status VARCHAR(20),
+    AdditionalData JSONB
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_FromDate TIMESTAMP;
+    v_ToDate   TIMESTAMP;
+    -- A missing cursor means "start from the newest event"
+    v_CursorTimestamp TIMESTAMP := COALESCE(p_CursorTimestamp, 'infinity'::TIMESTAMP);
+    v_CursorId        BIGINT    := COALESCE(p_CursorId, 9223372036854775807);
+BEGIN
+    -- Convert text dates to timestamp if provided
+    IF p_FromDate IS NOT NULL THEN
+        BEGIN
+            v_FromDate := to_timestamp(p_FromDate, 'MM-DD-YYYY HH24:MI:SS');
+        EXCEPTION WHEN others THEN
+            v_FromDate := NULL;
+        END;
+    END IF;
+
+    IF p_ToDate IS NOT NULL THEN
+        BEGIN
+            v_ToDate := to_timestamp(p_ToDate, 'MM-DD-YYYY HH24:MI:SS');
+        EXCEPTION WHEN others THEN
+            v_ToDate := NULL;
+        END;
+    END IF;
+
+    RETURN QUERY
+    SELECT 
+        ae.Id,
+        ae.EventTimestamp,
+        af.functionalityname AS Functionality,
+        aet.eventtypename AS EventType,
+        ae.StoreLocationID,
+        ae.CompanyId,
+        ae.UserName,
+        ae.Message,
+        ae.Status,
+        ae.AdditionalData
+    FROM AuditEvents ae
+    INNER JOIN auditfunctionalities af ON ae.FunctionalityId = af.FunctionalityId
+    INNER JOIN auditeventtypes aet ON ae.EventTypeId = aet.EventTypeId
+    WHERE 
+        -- Seek past the cursor (the plain comparison also lets partitions newer than the cursor be pruned)
+        (ae.EventTimestamp, ae.Id) < (v_CursorTimestamp, v_CursorId)
+        AND ae.EventTimestamp <= v_CursorTimestamp
+
+        -- Apply date range dynamically depending on what's provided
+        AND (v_FromDate IS NULL OR ae.EventTimestamp >= v_FromDate)
+        AND (v_ToDate IS NULL OR ae.EventTimestamp <= v_ToDate)
+
+        -- Apply filters combinationally (AND logic)
+        AND (p_Functionality IS NULL OR af.functionalityname = p_Functionality)
+        AND (p_EventType IS NULL OR aet.eventtypename = p_EventType)
+        AND (p_StoreLocationID IS NULL OR ae.StoreLocationID = p_StoreLocationID)
+        AND (p_User IS NULL OR ae.UserName = p_User)
+        AND (p_Message IS NULL OR ae.Message ILIKE '%' || p_Message || '%')
+        AND (p_CompanyId IS NULL OR ae.CompanyId = p_CompanyId)
+
+    ORDER BY ae.EventTimestamp DESC, ae.Id DESC
+    LIMIT p_PageSize;
+END;
+$$;
+
+-- SELECT * FROM GetAuditEventsKeyset_Func('08-31-2025 00:00:00', '09-05-2025 23:59:59', p_PageSize => 500);
+-- SELECT * FROM GetAuditEventsKeyset_Func(p_CursorTimestamp => '2025-09-03 14:00:00', p_CursorId => 6, p_PageSize => 500);
+
+
+-- ----------------------------------------------------------
+--12) Keyset (cursor) search over the archive tier (AuditEvents_Archival). Same parameters, columns and
+--    ordering as GetAuditEventsKeyset_Func, so the service can merge both tiers by (EventTimestamp, Id)
+--    under one cursor. Only called for searches whose date range reaches before the retention cutoff.
+CREATE INDEX IF NOT EXISTS idx_auditevents_archival_timestamp_id ON AuditEvents_Archival(EventTimestamp DESC, Id DESC);
+
+CREATE OR REPLACE FUNCTION GetAuditEventsArchiveKeyset_Func(
+    p_FromDate TEXT DEFAULT NULL,
+    p_ToDate TEXT DEFAULT NULL,
+    p_Functionality VARCHAR(100) DEFAULT NULL,
+    p_EventType VARCHAR(250) DEFAULT NULL,
+    p_StoreLocationID BIGINT DEFAULT NULL,
+    p_User VARCHAR(20) DEFAULT NULL,
+    p_Message TEXT DEFAULT NULL,
+    p_CompanyId BIGINT DEFAULT NULL,
+    p_CursorTimestamp TIMESTAMP DEFAULT NULL,
+    p_CursorId BIGINT DEFAULT NULL,
+    p_PageSize INT DEFAULT 500
+)
+RETURNS TABLE (
+    Id BIGINT,
+    EventTimestamp TIMESTAMP,
+    Functionality VARCHAR(100),
+    EventType VARCHAR(250),
+    StoreLocationID BIGINT,
+    CompanyId BIGINT,
+    UserName VARCHAR(20),
+    Message TEXT,
+    Status VARCHAR(20),
+    AdditionalData JSONB
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_FromDate TIMESTAMP;
+    v_ToDate   TIMESTAMP;
+    -- A missing cursor means "start from the newest event"
+    v_CursorTimestamp TIMESTAMP := COALESCE(p_CursorTimestamp, 'infinity'::TIMESTAMP);
+    v_CursorId        BIGINT    := COALESCE(p_CursorId, 9223372036854775807);
+BEGIN
+    -- Convert text dates to timestamp if provided
+    IF p_FromDate IS NOT NULL THEN
+        BEGIN
+            v_FromDate := to_timestamp(p_FromDate, 'MM-DD-YYYY HH24:MI:SS');
+        EXCEPTION WHEN others THEN
+            v_FromDate := NULL;
+        END;
+    END IF;
+
+    IF p_ToDate IS NOT NULL THEN
+        BEGIN
+            v_ToDate := to_timestamp(p_ToDate, 'MM-DD-YYYY HH24:MI:SS');
+        EXCEPTION WHEN others THEN
+            v_ToDate := NULL;
+        END;
+    END IF;
+
+    RETURN QUERY
+    SELECT 
+        ar.Id,
+        ar.EventTimestamp,
+        af.functionalityname AS Functionality,
+        aet.eventtypename AS EventType,
+        ar.StoreLocationID,
+        ar.CompanyId,
+        ar.UserName,
+        ar.Message,
+        ar.Status,
+        ar.AdditionalData
+    FROM AuditEvents_Archival ar
+    INNER JOIN auditfunctionalities af ON ar.FunctionalityId = af.FunctionalityId
+    INNER JOIN auditeventtypes aet ON ar.EventTypeId = aet.EventTypeId
+    WHERE 
+        -- Seek past the cursor through idx_auditevents_archival_timestamp_id
+        (ar.EventTimestamp, ar.Id) < (v_CursorTimestamp, v_CursorId)
+        AND ar.EventTimestamp <= v_CursorTimestamp
+
+        -- Apply date range dynamically depending on what's provided
+        AND (v_FromDate IS NULL OR ar.EventTimestamp >= v_FromDate)
+        AND (v_ToDate IS NULL OR ar.EventTimestamp <= v_ToDate)
+
+        -- Apply filters combinationally (AND logic)
+        AND (p_Functionality IS NULL OR af.functionalityname = p_Functionality)
+        AND (p_EventType IS NULL OR aet.eventtypename = p_EventType)
+        AND (p_StoreLocationID IS NULL OR ar.StoreLocationID = p_StoreLocationID)
+        AND (p_User IS NULL OR ar.UserName = p_User)
+        AND (p_Message IS NULL OR ar.Message ILIKE '%' || p_Message || '%')
+        AND (p_CompanyId IS NULL OR ar.CompanyId = p_CompanyId)
+
+    ORDER BY ar.EventTimestamp DESC, ar.Id DESC
+    LIMIT p_PageSize;
+END;
+$$;
+
+-- SELECT * FROM GetAuditEventsArchiveKeyset_Func('01-01-2024 00:00:00', '12-31-2024 23:59:59', p_PageSize => 500);
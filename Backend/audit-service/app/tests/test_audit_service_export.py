@@ -0,0 +1,43 @@
+import asyncio
+from app.services import audit_service
+from app.utils.export_writers import CsvStreamWriter
+
+
+def test_abandoned_export_closes_the_event_reader():
+    closed = []
+
+    async def event_batches():
+        try:
+            for number in range(10):
+                yield [{"ID": number}]
+        finally:
+            # Stands for the sessions opened by _iter_export_events going back to the pool
+            closed.append(True)
+
+    async def run():
+        chunks = audit_service._export_chunks(event_batches(), CsvStreamWriter(["ID"]), lambda event: [event["ID"]], "csv")
+        stream = audit_service._continue_export(await anext(chunks), chunks)
+        received = [await anext(stream), await anext(stream)]
+        # The client disconnects, Starlette closes the body iterator
+        await stream.aclose()
+        return received
+
+    assert asyncio.run(run()) == [b"ID\n0\n", b"1\n"]
+    assert closed == [True]
+
+
+def test_complete_export_closes_the_event_reader():
+    closed = []
+
+    async def event_batches():
+        try:
+            yield [{"ID": 1}]
+        finally:
+            closed.append(True)
+
+    async def run():
+        chunks = audit_service._export_chunks(event_batches(), CsvStreamWriter(["ID"]), lambda event: [event["ID"]], "csv")
+        return [chunk async for chunk in audit_service._continue_export(await anext(chunks), chunks)]
+
+    assert b"".join(asyncio.run(run())) == b"ID\n1\n"
+    assert closed == [True]
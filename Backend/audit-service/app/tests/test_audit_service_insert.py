@@ -0,0 +1,16 @@
+from app.services import audit_service
+
+
+def test_after_insert_failure_does_not_fail_the_committed_insert(monkeypatch):
+    cleared = []
+
+    def failing_invalidate(timestamps):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(audit_service.search_cache, "invalidate_window", failing_invalidate)
+    monkeypatch.setattr(audit_service.search_cache, "clear", lambda: cleared.append(True))
+
+    audit_service._after_insert([{"eventtimestamp": None}])
+
+    # The cache could not be narrowed down, it is dropped instead
+    assert cleared == [True]
@@ -0,0 +1,121 @@
+import asyncio
+import time
+from jose import jwt
+from app.dependencies import auth_middleware as auth_module
+from app.dependencies.auth_middleware import AuthMiddleware
+
+
+def _middleware(monkeypatch, local_verification=False):
+    middleware = AuthMiddleware()
+    middleware.local_verification = local_verification
+    middleware.remote_validation = True
+    calls = []
+
+    async def fake_validate(token, expires_in=None):
+        calls.append(token)
+        # Let the other requests reach validate_token while this call is in flight
+        await asyncio.sleep(0.01)
+        if token == "bad":
+            return None
+        user_data = {"username": "jdoe", "last_seen": None, "validated": True}
+        middleware.token_cache.set(token, user_data, ttl_seconds=expires_in)
+        return user_data
+
+    monkeypatch.setattr(middleware, "_validate_with_login_service", fake_validate)
+    return middleware, calls
+
+
+def test_parallel_validations_share_one_login_service_call(monkeypatch):
+    middleware, calls = _middleware(monkeypatch)
+
+    async def run():
+        return await asyncio.gather(*(middleware.validate_token("token") for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert calls == ["token"]
+    assert all(result["username"] == "jdoe" for result in results)
+    assert middleware._pending == {}
+
+
+def test_validated_token_is_served_from_the_cache(monkeypatch):
+    middleware, calls = _middleware(monkeypatch)
+
+    async def run():
+        await middleware.validate_token("token")
+        return await middleware.validate_token("token")
+
+    assert asyncio.run(run())["username"] == "jdoe"
+    assert calls == ["token"]
+
+
+def test_rejected_token_is_not_cached(monkeypatch):
+    middleware, calls = _middleware(monkeypatch)
+
+    async def run():
+        first = await middleware.validate_token("bad")
+        second = await middleware.validate_token("bad")
+        return first, second
+
+    assert asyncio.run(run()) == (None, None)
+    assert calls == ["bad", "bad"]
+
+
+def test_local_verification_rejects_without_calling_the_login_service(monkeypatch):
+    monkeypatch.setattr(auth_module.settings, "secret_key", "test-secret")
+    middleware, calls = _middleware(monkeypatch, local_verification=True)
+    algorithm = auth_module.settings.algorithm
+    expired = jwt.encode({"sub": "jdoe", "exp": int(time.time()) - 60}, "test-secret", algorithm=algorithm)
+    forged = jwt.encode({"sub": "jdoe", "exp": int(time.time()) + 60}, "other-secret", algorithm=algorithm)
+    valid = jwt.encode({"sub": "jdoe", "exp": int(time.time()) + 60}, "test-secret", algorithm=algorithm)
+
+    async def run():
+        return [await middleware.validate_token(token) for token in (expired, forged, valid)]
+
+    results = asyncio.run(run())
+    assert results[:2] == [None, None]
+    assert results[2]["username"] == "jdoe"
+    assert middleware.local_rejections == 2
+    assert calls == [valid]
+
+
+def test_stream_ticket_round_trip(monkeypatch):
+    middleware, _ = _middleware(monkeypatch)
+    session_expires_at = time.time() + 3600
+    ticket, expires_in = middleware.issue_stream_ticket("jdoe", session_expires_at)
+
+    assert 0 < expires_in <= auth_module.settings.event_stream_ticket_ttl_seconds
+    claims = middleware.verify_stream_ticket(ticket)
+    assert claims["sub"] == "jdoe"
+    assert claims["session_exp"] == session_expires_at
+
+
+def test_stream_ticket_never_outlives_the_session(monkeypatch):
+    middleware, _ = _middleware(monkeypatch)
+    ticket, expires_in = middleware.issue_stream_ticket("jdoe", time.time() - 1)
+    assert expires_in == 0
+    assert middleware.verify_stream_ticket(ticket) is None
+    assert middleware.stream_tickets_rejected == 1
+
+
+def test_stream_ticket_is_not_a_session_token(monkeypatch):
+    monkeypatch.setattr(auth_module.settings, "secret_key", "test-secret")
+    middleware, calls = _middleware(monkeypatch, local_verification=True)
+    ticket, _ = middleware.issue_stream_ticket("jdoe", time.time() + 3600)
+    session_token = jwt.encode({"sub": "jdoe", "exp": int(time.time()) + 60}, "test-secret",
+                               algorithm=auth_module.settings.algorithm)
+
+    assert asyncio.run(middleware.validate_token(ticket)) is None
+    assert middleware.verify_stream_ticket(session_token) is None
+    assert calls == []
+
+
+def test_invalidated_token_goes_back_to_the_login_service(monkeypatch):
+    middleware, calls = _middleware(monkeypatch)
+
+    async def run():
+        await middleware.validate_token("token")
+        assert middleware.invalidate_token("token")
+        await middleware.validate_token("token")
+
+    asyncio.run(run())
+    assert calls == ["token", "token"]
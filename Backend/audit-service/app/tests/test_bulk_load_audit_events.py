@@ -0,0 +1,100 @@
+import asyncio
+import io
+from datetime import date, datetime
+from app.scripts import bulk_load_audit_events as loader
+
+
+class FakeLookupCache:
+    """Knows the ('Authenticate', 'Login') pair only"""
+
+    async def resolve(self, pairs, session):
+        return {pair: (1, 2) if pair == ("Authenticate", "Login") else (None, None) for pair in pairs}
+
+
+class FakeSession:
+    def __init__(self):
+        self.calls = []
+        self.commits = 0
+
+    async def scalar(self, statement, params):
+        self.calls.append(params)
+        return 1
+
+    async def commit(self):
+        self.commits += 1
+
+
+def _payload(**overrides):
+    payload = {
+        "event_timestamp": "2019-03-10T12:00:00Z",
+        "functionality": "Authenticate",
+        "event_type": "Login",
+        "store_id": 7,
+        "company_id": 3,
+        "user": "jdoe",
+        "message": "Logged in",
+    }
+    payload.update(overrides)
+    return payload
+
+
+def test_read_ndjson_skips_blank_lines():
+    stream = io.StringIO('{"user": "a"}\n\n   \n{"user": "b"}\n')
+    assert list(loader._read_ndjson(stream)) == [{"user": "a"}, {"user": "b"}]
+
+
+def test_read_csv_drops_empty_cells_and_parses_additional_data():
+    stream = io.StringIO(
+        "event_timestamp,functionality,event_type,store_id,user,message,additional_data\n"
+        '2019-03-10T12:00:00Z,Authenticate,Login,,jdoe,hi,"{""ip"": ""10.0.0.1""}"\n'
+    )
+    rows = list(loader._read_csv(stream))
+    assert len(rows) == 1
+    assert "store_id" not in rows[0]
+    assert rows[0]["additional_data"] == {"ip": "10.0.0.1"}
+
+
+def test_iter_chunks_splits_into_chunk_size_lists():
+    assert list(loader._iter_chunks(range(7), 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+    assert list(loader._iter_chunks([], 3)) == []
+
+
+def test_parse_args_infers_format_from_extension():
+    assert loader._parse_args(["events.csv"]).format == "csv"
+    assert loader._parse_args(["events.jsonl"]).format == "ndjson"
+    assert loader._parse_args(["-", "--format", "csv"]).format == "csv"
+
+
+def test_prepare_chunk_skips_invalid_rows_and_unknown_names():
+    payloads = [
+        _payload(additional_data={"ip": "10.0.0.1"}),
+        _payload(user=None),
+        _payload(functionality="Unknown"),
+    ]
+    records, skipped = asyncio.run(loader._prepare_chunk(payloads, 0, FakeLookupCache(), None))
+
+    assert skipped == 2
+    assert len(records) == 1
+    record = records[0]
+    # Stored as naive Central Time (CDT, UTC-5 on 2019-03-10 12:00 UTC)
+    assert record[0] == datetime(2019, 3, 10, 7, 0, 0)
+    assert record[1:5] == (1, 2, 7, 3)
+    assert record[7] == "Success"
+    assert record[8] == '{"ip": "10.0.0.1"}'
+    assert len(record) == len(loader.COPY_COLUMNS)
+
+
+def test_ensure_partitions_covers_the_chunk_range_once():
+    session = FakeSession()
+    ensured = set()
+    records = [(datetime(2019, 5, 2),), (datetime(2019, 3, 10),)]
+
+    asyncio.run(loader._ensure_partitions(records, ensured, session))
+    assert session.calls == [{"from_timestamp": datetime(2019, 3, 10), "to_timestamp": datetime(2019, 5, 2)}]
+    assert ensured == {date(2019, 3, 1), date(2019, 5, 1)}
+
+    # Months already ensured by this run do not query again
+    asyncio.run(loader._ensure_partitions([(datetime(2019, 3, 20),)], ensured, session))
+    assert len(session.calls) == 1
+    asyncio.run(loader._ensure_partitions([(datetime(2019, 4, 1),)], ensured, session))
+    assert len(session.calls) == 2
@@ -0,0 +1,89 @@
+import asyncio
+import time
+from app.services.event_broadcaster import EventBroadcaster
+
+
+def _collect(broadcaster, queue, expires_at, frames_to_queue=()):
+    async def run():
+        for frame in frames_to_queue:
+            queue.put_nowait(frame)
+        return [frame async for frame in broadcaster.stream(queue, expires_at=expires_at)]
+    return asyncio.run(asyncio.wait_for(run(), timeout=5))
+
+
+def test_stream_ends_when_the_token_expires():
+    broadcaster = EventBroadcaster(max_subscribers=1, client_queue_size=10, heartbeat_seconds=0.05)
+    queue = broadcaster.subscribe()
+    frames = _collect(broadcaster, queue, time.time() + 0.2, ["event: audit-event\ndata: {}\n\n"])
+
+    assert frames[0] == "retry: 3000\n\n"
+    assert frames[1] == "event: audit-event\ndata: {}\n\n"
+    assert ": keep-alive\n\n" in frames
+    assert frames[-1] == "event: session-expired\ndata: {}\n\n"
+    assert broadcaster.stats()["subscribers"] == 0
+
+
+def test_stream_of_an_expired_token_ends_at_once():
+    broadcaster = EventBroadcaster(max_subscribers=1, client_queue_size=10, heartbeat_seconds=60)
+    queue = broadcaster.subscribe()
+    frames = _collect(broadcaster, queue, time.time() - 1)
+    assert frames == ["retry: 3000\n\n", "event: session-expired\ndata: {}\n\n"]
+
+
+def test_stream_without_expiry_ends_on_disconnect():
+    broadcaster = EventBroadcaster(max_subscribers=1, client_queue_size=10, heartbeat_seconds=60)
+    queue = broadcaster.subscribe()
+    frames = _collect(broadcaster, queue, None, ["event: audit-event\ndata: {}\n\n", None])
+    assert frames == ["retry: 3000\n\n", "event: audit-event\ndata: {}\n\n"]
+
+
+def _broadcaster_with_listener(pending_batches=None):
+    broadcaster = EventBroadcaster(max_subscribers=1, client_queue_size=10, heartbeat_seconds=60)
+    received, missed = [], []
+    broadcaster.add_listener(lambda rows, events: received.append(events), on_missed=lambda: missed.append(True))
+    if pending_batches is not None:
+        broadcaster._pending = asyncio.Queue(maxsize=pending_batches)
+    return broadcaster, received, missed
+
+
+def _publish_and_drain(broadcaster, enrich, batches):
+    async def run():
+        broadcaster.start(enrich=enrich)
+        for rows in batches:
+            broadcaster.publish(rows)
+        await asyncio.sleep(0.05)
+        await broadcaster.stop()
+    asyncio.run(run())
+
+
+def test_listener_receives_enriched_batches():
+    async def enrich(rows):
+        return [{"Id": row["id"]} for row in rows]
+
+    broadcaster, received, missed = _broadcaster_with_listener()
+    _publish_and_drain(broadcaster, enrich, [[{"id": 1}], [{"id": 2}]])
+    assert received == [[{"Id": 1}], [{"Id": 2}]]
+    assert missed == []
+
+
+def test_failed_enrichment_is_reported_to_the_listener():
+    async def enrich(rows):
+        raise RuntimeError("SQL Server unavailable")
+
+    broadcaster, received, missed = _broadcaster_with_listener()
+    _publish_and_drain(broadcaster, enrich, [[{"id": 1}]])
+    assert received == []
+    assert missed == [True]
+    assert broadcaster.stats()["last_error"] == "SQL Server unavailable"
+
+
+def test_dropped_batch_is_reported_to_the_listener():
+    async def enrich(rows):
+        return [{"Id": row["id"]} for row in rows]
+
+    broadcaster, received, missed = _broadcaster_with_listener(pending_batches=1)
+    # Published before the worker gets to run, the second batch does not fit the queue
+    _publish_and_drain(broadcaster, enrich, [[{"id": 1}], [{"id": 2}]])
+    assert received == [[{"Id": 1}]]
+    assert missed == [True]
+    assert broadcaster.stats()["dropped_batches"] == 1
@@ -0,0 +1,92 @@
+import csv
+import gzip
+import io
+import json
+from datetime import datetime
+import openpyxl
+import pyarrow.parquet as pq
+from app.utils.export_writers import (
+    CsvStreamWriter, GzipStreamWriter, NdjsonStreamWriter, ParquetStreamWriter, XlsxStreamWriter
+)
+
+HEADERS = ["ID", "User", "Message"]
+ROWS = [[1, "jdoe", "Logged in"], [2, "asmith", None], [3, "müller", 'said "hi", left\nearly']]
+
+
+def _write(writer, batches) -> bytes:
+    chunks = [writer.write_rows(batch) for batch in batches]
+    chunks.append(writer.close())
+    return b"".join(chunks)
+
+
+def test_xlsx_opens_with_openpyxl():
+    headers = ["ID", "User", "Message", "Timestamp"]
+    batches = [
+        [[1, "jdoe", "Logged in", datetime(2024, 6, 1, 12, 0)], [2, "asmith", None, datetime(2024, 6, 1, 12, 5)]],
+        [[3, "<admin> & co", "bad\x01char", datetime(2024, 6, 2, 8, 30)]],
+    ]
+    # A sample smaller than the rows, the last batch is streamed after the sheet was opened
+    data = _write(XlsxStreamWriter(headers, sheet_name="Audit Events", width_sample_rows=2), batches)
+
+    workbook = openpyxl.load_workbook(io.BytesIO(data))
+    sheet = workbook["Audit Events"]
+    rows = list(sheet.iter_rows(values_only=True))
+    assert rows[0] == tuple(headers)
+    assert rows[1] == (1, "jdoe", "Logged in", "2024-06-01 12:00:00")
+    assert rows[2] == (2, "asmith", None, "2024-06-01 12:05:00")
+    assert rows[3] == (3, "<admin> & co", "badchar", "2024-06-02 08:30:00")
+    assert sheet["A1"].font.b
+    assert not sheet["A2"].font.b
+    # Widths come from the held back sample only
+    assert sheet.column_dimensions["B"].width == len("asmith") + 2
+
+
+def test_xlsx_without_rows_has_the_header_only():
+    data = _write(XlsxStreamWriter(["ID", "User"]), [])
+    sheet = openpyxl.load_workbook(io.BytesIO(data)).active
+    assert list(sheet.iter_rows(values_only=True)) == [("ID", "User")]
+
+
+def test_xlsx_rows_written_and_capped_widths():
+    writer = XlsxStreamWriter(["Message"], width_sample_rows=10, max_width=20)
+    data = _write(writer, [[["x" * 100]]])
+    assert writer.rows_written == 1
+    sheet = openpyxl.load_workbook(io.BytesIO(data)).active
+    assert sheet.column_dimensions["A"].width == 20
+
+
+def test_csv_round_trip():
+    data = _write(CsvStreamWriter(HEADERS), [ROWS[:2], [], ROWS[2:]])
+    rows = list(csv.reader(io.StringIO(data.decode("utf-8"))))
+    assert rows[0] == HEADERS
+    assert rows[1:] == [[str(value) if value is not None else "" for value in row] for row in ROWS]
+
+
+def test_ndjson_round_trip():
+    events = [{"Id": 1, "User": "jdoe", "AdditionalData": {"ip": "10.0.0.1"}, "EventTimestamp": datetime(2024, 6, 1)}]
+    writer = NdjsonStreamWriter()
+    data = _write(writer, [events, events])
+    lines = data.decode("utf-8").splitlines()
+    assert writer.rows_written == 2
+    assert json.loads(lines[0]) == {"Id": 1, "User": "jdoe", "AdditionalData": {"ip": "10.0.0.1"},
+                                     "EventTimestamp": "2024-06-01 00:00:00"}
+
+
+def test_parquet_round_trip():
+    writer = ParquetStreamWriter(HEADERS, int_columns=["ID"])
+    data = _write(writer, [ROWS[:2], [], ROWS[2:]])
+    table = pq.read_table(io.BytesIO(data))
+
+    assert table.column_names == HEADERS
+    assert str(table.schema.field("ID").type) == "int64"
+    assert str(table.schema.field("User").type) == "string"
+    assert [list(row.values()) for row in table.to_pylist()] == ROWS
+    # One row group per non-empty write_rows call
+    assert pq.ParquetFile(io.BytesIO(data)).num_row_groups == 2
+
+
+def test_gzip_round_trip():
+    writer = GzipStreamWriter(CsvStreamWriter(HEADERS))
+    data = _write(writer, [ROWS[:1], ROWS[1:]])
+    assert writer.rows_written == 3
+    assert gzip.decompress(data) == _write(CsvStreamWriter(HEADERS), [ROWS])
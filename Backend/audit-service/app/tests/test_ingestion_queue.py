@@ -0,0 +1,71 @@
+import asyncio
+from app.services.ingestion_queue import IngestionQueue
+
+
+def make_queue(monkeypatch, flush_results, flush_seconds=0.0):
+    queue = IngestionQueue(enabled=True, max_size=10, batch_size=10, flush_interval_seconds=0, drain_timeout_seconds=0,
+                           max_attempts=3, retry_backoff_seconds=10)
+    flushes = []
+    dead_lettered = []
+
+    async def flush(batch):
+        await asyncio.sleep(flush_seconds)
+        flushes.append(list(batch))
+        return flush_results.pop(0)
+
+    async def dead_letter(events, reason):
+        dead_lettered.append((list(events), reason))
+
+    monkeypatch.setattr(queue, "_flush", flush)
+    monkeypatch.setattr(queue, "_dead_letter", dead_letter)
+    return queue, flushes, dead_lettered
+
+
+def cancel_during(queue, batch, seconds):
+    async def run():
+        task = asyncio.create_task(queue._flush_with_retry(batch))
+        await asyncio.sleep(seconds)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            return True
+        return False
+
+    return asyncio.run(run())
+
+
+def test_shutdown_lets_the_in_flight_insert_finish(monkeypatch):
+    queue, flushes, dead_lettered = make_queue(monkeypatch, [True], flush_seconds=0.05)
+
+    assert cancel_during(queue, ["a", "b"], 0.01)
+    # The insert went through, nothing to dead-letter
+    assert flushes == [["a", "b"]]
+    assert dead_lettered == []
+
+
+def test_shutdown_dead_letters_a_failed_in_flight_insert(monkeypatch):
+    queue, flushes, dead_lettered = make_queue(monkeypatch, [False], flush_seconds=0.05)
+
+    assert cancel_during(queue, ["a"], 0.01)
+    assert flushes == [["a"]]
+    assert dead_lettered == [(["a"], "not written before shutdown")]
+
+
+def test_shutdown_during_the_retry_backoff_dead_letters_the_batch(monkeypatch):
+    queue, flushes, dead_lettered = make_queue(monkeypatch, [False])
+
+    assert cancel_during(queue, ["a"], 0.05)
+    assert flushes == [["a"]]
+    assert queue.retries == 1
+    assert dead_lettered == [(["a"], "not written before shutdown")]
+
+
+def test_batch_is_dead_lettered_after_max_attempts(monkeypatch):
+    queue, flushes, dead_lettered = make_queue(monkeypatch, [False, False, False])
+    queue.retry_backoff_seconds = 0
+
+    asyncio.run(queue._flush_with_retry(["a"]))
+
+    assert len(flushes) == 3
+    assert dead_lettered == [(["a"], "insert failed 3 times")]
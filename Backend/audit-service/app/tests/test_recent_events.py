@@ -0,0 +1,108 @@
+import json
+from datetime import datetime, timedelta
+from app.services.recent_events import RecentEvents
+
+BASE = datetime(2024, 6, 1, 12, 0, 0)
+
+
+def _batch(*ids, minutes=None):
+    """Rows and enriched events, event `n` is timestamped n minutes after BASE unless `minutes` says otherwise"""
+    minutes = minutes or ids
+    rows = [{"id": event_id, "eventtimestamp": BASE + timedelta(minutes=minute)} for event_id, minute in zip(ids, minutes)]
+    events = [{"Id": event_id, "EventTimestamp": row["eventtimestamp"]} for event_id, row in zip(ids, rows)]
+    return rows, events
+
+
+def _ids(buffer: RecentEvents) -> list:
+    return [event["Id"] for event in buffer.response()["events"]]
+
+
+def test_add_keeps_the_newest_events_newest_first():
+    buffer = RecentEvents(max_size=3)
+    buffer.add(*_batch(1, 2))
+    buffer.add(*_batch(4, 3))
+    assert _ids(buffer) == [4, 3, 2]
+    assert buffer.stats()["out_of_order"] == 0
+    assert buffer.stats()["size"] == 3
+
+
+def test_add_out_of_order_event_is_inserted_in_place():
+    buffer = RecentEvents(max_size=3)
+    buffer.add(*_batch(1, 3, 5))
+    # Client supplied timestamp older than the newest buffered event
+    buffer.add(*_batch(2))
+    assert _ids(buffer) == [5, 3, 2]
+    # Older than everything kept in a full buffer: not among the newest events
+    buffer.add(*_batch(9, minutes=[-10]))
+    assert _ids(buffer) == [5, 3, 2]
+    assert buffer.stats()["out_of_order"] == 2
+
+
+def test_payload_matches_the_response_and_follows_changes():
+    buffer = RecentEvents(max_size=3)
+    assert json.loads(buffer.payload()) == {"StatusCode": 200, "message": "Data not found", "count": 0, "events": []}
+    buffer.add(*_batch(1, 2))
+    assert json.loads(buffer.payload()) == json.loads(json.dumps(buffer.response(), default=str))
+    buffer.add(*_batch(3))
+    assert json.loads(buffer.payload())["count"] == 3
+    assert buffer.stats()["served"] == 3
+
+
+def test_replace_seeds_the_buffer_and_marks_it_ready():
+    buffer = RecentEvents(max_size=3)
+    assert not buffer.ready
+    buffer.begin_reload()
+    buffer.replace(*_batch(1, 2, 3, 4))
+    assert buffer.ready
+    assert _ids(buffer) == [4, 3, 2]
+
+
+def test_inserts_during_a_reload_are_kept():
+    buffer = RecentEvents(max_size=3)
+    buffer.begin_reload()
+    # Committed after the reload query read the table
+    buffer.add(*_batch(5))
+    buffer.replace(*_batch(2, 3, 4))
+    assert _ids(buffer) == [5, 4, 3]
+
+    # An insert the reload query already saw is not duplicated
+    buffer.begin_reload()
+    buffer.add(*_batch(6))
+    buffer.replace(*_batch(4, 5, 6))
+    assert _ids(buffer) == [6, 5, 4]
+
+
+def test_abort_reload_keeps_the_current_buffer():
+    buffer = RecentEvents(max_size=3)
+    buffer.begin_reload()
+    buffer.replace(*_batch(1))
+    buffer.begin_reload()
+    buffer.abort_reload()
+    buffer.add(*_batch(2))
+    assert _ids(buffer) == [2, 1]
+    assert buffer.ready
+
+
+def test_mark_stale_until_the_next_reload():
+    buffer = RecentEvents(max_size=3)
+    buffer.begin_reload()
+    buffer.replace(*_batch(1))
+    buffer.mark_stale()
+    assert not buffer.ready
+
+    buffer.begin_reload()
+    buffer.replace(*_batch(1, 2))
+    assert buffer.ready
+
+
+def test_batch_missed_during_a_reload_keeps_the_buffer_stale():
+    buffer = RecentEvents(max_size=3)
+    buffer.begin_reload()
+    # The missed batch may have committed after the reload query ran
+    buffer.mark_stale()
+    buffer.replace(*_batch(1, 2))
+    assert not buffer.ready
+
+    buffer.begin_reload()
+    buffer.replace(*_batch(1, 2, 3))
+    assert buffer.ready
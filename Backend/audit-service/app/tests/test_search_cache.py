@@ -0,0 +1,153 @@
+from datetime import datetime
+from app.services import search_cache as search_cache_module
+from app.services.search_cache import SearchCache, _overlaps
+
+NOW = datetime(2024, 6, 15, 12, 0, 0)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _cache(monkeypatch, max_entries=10, closed_ttl_seconds=300, open_ttl_seconds=5):
+    clock = FakeClock()
+    monkeypatch.setattr(search_cache_module.time, "monotonic", clock)
+    return SearchCache(max_entries, closed_ttl_seconds, open_ttl_seconds), clock
+
+
+def _key(from_date="06-01-2024 00:00:00", to_date="06-10-2024 00:00:00", page_number=1, **overrides):
+    params = dict(
+        from_date=from_date, to_date=to_date, functionality=None, event_type=None, store_id=None, user=None,
+        message_pattern=None, company_id=None, page_number=page_number, page_size=50, cursor=None,
+        use_cursor=False, include_archive=False,
+    )
+    params.update(overrides)
+    return SearchCache.make_key(**params)
+
+
+def test_make_key_normalizes_equivalent_searches():
+    assert _key(user=" jdoe ", functionality="") == _key(user="jdoe", functionality=None)
+    assert _key(from_date=" 06-01-2024 00:00:00") == _key()
+    # An unparsable date is ignored by the search, so it keys like a missing one
+    assert _key(from_date="yesterday") == _key(from_date=None)
+    assert _key()[0] == datetime(2024, 6, 1)
+
+
+def test_make_key_ignores_page_number_in_keyset_mode():
+    assert _key(page_number=1) != _key(page_number=2)
+    assert _key(page_number=1, use_cursor=True) == _key(page_number=2, use_cursor=True)
+    assert _key(page_number=1, cursor="abc") == _key(page_number=2, cursor="abc")
+    assert _key(page_number=1, cursor="abc") != _key(page_number=1, cursor="def")
+    assert _key(page_number=1, include_archive=True) == _key(page_number=2, include_archive=True)
+
+
+def test_overlaps_with_open_bounds():
+    early, mid, late = datetime(2024, 1, 1), datetime(2024, 2, 1), datetime(2024, 3, 1)
+    assert _overlaps(early, mid, mid, late)
+    assert not _overlaps(early, mid, late, late)
+    assert not _overlaps(late, None, early, mid)
+    assert _overlaps(None, None, early, late)
+    assert _overlaps(None, early, early, mid)
+    assert _overlaps(mid, late, None, None)
+    assert not _overlaps(None, early, mid, late)
+
+
+def test_closed_search_uses_the_closed_ttl(monkeypatch):
+    cache, clock = _cache(monkeypatch)
+    closed, open_ended = _key(), _key(to_date=None)
+    cache.set(closed, {"page": "closed"}, now=NOW, generation=cache.generation)
+    cache.set(open_ended, {"page": "open"}, now=NOW, generation=cache.generation)
+
+    clock.now += 10
+    assert cache.get(open_ended) is None
+    assert cache.get(closed) == {"page": "closed"}
+    clock.now += 300
+    assert cache.get(closed) is None
+
+
+def test_search_ending_in_the_future_uses_the_open_ttl(monkeypatch):
+    cache, clock = _cache(monkeypatch)
+    key = _key(to_date="06-20-2024 00:00:00")
+    cache.set(key, {"page": 1}, now=NOW, generation=cache.generation)
+    clock.now += 10
+    assert cache.get(key) is None
+
+
+def test_insert_drops_only_the_overlapping_searches(monkeypatch):
+    cache, _ = _cache(monkeypatch)
+    june = _key()
+    may = _key(from_date="05-01-2024 00:00:00", to_date="05-31-2024 00:00:00")
+    unbounded = _key(from_date=None, to_date=None)
+    for key in (june, may, unbounded):
+        cache.set(key, {"key": key}, now=NOW, generation=cache.generation)
+
+    cache.invalidate_window([datetime(2024, 6, 5), None])
+    assert cache.get(june) is None
+    assert cache.get(unbounded) is None
+    assert cache.get(may) is not None
+    assert cache.stats()["invalidated"] == 2
+
+    # No timestamps: nothing to invalidate and the generation does not move
+    generation = cache.generation
+    cache.invalidate_window([None])
+    assert cache.generation == generation
+
+
+def test_insert_during_search_is_not_cached_when_it_hits_the_window(monkeypatch):
+    cache, _ = _cache(monkeypatch)
+    june, may = _key(), _key(from_date="05-01-2024 00:00:00", to_date="05-31-2024 00:00:00")
+    generation = cache.generation
+    # The search runs, meanwhile an event lands on June 5
+    cache.invalidate_window([datetime(2024, 6, 5)])
+
+    cache.set(june, {"page": "june"}, now=NOW, generation=generation)
+    cache.set(may, {"page": "may"}, now=NOW, generation=generation)
+    assert cache.get(june) is None
+    assert cache.get(may) == {"page": "may"}
+
+
+def test_search_is_not_cached_when_too_many_inserts_were_missed(monkeypatch):
+    cache, _ = _cache(monkeypatch)
+    may = _key(from_date="05-01-2024 00:00:00", to_date="05-31-2024 00:00:00")
+    generation = cache.generation
+    # More invalidations than the recent windows remember, the search cannot tell whether it was hit
+    for _ in range(cache._recent_windows.maxlen + 1):
+        cache.invalidate_window([datetime(2024, 6, 5)])
+    cache.set(may, {"page": "may"}, now=NOW, generation=generation)
+    assert cache.get(may) is None
+
+
+def test_clear_drops_everything_and_searches_in_flight(monkeypatch):
+    cache, _ = _cache(monkeypatch)
+    june, may = _key(), _key(from_date="05-01-2024 00:00:00", to_date="05-31-2024 00:00:00")
+    cache.set(june, {"page": "june"}, now=NOW, generation=cache.generation)
+    generation = cache.generation
+    cache.clear()
+
+    assert cache.get(june) is None
+    cache.set(may, {"page": "may"}, now=NOW, generation=generation)
+    assert cache.get(may) is None
+
+
+def test_least_recently_used_search_is_evicted(monkeypatch):
+    cache, _ = _cache(monkeypatch, max_entries=2)
+    first, second, third = _key(page_number=1), _key(page_number=2), _key(page_number=3)
+    cache.set(first, {"page": 1}, now=NOW, generation=cache.generation)
+    cache.set(second, {"page": 2}, now=NOW, generation=cache.generation)
+    assert cache.get(first) is not None
+    cache.set(third, {"page": 3}, now=NOW, generation=cache.generation)
+
+    assert cache.get(second) is None
+    assert cache.get(first) is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_zero_max_entries_disables_the_cache(monkeypatch):
+    cache, _ = _cache(monkeypatch, max_entries=0)
+    cache.set(_key(), {"page": 1}, now=NOW, generation=cache.generation)
+    assert cache.get(_key()) is None
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,44 @@
+from datetime import datetime
+from app.services.search_cache import SearchCache
+from app.services.search_cache_listener import SearchCacheListener
+
+NOW = datetime(2024, 6, 15, 12, 0, 0)
+
+
+def _key(from_date, to_date):
+    return SearchCache.make_key(
+        from_date=from_date, to_date=to_date, functionality=None, event_type=None, store_id=None, user=None,
+        message_pattern=None, company_id=None, page_number=1, page_size=50, cursor=None, use_cursor=False,
+        include_archive=False,
+    )
+
+
+def _listener_with_entries():
+    cache = SearchCache(max_entries=10, closed_ttl_seconds=300, open_ttl_seconds=300)
+    june = _key("06-01-2024 00:00:00", "06-10-2024 00:00:00")
+    may = _key("05-01-2024 00:00:00", "05-31-2024 00:00:00")
+    for key in (june, may):
+        cache.set(key, {"key": key}, now=NOW, generation=cache.generation)
+    return SearchCacheListener(cache, reconnect_seconds=1, check_seconds=1), june, may
+
+
+def test_notification_invalidates_the_inserted_span():
+    listener, june, may = _listener_with_entries()
+    # Payload format of the trg_auditevents_changed trigger (timestamp::text)
+    listener._on_notification(None, 1234, "auditevents_changed", "2024-06-05 08:00:00.25|2024-06-06 09:00:00")
+    assert listener.cache.get(june) is None
+    assert listener.cache.get(may) is not None
+    assert listener.notifications == 1
+
+
+def test_clear_notification_drops_everything():
+    listener, june, may = _listener_with_entries()
+    listener._on_notification(None, 1234, "auditevents_changed", "clear")
+    assert listener.cache.get(june) is None
+    assert listener.cache.get(may) is None
+
+
+def test_unreadable_notification_clears_the_cache():
+    listener, june, may = _listener_with_entries()
+    listener._on_notification(None, 1234, "auditevents_changed", "garbage")
+    assert listener.cache.stats()["entries"] == 0
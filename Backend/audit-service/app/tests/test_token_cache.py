@@ -0,0 +1,97 @@
+from app.utils import token_cache as token_cache_module
+from app.utils.token_cache import MAX_TTL_SECONDS, TokenCache, hash_token
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _cache(monkeypatch, ttl_seconds=5, max_entries=3):
+    clock = FakeClock()
+    monkeypatch.setattr(token_cache_module.time, "monotonic", clock)
+    return TokenCache(ttl_seconds=ttl_seconds, max_entries=max_entries), clock
+
+
+def test_hash_token_does_not_keep_the_raw_token():
+    assert hash_token("abc") != "abc"
+    assert hash_token("abc") == hash_token("abc")
+
+
+def test_entry_expires_after_ttl(monkeypatch):
+    cache, clock = _cache(monkeypatch)
+    cache.set("token", {"username": "jdoe"})
+
+    clock.now += 4.9
+    assert cache.get("token") == {"username": "jdoe"}
+    clock.now += 0.1
+    assert cache.get("token") is None
+    assert cache.stats()["expired"] == 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_set_ttl_only_shortens_the_configured_ttl(monkeypatch):
+    cache, clock = _cache(monkeypatch)
+    cache.set("short", {"username": "a"}, ttl_seconds=1)
+    cache.set("long", {"username": "b"}, ttl_seconds=60)
+    cache.set("expired", {"username": "c"}, ttl_seconds=-5)
+
+    assert cache.get("expired") is None
+    clock.now += 2
+    assert cache.get("short") is None
+    assert cache.get("long") == {"username": "b"}
+    clock.now += 3
+    assert cache.get("long") is None
+
+
+def test_ttl_is_capped(monkeypatch):
+    cache, clock = _cache(monkeypatch, ttl_seconds=3600)
+    assert cache.ttl_seconds == MAX_TTL_SECONDS
+    cache.set("token", {"username": "jdoe"})
+    clock.now += MAX_TTL_SECONDS
+    assert cache.get("token") is None
+
+
+def test_least_recently_used_entry_is_evicted(monkeypatch):
+    cache, _ = _cache(monkeypatch, max_entries=2)
+    cache.set("a", {"username": "a"})
+    cache.set("b", {"username": "b"})
+    # Reading "a" makes "b" the least recently used entry
+    assert cache.get("a") is not None
+    cache.set("c", {"username": "c"})
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_zero_ttl_disables_the_cache(monkeypatch):
+    cache, _ = _cache(monkeypatch, ttl_seconds=0)
+    cache.set("token", {"username": "jdoe"})
+    assert not cache.enabled
+    assert cache.get("token") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_stats_hit_ratio(monkeypatch):
+    cache, _ = _cache(monkeypatch)
+    assert cache.stats()["hit_ratio"] is None
+    cache.set("token", {"username": "jdoe"})
+    cache.get("token")
+    cache.get("other")
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["hit_ratio"] == 0.5
+
+
+def test_invalidate_drops_the_token(monkeypatch):
+    cache, _ = _cache(monkeypatch)
+    cache.set("token", {"username": "jdoe"})
+    assert cache.invalidate("token")
+    assert cache.get("token") is None
+    assert not cache.invalidate("token")
+    assert cache.stats()["invalidations"] == 1
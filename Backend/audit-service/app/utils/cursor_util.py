@@ -0,0 +1,31 @@
+import base64
+import json
+from datetime import datetime
+
+
+def encode_cursor(event_timestamp: datetime, event_id: int) -> str:
+    """
+    Builds an opaque pagination cursor pointing at the given audit event.
+
+    :param event_timestamp: EventTimestamp of the last event on the current page.
+    :param event_id: Id of the last event on the current page.
+    :return: URL safe cursor string.
+    """
+    payload = json.dumps({"ts": event_timestamp.isoformat(), "id": event_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """
+    Reads back a cursor produced by encode_cursor.
+
+    :param cursor: Cursor string received from the client.
+    :return: (event_timestamp, event_id) of the event the cursor points at.
+    :raises ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(payload["ts"]), int(payload["id"])
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
@@ -0,0 +1,295 @@
+import csv
+import io
+import json
+import re
+import zipfile
+import zlib
+from typing import Iterable, Optional
+from xml.sax.saxutils import escape
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Characters XML 1.0 does not allow, Excel refuses a sheet containing them
+_ILLEGAL_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+# Longest text Excel keeps in a cell
+_MAX_CELL_CHARS = 32767
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{sheet_name}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/>'
+    '</Relationships>'
+)
+# Style 0 is the default cell, style 1 the bold header cell
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+)
+
+
+class _ChunkSink(io.RawIOBase):
+    """Unseekable file object collecting what a writer produces, so it can be handed out chunk by chunk"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _column_letter(index: int) -> str:
+    """0 -> A, 25 -> Z, 26 -> AA"""
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _cell_xml(ref: str, value, style: int = 0) -> str:
+    style_attr = f' s="{style}"' if style else ""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f'<c r="{ref}"{style_attr}><v>{value}</v></c>'
+    text = _ILLEGAL_XML_CHARS.sub("", str(value))[:_MAX_CELL_CHARS]
+    return f'<c r="{ref}"{style_attr} t="inlineStr"><is><t xml:space="preserve">{escape(text)}</t></is></c>'
+
+
+class XlsxStreamWriter:
+    """
+    Writes a single sheet .xlsx file row by row and hands out the zipped bytes as they are produced, so an
+    export never holds more than one chunk of rows in memory. Strings are written inline (no shared strings
+    table) and the header row is bold.
+
+    Column widths are the running maximum of the cell text lengths (+2, capped at `max_width`). Excel needs
+    them before the first row, so the writer holds back the first `width_sample_rows` rows, sizes the
+    columns from them and streams everything after that straight through.
+
+    Usage: `write_rows(rows)` and `close()` return the bytes ready to be sent (possibly empty).
+    """
+
+    def __init__(self, headers: list[str], sheet_name: str = "Sheet1", width_sample_rows: int = 1000,
+                 max_width: int = 50):
+        self.headers = headers
+        self.width_sample_rows = width_sample_rows
+        self.max_width = max_width
+        self._widths = [len(header) for header in headers]
+        self._held_rows: Optional[list] = []
+        self._row_number = 1
+        self.rows_written = 0
+
+        self._sink = _ChunkSink()
+        self._zip = zipfile.ZipFile(self._sink, mode="w", compression=zipfile.ZIP_DEFLATED)
+        self._zip.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        self._zip.writestr("_rels/.rels", _ROOT_RELS)
+        self._zip.writestr("xl/workbook.xml", _WORKBOOK.format(sheet_name=escape(sheet_name, {'"': "&quot;"})))
+        self._zip.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+        self._zip.writestr("xl/styles.xml", _STYLES)
+        self._sheet = None
+
+    def _track_widths(self, row: list):
+        for index, value in enumerate(row):
+            if value is not None:
+                length = len(str(value))
+                if length > self._widths[index]:
+                    self._widths[index] = length
+
+    def _row_xml(self, row: list, style: int = 0) -> str:
+        number = self._row_number
+        self._row_number += 1
+        cells = "".join(
+            _cell_xml(f"{_column_letter(index)}{number}", value, style)
+            for index, value in enumerate(row) if value is not None
+        )
+        return f'<row r="{number}">{cells}</row>'
+
+    def _open_sheet(self):
+        """Start the sheet part: column widths from the held back rows, header, then the held back rows"""
+        cols = "".join(
+            f'<col min="{index}" max="{index}" width="{min(width + 2, self.max_width)}" customWidth="1"/>'
+            for index, width in enumerate(self._widths, start=1)
+        )
+        self._sheet = self._zip.open("xl/worksheets/sheet1.xml", mode="w")
+        self._sheet.write(f"{_SHEET_START}<cols>{cols}</cols><sheetData>".encode("utf-8"))
+        self._sheet.write(self._row_xml(self.headers, style=1).encode("utf-8"))
+        held, self._held_rows = self._held_rows, None
+        self._write(held)
+
+    def _write(self, rows: list):
+        if rows:
+            self._sheet.write("".join(self._row_xml(row) for row in rows).encode("utf-8"))
+
+    def write_rows(self, rows: Iterable[list]) -> bytes:
+        rows = list(rows)
+        self.rows_written += len(rows)
+        if self._held_rows is not None:
+            for row in rows:
+                self._track_widths(row)
+            self._held_rows.extend(rows)
+            if len(self._held_rows) >= self.width_sample_rows:
+                self._open_sheet()
+        else:
+            self._write(rows)
+        return self._sink.drain()
+
+    def close(self) -> bytes:
+        if self._sheet is None:
+            self._open_sheet()
+        self._sheet.write(b"</sheetData></worksheet>")
+        self._sheet.close()
+        self._zip.close()
+        return self._sink.drain()
+
+
+class CsvStreamWriter:
+    """CSV with a header line, every `write_rows` call returns the encoded lines of its rows"""
+
+    def __init__(self, headers: list[str]):
+        self.rows_written = 0
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, lineterminator="\n")
+        self._writer.writerow(headers)
+
+    def _drain(self) -> bytes:
+        data = self._buffer.getvalue().encode("utf-8")
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data
+
+    def write_rows(self, rows: Iterable[list]) -> bytes:
+        for row in rows:
+            self._writer.writerow(row)
+            self.rows_written += 1
+        return self._drain()
+
+    def close(self) -> bytes:
+        return self._drain()
+
+
+class NdjsonStreamWriter:
+    """One JSON object per line, rows are dicts written as they are"""
+
+    def __init__(self):
+        self.rows_written = 0
+
+    def write_rows(self, rows: Iterable[dict]) -> bytes:
+        lines = []
+        for row in rows:
+            lines.append(json.dumps(row, default=str))
+            self.rows_written += 1
+        return "".join(line + "\n" for line in lines).encode("utf-8")
+
+    def close(self) -> bytes:
+        return b""
+
+
+class ParquetStreamWriter:
+    """
+    Parquet file written one row group per `write_rows` call. `int_columns` are stored as int64, every other
+    column as string.
+    """
+
+    def __init__(self, headers: list[str], int_columns: Iterable[str] = (), compression: str = "snappy"):
+        int_columns = set(int_columns)
+        self.headers = headers
+        self.rows_written = 0
+        self._schema = pa.schema([
+            (header, pa.int64() if header in int_columns else pa.string()) for header in headers
+        ])
+        self._sink = _ChunkSink()
+        self._writer = pq.ParquetWriter(self._sink, self._schema, compression=compression)
+
+    def write_rows(self, rows: Iterable[list]) -> bytes:
+        rows = list(rows)
+        if rows:
+            columns = [
+                [None if value is None else value if field.type == pa.int64() else str(value) for value in column]
+                for field, column in zip(self._schema, zip(*rows))
+            ]
+            self._writer.write_table(pa.Table.from_arrays(columns, schema=self._schema))
+            self.rows_written += len(rows)
+        return self._sink.drain()
+
+    def close(self) -> bytes:
+        self._writer.close()
+        return self._sink.drain()
+
+
+class GzipStreamWriter:
+    """Wraps one of the writers above and gzips its output on the fly"""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self._compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+
+    @property
+    def rows_written(self) -> int:
+        return self.writer.rows_written
+
+    def write_rows(self, rows: Iterable) -> bytes:
+        return self._compressor.compress(self.writer.write_rows(rows))
+
+    def close(self) -> bytes:
+        return self._compressor.compress(self.writer.close()) + self._compressor.flush()
@@ -0,0 +1,44 @@
+import asyncio
+from typing import Awaitable, Callable, Optional
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class PeriodicTask:
+    """
+    Runs an async callable in the background every `interval_seconds` until stopped.
+    Errors are logged and do not stop the loop. Started and stopped from the FastAPI lifespan.
+    """
+
+    def __init__(self, name: str, interval_seconds: float, func: Callable[[], Awaitable[None]]):
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self.func = func
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name=self.name)
+            logger.info(f"Background task '{self.name}' started (every {self.interval_seconds}s)")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info(f"Background task '{self.name}' stopped")
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.func()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception(f"Background task '{self.name}' failed:")
@@ -0,0 +1,97 @@
+# Kept identical in audit-service and store-service (app/utils/token_cache.py): each service is built into its
+# own image from its own directory, so there is no shared package both could import. Tests: audit-service/app/tests.
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Optional
+
+# Longest time a validation is reused. Logout invalidates the token on the worker the login service reaches,
+# the other workers/replicas accept it for at most this long.
+MAX_TTL_SECONDS = 10
+
+
+def hash_token(token: str) -> str:
+    """Cache key for a token, the raw JWT is never kept in memory"""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class TokenCache:
+    """
+    Bounded LRU cache of successful session validations, keyed by the token hash.
+    Entries expire `ttl_seconds` (at most MAX_TTL_SECONDS) after they were validated with the login service;
+    when `max_entries` is reached the least recently used token is evicted. Only positive results are cached,
+    so a rejected token is always re-checked. A `ttl_seconds` of 0 disables the cache.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = min(ttl_seconds, MAX_TTL_SECONDS)
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        # metrics
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    def get(self, token: str) -> Optional[dict]:
+        """Cached user data for the token, None when missing or expired"""
+        if not self.enabled:
+            return None
+        key = hash_token(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, user_data = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expired += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return user_data
+
+    def set(self, token: str, user_data: dict, ttl_seconds: Optional[float] = None):
+        """Cache a successful validation, `ttl_seconds` can only shorten the configured TTL"""
+        if not self.enabled:
+            return
+        ttl = self.ttl_seconds if ttl_seconds is None else min(ttl_seconds, self.ttl_seconds)
+        if ttl <= 0:
+            return
+        key = hash_token(token)
+        self._entries[key] = (time.monotonic() + ttl, user_data)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, token: str) -> bool:
+        """Drop the token (logout), True when it was cached"""
+        removed = self._entries.pop(hash_token(token), None) is not None
+        if removed:
+            self.invalidations += 1
+        return removed
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "ttl_seconds": self.ttl_seconds,
+            "max_entries": self.max_entries,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
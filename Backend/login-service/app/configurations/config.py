@@ -31,4 +31,28 @@ class Settings(BaseSettings):
     pool_recycle: int = Field(..., alias="POOL_RECYCLE")
     pool_timeout: int = Field(..., alias="POOL_TIMEOUT")
 
+    # Session store backend: memory (single worker only), sqlite (file shared by the workers of one host)
+    # or redis (shared across hosts, needs the 'redis' package)
+    session_store_backend: str = Field("memory", alias="SESSION_STORE_BACKEND")
+    session_store_sqlite_path: str = Field("sessions.db", alias="SESSION_STORE_SQLITE_PATH")
+    session_store_redis_url: str = Field("redis://localhost:6379/0", alias="SESSION_STORE_REDIS_URL")
+
+    # Session limits (idle timeout in seconds, 0 = none; max live sessions, LRU evicted, 0 = unbounded)
+    # and the interval of the background sweep of expired/idle sessions
+    session_idle_timeout_seconds: float = Field(0, alias="SESSION_IDLE_TIMEOUT_SECONDS")
+    session_max_entries: int = Field(100000, alias="SESSION_MAX_ENTRIES")
+    session_sweep_interval_seconds: float = Field(60, alias="SESSION_SWEEP_INTERVAL_SECONDS")
+
+    # Password check thread pool (concurrent bcrypt checks, checks allowed to wait, seconds a check may wait)
+    password_hash_workers: int = Field(4, alias="PASSWORD_HASH_WORKERS")
+    password_hash_max_pending: int = Field(64, alias="PASSWORD_HASH_MAX_PENDING")
+    password_hash_wait_seconds: float = Field(5, alias="PASSWORD_HASH_WAIT_SECONDS")
+
+    # Seconds between checks of .htpasswd for changes (users are reloaded without a restart)
+    credential_reload_interval_seconds: float = Field(5, alias="CREDENTIAL_RELOAD_INTERVAL_SECONDS")
+
+    # Token cache invalidation endpoints of the services called on logout (comma separated), seconds per call
+    session_invalidate_urls: str = Field("", alias="SESSION_INVALIDATE_URLS")
+    session_invalidate_timeout_seconds: float = Field(2, alias="SESSION_INVALIDATE_TIMEOUT_SECONDS")
+
     model_config = ConfigDict(env_file=".env", case_sensitive=True)
\ No newline at end of file
@@ -3,12 +3,24 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from app.utils.logger import get_logger
 from app.routers import auth_routes, health_routes
+from app.services.session_store import session_store
+from app.services.hash_pool import hash_pool
+from app.services.credential_store import credential_store
+from app.configurations.config import Settings
+from app.utils.periodic_task import PeriodicTask
 import os
 import uvicorn
 
 # Initialize logger
 logger = get_logger(__name__)
 
+settings = Settings()
+
+# Background eviction of expired and idle sessions
+session_sweeper = PeriodicTask("session-sweep", settings.session_sweep_interval_seconds, session_store.sweep)
+# Background reload of .htpasswd when it changes
+credential_reloader = PeriodicTask("credential-reload", settings.credential_reload_interval_seconds, credential_store.reload_if_changed)
+
 # api path prefix
 API_PATH_PREFIX = "/pylogin"
 
@@ -17,9 +29,18 @@ API_PATH_PREFIX = "/pylogin"
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting up HealthCheck Login Dashboard API...")
+    # Connect the shared session store once per worker
+    await session_store.open()
+    logger.info(f"Session store backend: {session_store.name}")
+    session_sweeper.start()
+    credential_reloader.start()
     yield
     # Shutdown
     logger.info("Shutting down HealthCheck Login Dashboard API")
+    await credential_reloader.stop()
+    await session_sweeper.stop()
+    await session_store.close()
+    hash_pool.shutdown()
 
 app = FastAPI(
      title="Login Service HealthCheck Dashboard",
@@ -2,6 +2,7 @@ from fastapi import APIRouter, HTTPException, Depends, Request
 from pydantic import ValidationError
 from datetime import datetime
 from app.services.auth_service import auth_service
+from app.services.hash_pool import HashPoolBusyError
 from app.dtos.login_request_dtos import LoginRequest
 from app.dtos.login_response_dtos import LoginResponse
 from app.utils.logger import get_logger
@@ -14,8 +15,9 @@ router = APIRouter()
 async def login(login_request: LoginRequest):
     """User login endpoint"""
     try:
-        if auth_service.authenticate(login_request.username, login_request.password):
-            access_token = auth_service.create_session(login_request.username)
+        # bcrypt runs on the hash pool, the event loop keeps serving /session/validate
+        if await auth_service.authenticate_async(login_request.username, login_request.password):
+            access_token = await auth_service.create_session(login_request.username)
             response = LoginResponse(
                 statusCode=200,
                 message="Login successful",
@@ -32,6 +34,11 @@ async def login(login_request: LoginRequest):
                 detail="Invalid credentials"
             )
             
+    except HTTPException:
+        raise
+    except HashPoolBusyError as e:
+        logger.warning(f"Login rejected, password checks overloaded: {str(e)}")
+        raise HTTPException(status_code=503, detail="Login service busy, retry shortly", headers={"Retry-After": "1"})
     except ValidationError as e:
         logger.warning(f"Login validation error: {str(e)}")
         raise HTTPException(status_code=400, detail="Invalid request data")
@@ -56,7 +63,9 @@ async def logout(token: str):
             logger.error("No session_id found in current_user")
             raise HTTPException(status_code=400, detail="No active session found")
         
-        auth_service.logout(session_id)
+        await auth_service.logout(session_id)
+        # The session is gone, now make the services forget their cached validation of the token
+        await auth_service.notify_logout(token)
         logger.info(f"User: {username} logged out successfully")
         
         return {
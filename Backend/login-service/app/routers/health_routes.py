@@ -1,5 +1,8 @@
 
 from fastapi import APIRouter
+from app.services.session_store import session_store
+from app.services.hash_pool import hash_pool
+from app.services.credential_store import credential_store
 
 router = APIRouter(prefix='/api')
 
@@ -10,4 +13,18 @@ async def root():
     return {
         "Status": "healthy",
         "message": "Python healthcheck login-service is running successfully"
-    }
\ No newline at end of file
+    }
+
+# This endpoint exposes the session store (live sessions, evictions, last sweep), password hash pool and credential reload metrics
+@router.get("/metrics")
+async def get_metrics():
+    """Session store, password hash pool and credential store statistics"""
+    return {
+        "statusCode": 200,
+        "message": "Metrics fetched successfully",
+        "Data": {
+            "sessions": await session_store.stats(),
+            "password_hashing": hash_pool.stats(),
+            "credentials": credential_store.stats()
+        }
+    }
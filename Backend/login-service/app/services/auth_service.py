@@ -1,46 +1,57 @@
+import asyncio
 import uuid
 import os
+import httpx
 from datetime import datetime, timezone, timedelta
 from jose import JWTError, jwt
 from passlib.apache import HtpasswdFile
 from app.utils.logger import get_logger
 from app.configurations.config import Settings
+from app.services.session_store import session_store
+from app.services.hash_pool import hash_pool
+from app.services.credential_store import credential_store, HTPASSWD_PATH
 
 logger = get_logger(__name__)
 settings = Settings()
 
 class AuthService:
     def __init__(self):
-        self.ht = None
-        self.active_sessions = {}
+        # Users are served from the hot-reloaded credential store
+        self.credentials = credential_store
+        # Sessions live in the configured store so every worker/replica sees them
+        self.sessions = session_store
         self.secret_key = settings.secret_key
         self.algorithm = settings.algorithm
         self.access_token_expire_minutes = settings.access_token_expire_minutes
+        # Services caching validated tokens, told to drop a token on logout
+        self.invalidate_urls = [url.strip() for url in settings.session_invalidate_urls.split(",") if url.strip()]
         self.init_auth()
     
     def init_auth(self):
         """Initialize authentication service"""
         try:
-            htpasswd_path = os.path.join(os.path.dirname(__file__), '..', '..', '.htpasswd')
+            htpasswd_path = HTPASSWD_PATH
             if not os.path.exists(htpasswd_path):
                 logger.warning(f".htpasswd file not found at {htpasswd_path}")
-                self.ht = HtpasswdFile()
-                self.ht.set_password("admin", "jaya123")
-                self.ht.set_password("cstoreiq", "jaya@123")
-                self.ht.save(htpasswd_path)
+                ht = HtpasswdFile()
+                ht.set_password("admin", "jaya123")
+                ht.set_password("cstoreiq", "jaya@123")
+                ht.save(htpasswd_path)
                 logger.info("Default .htpasswd file created with development credentials")
-            else:
-                self.ht = HtpasswdFile(htpasswd_path)
-                logger.info("Loaded existing .htpasswd file")
+            self.credentials.load()
             
         except Exception as e:
             logger.error(f"Failed to initialize auth service: {str(e)}")
             raise
     
+    async def authenticate_async(self, username, password):
+        """Authenticate user credentials on the password hash pool, raises HashPoolBusyError when overloaded"""
+        return await hash_pool.run(self.authenticate, username, password)
+    
     def authenticate(self, username, password):
         """Authenticate user credentials"""
         try:
-            if self.ht and self.ht.check_password(username, password):
+            if self.credentials.check_password(username, password):
                 return True
             logger.warning(f"Failed authentication attempt for user: {username}")
             return False
@@ -67,7 +78,7 @@ class AuthService:
         except JWTError:
             return None
     
-    def create_session(self, username: str):
+    async def create_session(self, username: str):
         """Create user session"""
         session_id = str(uuid.uuid4())
         access_token_expires = timedelta(minutes=self.access_token_expire_minutes)
@@ -76,45 +87,53 @@ class AuthService:
             expires_delta=access_token_expires
         )
         
-        self.active_sessions[session_id] = {
-            "username": username,
-            "created_at": datetime.now(timezone.utc),
-            "last_seen": datetime.now(timezone.utc)
-        }
+        expires_at = (datetime.now(timezone.utc) + access_token_expires).timestamp()
+        await self.sessions.create(session_id, username, expires_at)
         
         return access_token
     
-    def validate_session(self, token: str):
+    async def validate_session(self, token: str):
         """Validate session token"""
         payload = self.verify_token(token)
         if not payload:
             return None
         
-        session_id = payload.get("session_id")
-        if session_id not in self.active_sessions:
-            return None
-        
         # Update last seen
-        self.active_sessions[session_id]["last_seen"] = datetime.now(timezone.utc)
-        return self.active_sessions[session_id]
+        return await self.sessions.touch(payload.get("session_id"))
     
-    def logout(self, session_id: str):
+    async def logout(self, session_id: str):
         """Logout user and clear session"""
         try:
             logger.debug(f"sessionid to logout :{session_id}")
-            if session_id in self.active_sessions:
-                username = self.active_sessions[session_id]["username"]
-                logger.info(f"deleting the sessionid:{session_id} for user {username}")
-                del self.active_sessions[session_id]
-                logger.info(f"successfully deleted the sessionid for the user:{username}")
+            session = await self.sessions.delete(session_id)
+            if session:
+                username = session["username"]
+                logger.info(f"successfully deleted the sessionid:{session_id} for the user:{username}")
                 logger.info(f"User {username} logged out")
             
         except Exception as e:
             logger.error(f"Logout error: {str(e)}")
     
-    def get_active_sessions_count(self):
+    async def notify_logout(self, token: str):
+        """Ask every service in SESSION_INVALIDATE_URLS to drop the token from its validated token cache"""
+        if not self.invalidate_urls:
+            return
+
+        async def invalidate(client: httpx.AsyncClient, url: str):
+            try:
+                response = await client.post(url, headers={"Authorization": f"Bearer {token}"})
+                if response.status_code != 200:
+                    logger.warning(f"Session invalidation at {url} failed: {response.status_code}")
+            except httpx.HTTPError as e:
+                # The service drops the token on its own once its cache TTL ends
+                logger.warning(f"Session invalidation at {url} failed: {str(e)}")
+
+        async with httpx.AsyncClient(timeout=settings.session_invalidate_timeout_seconds) as client:
+            await asyncio.gather(*(invalidate(client, url) for url in self.invalidate_urls))
+
+    async def get_active_sessions_count(self):
         """Get count of active sessions"""
-        return len(self.active_sessions)
+        return await self.sessions.count()
     
     async def get_current_user(self, token: str):
         """Get current user from token"""
@@ -132,15 +151,12 @@ class AuthService:
                 logger.warning(f"not found sessionid and username")
                 return None
             
-            # Validate session exists
-            if session_id not in self.active_sessions:
+            # Validate session exists and update last seen
+            user_data = await self.sessions.touch(session_id)
+            if not user_data:
                 return None
             
-            # Update last seen
-            self.active_sessions[session_id]["last_seen"] = datetime.now(timezone.utc)
-            
             # Return user data with session_id
-            user_data = self.active_sessions[session_id].copy()
             user_data["session_id"] = session_id  # Ensure session_id is included
             user_data["username"] = username  # Ensure username is included
             
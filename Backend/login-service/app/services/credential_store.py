@@ -0,0 +1,76 @@
+import asyncio
+import os
+from datetime import datetime
+from typing import Optional
+from passlib.apache import HtpasswdFile
+from app.configurations.config import Settings
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+settings = Settings()
+
+HTPASSWD_PATH = os.path.join(os.path.dirname(__file__), '..', '..', '.htpasswd')
+
+
+class CredentialStore:
+    """
+    In-memory user -> password hash map parsed from the .htpasswd file. The file is re-read in the background
+    when its mtime or size changes; the new map is parsed aside and swapped in with a single assignment, so a
+    password check always sees either the old or the new file, never a half-loaded one. A file that cannot be
+    read or has no users (e.g. caught mid-write) keeps the previous map. Sessions are not touched by a reload.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._htpasswd: Optional[HtpasswdFile] = None
+        self._signature = None
+        # metrics
+        self.loaded_at = None
+        self.reloads = 0
+        self.last_error = None
+
+    def _file_signature(self):
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self):
+        """Parse the file and swap the map in, raises when the file cannot be used"""
+        signature = self._file_signature()
+        htpasswd = HtpasswdFile(self.path)
+        if not htpasswd.users():
+            raise ValueError(f"No users in {self.path}")
+        # Changed again while it was being read, parse it on the next check
+        if self._file_signature() != signature:
+            raise ValueError(f"{self.path} changed while loading")
+        self._htpasswd = htpasswd
+        self._signature = signature
+        self.loaded_at = datetime.now()
+        self.last_error = None
+        logger.info(f"Loaded {len(htpasswd.users())} users from {self.path}")
+
+    async def reload_if_changed(self):
+        """Reload the file when its mtime or size changed since the last load"""
+        try:
+            if self._file_signature() == self._signature:
+                return
+            await asyncio.to_thread(self.load)
+            self.reloads += 1
+        except Exception as e:
+            self.last_error = str(e)
+            logger.warning(f"Credential reload skipped, keeping the previous users: {str(e)}")
+
+    def check_password(self, username: str, password: str) -> bool:
+        htpasswd = self._htpasswd
+        return bool(htpasswd and htpasswd.check_password(username, password))
+
+    def stats(self) -> dict:
+        return {
+            "users": len(self._htpasswd.users()) if self._htpasswd else 0,
+            "loaded_at": self.loaded_at,
+            "reloads": self.reloads,
+            "last_error": self.last_error,
+        }
+
+
+# Global store, loaded by AuthService and re-checked from the FastAPI lifespan (app/main.py)
+credential_store = CredentialStore(HTPASSWD_PATH)
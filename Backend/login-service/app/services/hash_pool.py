@@ -0,0 +1,88 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+from app.configurations.config import Settings
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+settings = Settings()
+
+
+class HashPoolBusyError(Exception):
+    """Raised when a password check cannot get a worker thread in time"""
+
+
+class HashPool:
+    """
+    Runs the CPU-bound password checks (bcrypt) in a bounded thread pool so they never block the event loop
+    and /session/validate keeps its latency during a login storm. At most `max_workers` checks run at once;
+    up to `max_pending` more wait for a slot for at most `wait_seconds`, anything beyond is rejected
+    with HashPoolBusyError (HTTP 503) instead of queueing without bound.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int, wait_seconds: float):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.wait_seconds = wait_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hash")
+        self._slots = asyncio.Semaphore(max_workers)
+        # metrics
+        self.in_flight = 0
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.last_check_ms = None
+        self.max_check_ms = 0.0
+
+    async def run(self, func: Callable, *args):
+        """Run `func(*args)` on a pool thread once a slot is free"""
+        if not self._slots.locked():
+            # A worker is free, acquire returns right away
+            await self._slots.acquire()
+        else:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise HashPoolBusyError("Too many password checks waiting")
+            self.pending += 1
+            try:
+                await asyncio.wait_for(self._slots.acquire(), timeout=self.wait_seconds)
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                raise HashPoolBusyError(f"No password check slot free within {self.wait_seconds}s")
+            finally:
+                self.pending -= 1
+
+        self.in_flight += 1
+        started = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+            self.completed += 1
+            self.last_check_ms = round((time.perf_counter() - started) * 1000, 3)
+            self.max_check_ms = max(self.max_check_ms, self.last_check_ms)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "in_flight": self.in_flight,
+            "pending": self.pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "last_check_ms": self.last_check_ms,
+            "max_check_ms": self.max_check_ms,
+        }
+
+
+# Global pool, shut down from the FastAPI lifespan (app/main.py)
+hash_pool = HashPool(
+    max_workers=settings.password_hash_workers,
+    max_pending=settings.password_hash_max_pending,
+    wait_seconds=settings.password_hash_wait_seconds,
+)
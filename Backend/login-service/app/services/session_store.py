@@ -0,0 +1,397 @@
+import abc
+import asyncio
+import heapq
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Optional
+from app.configurations.config import Settings
+from app.utils.logger import get_logger
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # only needed for SESSION_STORE_BACKEND=redis
+    aioredis = None
+
+logger = get_logger(__name__)
+settings = Settings()
+
+
+def _to_datetime(epoch: float) -> datetime:
+    return datetime.fromtimestamp(float(epoch), tz=timezone.utc)
+
+
+def _session(username: str, created_at: float, last_seen: float) -> dict:
+    """Session shape returned by every backend (same keys the in-process dict used to hold)"""
+    return {
+        "username": username,
+        "created_at": _to_datetime(created_at),
+        "last_seen": _to_datetime(last_seen),
+    }
+
+
+class SessionStore(abc.ABC):
+    """
+    Login sessions by session_id. Timestamps are epoch seconds; `expires_at` is the exp of the session's token.
+    `touch` updates last_seen and returns the session, None when it does not exist or has been idle for longer
+    than `idle_timeout_seconds` (0 = no idle timeout). At most `max_entries` sessions are kept (0 = unbounded),
+    creating one more evicts the least recently seen. `sweep` removes expired and idle sessions from a
+    time-ordered index, it never scans every session. Eviction counters are per process.
+    """
+
+    name = "base"
+
+    def __init__(self, idle_timeout_seconds: float = 0, max_entries: int = 0):
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self.max_entries = max_entries
+        # metrics
+        self.evicted_expired = 0
+        self.evicted_idle = 0
+        self.evicted_capacity = 0
+        self.last_sweep_at = None
+        self.last_sweep_ms = None
+
+    def _idle_cutoff(self, now: float) -> float:
+        """Sessions last seen before this are idle"""
+        return now - self.idle_timeout_seconds if self.idle_timeout_seconds > 0 else 0.0
+
+    async def sweep(self):
+        """Evict the sessions past their token lifetime or the idle timeout"""
+        started = time.perf_counter()
+        expired, idle = await self._sweep(time.time())
+        self.evicted_expired += expired
+        self.evicted_idle += idle
+        self.last_sweep_at = datetime.now()
+        self.last_sweep_ms = round((time.perf_counter() - started) * 1000, 3)
+        if expired or idle:
+            logger.info(f"Session sweep evicted {expired} expired and {idle} idle sessions in {self.last_sweep_ms} ms")
+
+    async def stats(self) -> dict:
+        return {
+            "backend": self.name,
+            "live_sessions": await self.count(),
+            "max_entries": self.max_entries,
+            "idle_timeout_seconds": self.idle_timeout_seconds,
+            "evicted_expired": self.evicted_expired,
+            "evicted_idle": self.evicted_idle,
+            "evicted_capacity": self.evicted_capacity,
+            "last_sweep_at": self.last_sweep_at,
+            "last_sweep_ms": self.last_sweep_ms,
+        }
+
+    async def open(self):
+        pass
+
+    async def close(self):
+        pass
+
+    @abc.abstractmethod
+    async def create(self, session_id: str, username: str, expires_at: float):
+        """Store a new session (replacing one with the same id), evicting the least recently seen over max_entries"""
+
+    @abc.abstractmethod
+    async def touch(self, session_id: str) -> Optional[dict]:
+        """Update last_seen and return the session, None when missing or idle"""
+
+    @abc.abstractmethod
+    async def delete(self, session_id: str) -> Optional[dict]:
+        """Remove the session and return it, None when missing"""
+
+    @abc.abstractmethod
+    async def count(self) -> int:
+        """Number of stored sessions"""
+
+    @abc.abstractmethod
+    async def _sweep(self, now: float) -> tuple:
+        """Remove expired and idle sessions, returns (expired, idle) counts"""
+
+
+class MemorySessionStore(SessionStore):
+    """
+    In-process dict, only valid with a single uvicorn worker and a single replica.
+    The dict is kept in last_seen order (LRU first) and a heap orders the sessions by expiry.
+    """
+
+    name = "memory"
+
+    def __init__(self, idle_timeout_seconds: float = 0, max_entries: int = 0):
+        super().__init__(idle_timeout_seconds, max_entries)
+        self.sessions = OrderedDict()
+        # (expires_at, session_id), entries of sessions removed earlier are skipped when popped
+        self._expiry_heap = []
+
+    async def create(self, session_id: str, username: str, expires_at: float):
+        now = time.time()
+        self.sessions[session_id] = {"username": username, "created_at": now, "last_seen": now, "expires_at": expires_at}
+        self.sessions.move_to_end(session_id)
+        heapq.heappush(self._expiry_heap, (expires_at, session_id))
+        while self.max_entries and len(self.sessions) > self.max_entries:
+            self.sessions.popitem(last=False)
+            self.evicted_capacity += 1
+        # Logouts and evictions leave stale heap entries behind, rebuild once they dominate
+        if len(self._expiry_heap) > 2 * len(self.sessions) + 1024:
+            self._expiry_heap = [(entry["expires_at"], sid) for sid, entry in self.sessions.items()]
+            heapq.heapify(self._expiry_heap)
+
+    async def touch(self, session_id: str) -> Optional[dict]:
+        entry = self.sessions.get(session_id)
+        if entry is None:
+            return None
+        now = time.time()
+        if entry["last_seen"] < self._idle_cutoff(now):
+            del self.sessions[session_id]
+            self.evicted_idle += 1
+            return None
+        entry["last_seen"] = now
+        self.sessions.move_to_end(session_id)
+        return _session(entry["username"], entry["created_at"], entry["last_seen"])
+
+    async def delete(self, session_id: str) -> Optional[dict]:
+        entry = self.sessions.pop(session_id, None)
+        if entry is None:
+            return None
+        return _session(entry["username"], entry["created_at"], entry["last_seen"])
+
+    async def count(self) -> int:
+        return len(self.sessions)
+
+    async def _sweep(self, now: float) -> tuple:
+        expired = 0
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            expires_at, session_id = heapq.heappop(self._expiry_heap)
+            entry = self.sessions.get(session_id)
+            if entry is not None and entry["expires_at"] == expires_at:
+                del self.sessions[session_id]
+                expired += 1
+
+        idle = 0
+        if self.idle_timeout_seconds > 0:
+            cutoff = self._idle_cutoff(now)
+            while self.sessions:
+                session_id, entry = next(iter(self.sessions.items()))
+                if entry["last_seen"] >= cutoff:
+                    break
+                self.sessions.popitem(last=False)
+                idle += 1
+        return expired, idle
+
+
+class SqliteSessionStore(SessionStore):
+    """
+    Sessions in a SQLite file in WAL mode, shared by all workers on one host (readers never block the writer).
+    Each process keeps one connection; calls run in a worker thread so the event loop is not blocked on disk.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str, idle_timeout_seconds: float = 0, max_entries: int = 0):
+        super().__init__(idle_timeout_seconds, max_entries)
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                username   TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_seen  REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions (expires_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_last_seen ON sessions (last_seen)")
+        logger.info(f"SQLite session store opened at {self.path}")
+        return conn
+
+    async def _run(self, func, *args):
+        def call():
+            with self._lock:
+                if self._conn is None:
+                    self._conn = self._connect()
+                return func(self._conn, *args)
+        return await asyncio.to_thread(call)
+
+    async def open(self):
+        await self._run(lambda conn: None)
+
+    async def close(self):
+        def close_conn():
+            with self._lock:
+                if self._conn is not None:
+                    self._conn.close()
+                    self._conn = None
+        await asyncio.to_thread(close_conn)
+
+    async def create(self, session_id: str, username: str, expires_at: float):
+        now = time.time()
+
+        def insert(conn):
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, username, created_at, last_seen, expires_at) VALUES (?, ?, ?, ?, ?)",
+                (session_id, username, now, now, expires_at)
+            )
+            if not self.max_entries:
+                return 0
+            # Over the cap: drop the least recently seen sessions
+            return conn.execute("""
+                DELETE FROM sessions WHERE session_id IN (
+                    SELECT session_id FROM sessions ORDER BY last_seen
+                    LIMIT max(0, (SELECT count(*) FROM sessions) - ?)
+                )
+            """, (self.max_entries,)).rowcount
+
+        self.evicted_capacity += await self._run(insert)
+
+    async def touch(self, session_id: str) -> Optional[dict]:
+        now = time.time()
+        row = await self._run(lambda conn: conn.execute(
+            "UPDATE sessions SET last_seen = ? WHERE session_id = ? AND last_seen >= ? RETURNING username, created_at, last_seen",
+            (now, session_id, self._idle_cutoff(now))
+        ).fetchone())
+        return _session(*row) if row else None
+
+    async def delete(self, session_id: str) -> Optional[dict]:
+        row = await self._run(lambda conn: conn.execute(
+            "DELETE FROM sessions WHERE session_id = ? RETURNING username, created_at, last_seen",
+            (session_id,)
+        ).fetchone())
+        return _session(*row) if row else None
+
+    async def count(self) -> int:
+        return await self._run(lambda conn: conn.execute("SELECT count(*) FROM sessions").fetchone()[0])
+
+    async def _sweep(self, now: float) -> tuple:
+        def delete(conn):
+            # Both deletes are range scans on the expires_at / last_seen indexes
+            expired = conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,)).rowcount
+            idle = 0
+            if self.idle_timeout_seconds > 0:
+                idle = conn.execute("DELETE FROM sessions WHERE last_seen < ?", (self._idle_cutoff(now),)).rowcount
+            return expired, idle
+        return await self._run(delete)
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Sessions in Redis (or any Redis-protocol server), shared across workers and replicas.
+    One hash per session expiring with its token, plus sorted sets by expiry and by last_seen
+    used for counting, the idle sweep and LRU eviction.
+    """
+
+    name = "redis"
+    KEY_PREFIX = "pylogin:session:"
+    INDEX_KEY = "pylogin:sessions"
+    LAST_SEEN_KEY = "pylogin:sessions:last_seen"
+
+    def __init__(self, url: str, idle_timeout_seconds: float = 0, max_entries: int = 0):
+        super().__init__(idle_timeout_seconds, max_entries)
+        if aioredis is None:
+            raise RuntimeError("SESSION_STORE_BACKEND=redis needs the 'redis' package")
+        self.url = url
+        self.client = None
+
+    async def open(self):
+        if self.client is None:
+            self.client = aioredis.from_url(self.url, decode_responses=True)
+            await self.client.ping()
+            logger.info("Redis session store connected")
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    async def create(self, session_id: str, username: str, expires_at: float):
+        await self.open()
+        now = time.time()
+        key = self.KEY_PREFIX + session_id
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping={"username": username, "created_at": now, "last_seen": now, "expires_at": expires_at})
+            pipe.expireat(key, int(expires_at) + 1)
+            pipe.zadd(self.INDEX_KEY, {session_id: expires_at})
+            pipe.zadd(self.LAST_SEEN_KEY, {session_id: now})
+            pipe.zcard(self.LAST_SEEN_KEY)
+            results = await pipe.execute()
+        overflow = results[-1] - self.max_entries
+        if self.max_entries and overflow > 0:
+            evicted = [sid for sid, _ in await self.client.zpopmin(self.LAST_SEEN_KEY, overflow)]
+            await self._remove(evicted)
+            self.evicted_capacity += len(evicted)
+
+    async def touch(self, session_id: str) -> Optional[dict]:
+        await self.open()
+        key = self.KEY_PREFIX + session_id
+        entry = await self.client.hgetall(key)
+        if not entry:
+            return None
+        now = time.time()
+        if float(entry["last_seen"]) < self._idle_cutoff(now):
+            await self._remove([session_id])
+            self.evicted_idle += 1
+            return None
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.hset(key, "last_seen", now)
+            pipe.zadd(self.LAST_SEEN_KEY, {session_id: now})
+            await pipe.execute()
+        return _session(entry["username"], entry["created_at"], now)
+
+    async def _remove(self, session_ids: list):
+        if not session_ids:
+            return
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.delete(*[self.KEY_PREFIX + sid for sid in session_ids])
+            pipe.zrem(self.INDEX_KEY, *session_ids)
+            pipe.zrem(self.LAST_SEEN_KEY, *session_ids)
+            await pipe.execute()
+
+    async def delete(self, session_id: str) -> Optional[dict]:
+        await self.open()
+        key = self.KEY_PREFIX + session_id
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hgetall(key)
+            pipe.delete(key)
+            pipe.zrem(self.INDEX_KEY, session_id)
+            pipe.zrem(self.LAST_SEEN_KEY, session_id)
+            entry, _, _, _ = await pipe.execute()
+        if not entry:
+            return None
+        return _session(entry["username"], entry["created_at"], entry["last_seen"])
+
+    async def count(self) -> int:
+        await self.open()
+        return await self.client.zcard(self.INDEX_KEY)
+
+    async def _sweep(self, now: float) -> tuple:
+        await self.open()
+        # Hashes expire on their own, only their index entries are left to remove
+        expired_ids = await self.client.zrangebyscore(self.INDEX_KEY, "-inf", now)
+        await self._remove(expired_ids)
+        idle_ids = []
+        if self.idle_timeout_seconds > 0:
+            idle_ids = await self.client.zrangebyscore(self.LAST_SEEN_KEY, "-inf", f"({self._idle_cutoff(now)}")
+            await self._remove(idle_ids)
+        return len(expired_ids), len(idle_ids)
+
+
+# This function is used to build the session store selected by SESSION_STORE_BACKEND
+def create_session_store(backend: str) -> SessionStore:
+    backend = backend.lower()
+    limits = {"idle_timeout_seconds": settings.session_idle_timeout_seconds, "max_entries": settings.session_max_entries}
+    if backend == "memory":
+        return MemorySessionStore(**limits)
+    if backend == "sqlite":
+        return SqliteSessionStore(settings.session_store_sqlite_path, **limits)
+    if backend == "redis":
+        return RedisSessionStore(settings.session_store_redis_url, **limits)
+    raise ValueError(f"Unknown SESSION_STORE_BACKEND '{backend}', expected memory, sqlite or redis")
+
+
+# Global session store, opened/closed and swept from the FastAPI lifespan (app/main.py)
+session_store = create_session_store(settings.session_store_backend)
@@ -0,0 +1,123 @@
+import asyncio
+import os
+from passlib.apache import HtpasswdFile
+from app.services.auth_service import AuthService
+from app.services.credential_store import CredentialStore
+from app.services.session_store import MemorySessionStore
+
+
+def _write_users(path, users: dict):
+    htpasswd = HtpasswdFile(str(path), new=True)
+    for username, password in users.items():
+        htpasswd.set_password(username, password)
+    htpasswd.save()
+    _bump_mtime(path)
+
+
+def _bump_mtime(path):
+    """Make every rewrite visible to the mtime/size check, even within the filesystem's timestamp resolution"""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def _loaded_store(tmp_path, users: dict) -> CredentialStore:
+    path = tmp_path / ".htpasswd"
+    _write_users(path, users)
+    store = CredentialStore(str(path))
+    store.load()
+    return store
+
+
+def test_changed_file_is_swapped_in(tmp_path):
+    store = _loaded_store(tmp_path, {"alice": "old-password"})
+
+    _write_users(tmp_path / ".htpasswd", {"alice": "new-password", "bob": "bob-password"})
+    asyncio.run(store.reload_if_changed())
+
+    assert store.reloads == 1
+    assert store.check_password("alice", "new-password")
+    assert not store.check_password("alice", "old-password")
+    assert store.check_password("bob", "bob-password")
+    assert store.stats()["users"] == 2
+
+
+def test_unchanged_file_is_not_reloaded(tmp_path):
+    store = _loaded_store(tmp_path, {"alice": "password"})
+
+    asyncio.run(store.reload_if_changed())
+
+    assert store.reloads == 0
+    assert store.check_password("alice", "password")
+
+
+def test_empty_file_keeps_the_previous_users(tmp_path):
+    store = _loaded_store(tmp_path, {"alice": "password"})
+    path = tmp_path / ".htpasswd"
+
+    # Truncated by an editor that is about to write the new content
+    path.write_text("")
+    _bump_mtime(path)
+    asyncio.run(store.reload_if_changed())
+
+    assert store.reloads == 0
+    assert store.last_error
+    assert store.check_password("alice", "password")
+
+    # The complete file is picked up on the next check
+    _write_users(path, {"alice": "new-password"})
+    asyncio.run(store.reload_if_changed())
+
+    assert store.reloads == 1
+    assert store.last_error is None
+    assert store.check_password("alice", "new-password")
+
+
+def test_half_written_file_keeps_the_previous_users(tmp_path):
+    store = _loaded_store(tmp_path, {"alice": "password"})
+    path = tmp_path / ".htpasswd"
+
+    # Cut off in the middle of the first line, before the hash separator
+    path.write_text("bo")
+    _bump_mtime(path)
+    asyncio.run(store.reload_if_changed())
+
+    assert store.reloads == 0
+    assert store.check_password("alice", "password")
+    assert not store.check_password("bo", "")
+
+
+def test_missing_file_keeps_the_previous_users(tmp_path):
+    store = _loaded_store(tmp_path, {"alice": "password"})
+
+    os.remove(tmp_path / ".htpasswd")
+    asyncio.run(store.reload_if_changed())
+
+    assert store.last_error
+    assert store.check_password("alice", "password")
+
+
+def test_sessions_survive_a_reload(tmp_path):
+    auth_service = AuthService.__new__(AuthService)
+    auth_service.credentials = _loaded_store(tmp_path, {"alice": "old-password"})
+    auth_service.sessions = MemorySessionStore()
+    auth_service.secret_key = "test-secret"
+    auth_service.algorithm = "HS256"
+    auth_service.access_token_expire_minutes = 30
+
+    async def run():
+        await auth_service.sessions.open()
+        try:
+            token = await auth_service.create_session("alice")
+            # Password changed while alice is logged in
+            _write_users(tmp_path / ".htpasswd", {"alice": "new-password"})
+            await auth_service.credentials.reload_if_changed()
+            return await auth_service.validate_session(token)
+        finally:
+            await auth_service.sessions.close()
+
+    session = asyncio.run(run())
+
+    assert auth_service.credentials.reloads == 1
+    assert session["username"] == "alice"
+    assert auth_service.authenticate("alice", "new-password")
+    assert not auth_service.authenticate("alice", "old-password")
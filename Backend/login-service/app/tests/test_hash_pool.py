@@ -0,0 +1,119 @@
+import asyncio
+import threading
+import time
+import pytest
+from fastapi import HTTPException
+from app.dtos.login_request_dtos import LoginRequest
+from app.routers import auth_routes
+from app.services.hash_pool import HashPool, HashPoolBusyError
+
+
+def _blocking_check(release: threading.Event):
+    """Stands for a bcrypt check that lasts until `release` is set"""
+    def check():
+        release.wait(timeout=5)
+        return True
+    return check
+
+
+def test_at_most_max_workers_checks_run_at_once():
+    pool = HashPool(max_workers=2, max_pending=10, wait_seconds=5)
+    lock = threading.Lock()
+    running = [0]
+    peak = [0]
+
+    def check():
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+        return True
+
+    async def run():
+        return await asyncio.gather(*(pool.run(check) for _ in range(6)))
+
+    try:
+        assert asyncio.run(run()) == [True] * 6
+    finally:
+        pool.shutdown()
+    assert peak[0] == 2
+    assert pool.completed == 6
+    assert pool.rejected == 0
+
+
+def test_checks_beyond_max_pending_are_rejected_right_away():
+    pool = HashPool(max_workers=1, max_pending=1, wait_seconds=5)
+    release = threading.Event()
+
+    async def run():
+        running = asyncio.create_task(pool.run(_blocking_check(release)))
+        await asyncio.sleep(0.01)
+        waiting = asyncio.create_task(pool.run(lambda: "waited"))
+        await asyncio.sleep(0.01)
+        assert pool.stats()["pending"] == 1
+
+        with pytest.raises(HashPoolBusyError):
+            await pool.run(lambda: "rejected")
+
+        release.set()
+        return await running, await waiting
+
+    try:
+        assert asyncio.run(run()) == (True, "waited")
+    finally:
+        release.set()
+        pool.shutdown()
+    assert pool.rejected == 1
+    assert pool.completed == 2
+    assert pool.pending == 0
+
+
+def test_check_waiting_past_wait_seconds_is_rejected():
+    pool = HashPool(max_workers=1, max_pending=5, wait_seconds=0.05)
+    release = threading.Event()
+
+    async def run():
+        running = asyncio.create_task(pool.run(_blocking_check(release)))
+        await asyncio.sleep(0.01)
+        with pytest.raises(HashPoolBusyError):
+            await pool.run(lambda: "too late")
+        release.set()
+        return await running
+
+    try:
+        assert asyncio.run(run()) is True
+    finally:
+        release.set()
+        pool.shutdown()
+    assert pool.rejected == 1
+    assert pool.pending == 0
+
+
+def test_login_timed_out_on_the_pool_is_answered_503(monkeypatch):
+    pool = HashPool(max_workers=1, max_pending=5, wait_seconds=0.05)
+    release = threading.Event()
+
+    async def authenticate_async(username, password):
+        return await pool.run(lambda: True)
+
+    monkeypatch.setattr(auth_routes.auth_service, "authenticate_async", authenticate_async)
+
+    async def run():
+        running = asyncio.create_task(pool.run(_blocking_check(release)))
+        await asyncio.sleep(0.01)
+        try:
+            await auth_routes.login(LoginRequest(username="user", password="secret"))
+        finally:
+            release.set()
+            await running
+
+    try:
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(run())
+    finally:
+        release.set()
+        pool.shutdown()
+    assert error.value.status_code == 503
+    assert error.value.headers == {"Retry-After": "1"}
@@ -0,0 +1,51 @@
+import asyncio
+import httpx
+from app.services import auth_service as auth_service_module
+from app.services.auth_service import auth_service
+
+
+def _mock_client(monkeypatch, handler):
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(auth_service_module.httpx, "AsyncClient",
+                        lambda **kwargs: real_client(transport=httpx.MockTransport(handler), **kwargs))
+
+
+def test_logout_invalidates_the_token_at_every_service(monkeypatch):
+    received = []
+
+    def handler(request):
+        received.append((str(request.url), request.headers["Authorization"]))
+        return httpx.Response(200, json={"StatusCode": 200})
+
+    _mock_client(monkeypatch, handler)
+    monkeypatch.setattr(auth_service, "invalidate_urls", ["http://audit/invalidate", "http://store/invalidate"])
+    asyncio.run(auth_service.notify_logout("the-token"))
+
+    assert sorted(received) == [
+        ("http://audit/invalidate", "Bearer the-token"),
+        ("http://store/invalidate", "Bearer the-token"),
+    ]
+
+
+def test_unreachable_service_does_not_fail_the_logout(monkeypatch):
+    received = []
+
+    def handler(request):
+        if request.url.host == "down":
+            raise httpx.ConnectError("connection refused")
+        received.append(request.url.host)
+        return httpx.Response(500)
+
+    _mock_client(monkeypatch, handler)
+    monkeypatch.setattr(auth_service, "invalidate_urls", ["http://down/invalidate", "http://up/invalidate"])
+    asyncio.run(auth_service.notify_logout("the-token"))
+    assert received == ["up"]
+
+
+def test_no_invalidation_urls_makes_no_call(monkeypatch):
+    def handler(request):
+        raise AssertionError("no call expected")
+
+    _mock_client(monkeypatch, handler)
+    monkeypatch.setattr(auth_service, "invalidate_urls", [])
+    asyncio.run(auth_service.notify_logout("the-token"))
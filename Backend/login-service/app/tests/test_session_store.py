@@ -0,0 +1,119 @@
+import asyncio
+import time
+from types import SimpleNamespace
+import pytest
+from app.services import session_store as session_store_module
+from app.services.session_store import MemorySessionStore, SessionStore, SqliteSessionStore
+
+BACKENDS = ["memory", "sqlite"]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(session_store_module, "time", SimpleNamespace(time=clock, perf_counter=time.perf_counter))
+    return clock
+
+
+def _store(backend, tmp_path, **limits) -> SessionStore:
+    if backend == "memory":
+        return MemorySessionStore(**limits)
+    return SqliteSessionStore(str(tmp_path / "sessions.db"), **limits)
+
+
+def _run(store, scenario):
+    """Run the scenario against an opened store, always closing it"""
+    async def run():
+        await store.open()
+        try:
+            return await scenario(store)
+        finally:
+            await store.close()
+    return asyncio.run(run())
+
+
+def test_session_store_is_abstract():
+    with pytest.raises(TypeError):
+        SessionStore()
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_create_touch_delete(backend, tmp_path, clock):
+    async def scenario(store):
+        await store.create("s1", "jdoe", clock.now + 3600)
+        created_at = clock.now
+        clock.now += 10
+        touched = await store.touch("s1")
+        assert touched["username"] == "jdoe"
+        assert touched["created_at"].timestamp() == created_at
+        assert touched["last_seen"].timestamp() == clock.now
+        assert await store.count() == 1
+
+        deleted = await store.delete("s1")
+        assert deleted["username"] == "jdoe"
+        assert await store.touch("s1") is None
+        assert await store.delete("s1") is None
+        assert await store.count() == 0
+
+    _run(_store(backend, tmp_path), scenario)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_touch_rejects_an_idle_session(backend, tmp_path, clock):
+    async def scenario(store):
+        await store.create("s1", "jdoe", clock.now + 3600)
+        clock.now += 30
+        assert await store.touch("s1") is not None
+        clock.now += 61
+        assert await store.touch("s1") is None
+
+    _run(_store(backend, tmp_path, idle_timeout_seconds=60), scenario)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_sweep_removes_expired_and_idle_sessions(backend, tmp_path, clock):
+    async def scenario(store):
+        await store.create("expires", "a", clock.now + 50)
+        await store.create("idle", "b", clock.now + 3600)
+        await store.create("active", "c", clock.now + 3600)
+        clock.now += 100
+        await store.touch("active")
+        clock.now += 30
+
+        await store.sweep()
+        assert await store.count() == 1
+        assert await store.touch("active") is not None
+        stats = await store.stats()
+        assert stats["evicted_expired"] == 1
+        assert stats["evicted_idle"] == 1
+        assert stats["live_sessions"] == 1
+
+    _run(_store(backend, tmp_path, idle_timeout_seconds=120), scenario)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_max_entries_evicts_the_least_recently_seen(backend, tmp_path, clock):
+    async def scenario(store):
+        for session_id in ("s1", "s2"):
+            await store.create(session_id, session_id, clock.now + 3600)
+            clock.now += 1
+        # s1 is now more recent than s2
+        await store.touch("s1")
+        clock.now += 1
+        await store.create("s3", "s3", clock.now + 3600)
+
+        assert await store.count() == 2
+        assert await store.touch("s2") is None
+        assert await store.touch("s1") is not None
+        assert await store.touch("s3") is not None
+        assert store.evicted_capacity == 1
+
+    _run(_store(backend, tmp_path, max_entries=2), scenario)
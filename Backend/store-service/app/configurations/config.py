@@ -34,13 +34,30 @@ class Settings(BaseSettings):
     # Health Check Login Service url
     health_check_login_service_session_validate_url: str = Field(..., alias="HEALTH_CHECK_LOGIN_SERVICE_SESSION_VALIDATE_URL")
     health_check_login_service_session_validate_url_expire_seconds: int = Field(..., alias="HEALTH_CHECK_LOGIN_SERVICE_SESSION_VALIDATE_URL_EXPIRE_SECONDS")
+
+    # Login service HTTP client (connection pool limits, keep-alive expiry in seconds, optional HTTP/2 - needs 'h2')
+    login_service_max_connections: int = Field(100, alias="LOGIN_SERVICE_MAX_CONNECTIONS")
+    login_service_max_keepalive_connections: int = Field(20, alias="LOGIN_SERVICE_MAX_KEEPALIVE_CONNECTIONS")
+    login_service_keepalive_expiry_seconds: float = Field(30, alias="LOGIN_SERVICE_KEEPALIVE_EXPIRY_SECONDS")
+    login_service_http2: bool = Field(False, alias="LOGIN_SERVICE_HTTP2")
+
+    # Validated token cache (seconds a validation is reused, 0 disables the cache; max cached tokens, LRU evicted)
+    token_cache_ttl_seconds: float = Field(5, alias="TOKEN_CACHE_TTL_SECONDS")
+    token_cache_max_entries: int = Field(10000, alias="TOKEN_CACHE_MAX_ENTRIES")
+
+    # Local JWT verification with SECRET_KEY/ALGORITHM before the login service is called (opt-in,
+    # only enable it when SECRET_KEY and ALGORITHM are the login service's, other tokens are rejected with 401)
+    jwt_local_verification_enabled: bool = Field(False, alias="JWT_LOCAL_VERIFICATION_ENABLED")
+    # Remote session liveness check, false = stateless mode (signature and expiry only)
+    session_remote_validation_enabled: bool = Field(True, alias="SESSION_REMOTE_VALIDATION_ENABLED")
     
     # Public endpoints that don't require authentication
     public_paths: list = [
         "/pystore/docs",
         "/pystore/redoc", 
         "/pystore/openapi.json",
-        "/pystore/api/healthcheck"
+        "/pystore/api/healthcheck",
+        "/pystore/api/session/invalidate"
     ]
 
     model_config = ConfigDict(env_file=".env", case_sensitive=True)
\ No newline at end of file
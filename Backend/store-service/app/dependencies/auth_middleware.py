@@ -1,8 +1,13 @@
 from fastapi import Request
 from fastapi.responses import JSONResponse
-import requests
+import asyncio
+import time
+import httpx
+from jose import JWTError, jwt
+from typing import Optional
 from app.configurations.config import Settings
 from app.utils.logger import get_logger
+from app.utils.token_cache import TokenCache, hash_token
 
 logger = get_logger(__name__)
 settings = Settings()
@@ -12,37 +17,139 @@ class AuthMiddleware:
         logger.info("Auth Middleware initialized")
         # Build session validation URL from health check URL
         self.validate_url = settings.health_check_login_service_session_validate_url
+        # Shared keep-alive client for the login service, opened/closed in the FastAPI lifespan
+        self.http_client: Optional[httpx.AsyncClient] = None
+        # Recently validated tokens, a repeated token skips the login service round trip
+        self.token_cache = TokenCache(
+            ttl_seconds=settings.token_cache_ttl_seconds,
+            max_entries=settings.token_cache_max_entries
+        )
+        # Validations in flight, parallel requests with the same token share one login service call
+        self._pending: dict = {}
+        # Signature/expiry check in-process, a bad or expired token never reaches the login service
+        self.local_verification = bool(settings.secret_key) and settings.jwt_local_verification_enabled
+        self.remote_validation = settings.session_remote_validation_enabled
+        if not self.remote_validation and not self.local_verification:
+            logger.warning("Stateless mode needs local JWT verification (JWT_LOCAL_VERIFICATION_ENABLED), keeping the login service check")
+            self.remote_validation = True
+        # metrics
+        self.local_rejections = 0
+        self.remote_validations = 0
         self.public_paths = settings.public_paths
     
+    async def start(self):
+        """Create the pooled HTTP client used for session validation"""
+        if self.http_client is not None:
+            return
+        limits = httpx.Limits(
+            max_connections=settings.login_service_max_connections,
+            max_keepalive_connections=settings.login_service_max_keepalive_connections,
+            keepalive_expiry=settings.login_service_keepalive_expiry_seconds
+        )
+        timeout = httpx.Timeout(settings.health_check_login_service_session_validate_url_expire_seconds)
+        try:
+            self.http_client = httpx.AsyncClient(limits=limits, timeout=timeout, http2=settings.login_service_http2)
+        except ImportError:
+            # http2=True needs the optional 'h2' package, fall back to HTTP/1.1 keep-alive
+            logger.warning("HTTP/2 requested for the login service but 'h2' is not installed, using HTTP/1.1")
+            self.http_client = httpx.AsyncClient(limits=limits, timeout=timeout)
+        logger.info(f"Login service HTTP client started (max connections {settings.login_service_max_connections}, "
+                    f"http2={settings.login_service_http2})")
+
+    async def close(self):
+        """Close the pooled HTTP client and its keep-alive connections"""
+        if self.http_client is not None:
+            await self.http_client.aclose()
+            self.http_client = None
+            logger.info("Login service HTTP client closed")
+
     async def validate_token(self, token: str) -> dict:
+        """Validate JWT token, from the token cache or by calling login service session validation"""
+        user_data = self.token_cache.get(token)
+        if user_data is not None:
+            return user_data
+
+        payload = None
+        if self.local_verification:
+            payload = self.decode_token(token)
+            if payload is None:
+                self.local_rejections += 1
+                return None
+        # A cached validation never outlives the token itself
+        expires_in = payload["exp"] - time.time() if payload and payload.get("exp") else None
+
+        if not self.remote_validation:
+            user_data = {
+                'username': payload.get('sub'),
+                'last_seen': None,
+                'validated': True
+            }
+            self.token_cache.set(token, user_data, ttl_seconds=expires_in)
+            return user_data
+
+        key = hash_token(token)
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._validate_with_login_service(token, expires_in))
+            self._pending[key] = pending
+            pending.add_done_callback(lambda _: self._pending.pop(key, None))
+        # shield: a client disconnecting must not cancel the call other requests are waiting on
+        return await asyncio.shield(pending)
+
+    def invalidate_token(self, token: str) -> bool:
+        """Forget a cached validation (logout), the next request with this token goes to the login service"""
+        return self.token_cache.invalidate(token)
+
+    def decode_token(self, token: str) -> Optional[dict]:
+        """Check the JWT signature and exp locally, returns the claims or None"""
+        try:
+            return jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+        except JWTError as e:
+            logger.warning(f"Token rejected by local verification: {str(e)}")
+            return None
+
+    async def _validate_with_login_service(self, token: str, expires_in: Optional[float] = None) -> dict:
         """Validate JWT token by calling login service session validation"""
+        if self.http_client is None:
+            await self.start()
+        self.remote_validations += 1
         try:
             # Call session validation endpoint with token as query parameter
-            response = requests.get(
+            response = await self.http_client.get(
                 self.validate_url,
-                params={"token": token},
-                timeout=settings.health_check_login_service_session_validate_url_expire_seconds
+                params={"token": token}
             )
             
             if response.status_code == 200:
                 data = response.json()
                 if data.get("statusCode") == 200:
-                    return {
+                    user_data = {
                         'username': data.get('username'),
                         'last_seen': data.get('last_seen'),
                         'validated': True
                     }
+                    self.token_cache.set(token, user_data, ttl_seconds=expires_in)
+                    return user_data
             
             logger.warning(f"Session validation failed: {response.status_code}, response:{response.text}")
             return None
                 
-        except requests.exceptions.RequestException as e:
+        except httpx.RequestError as e:
             logger.error(f"Login service unavailable: {str(e)}")
             return None
         except Exception as e:
             logger.error(f"Token validation error: {str(e)}")
             return None
     
+    def stats(self) -> dict:
+        return {
+            "local_verification": self.local_verification,
+            "remote_validation": self.remote_validation,
+            "local_rejections": self.local_rejections,
+            "remote_validations": self.remote_validations,
+            "token_cache": self.token_cache.stats(),
+        }
+
     async def __call__(self, request: Request, call_next):
         
         # Skip auth for OPTIONS requests (CORS preflight)
@@ -22,9 +22,12 @@ API_PATH_PREFIX = "/pystore"
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting up HealthCheck Store Service Dashboard API...")
+    # Pooled HTTP client for login service session validation
+    await auth_middleware.start()
     yield
     # Shutdown
     logger.info("Shutting down HealthCheck Store Service Dashboard API")
+    await auth_middleware.close()
 
 app = FastAPI(
     title="Store Service HealthCheck Dashboard",
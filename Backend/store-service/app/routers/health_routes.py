@@ -1,5 +1,5 @@
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException
 from app.configurations.database import db_manager, get_db
 from app.services.data_service import data_service
 from app.services.export_service import export_service
@@ -19,4 +19,30 @@ async def root():
     return {
         "Status": "healthy",
         "message": "Python healthcheck store-service is running successfully"
-    }
\ No newline at end of file
+    }
+
+# This endpoint drops a token from the validated token cache, the login service calls it on logout
+@router.post("/session/invalidate")
+async def invalidate_session(authorization: str = Header("")):
+    """
+    Invalidate the cached validation of the bearer token (the token being logged out). Not JWT protected:
+    the token may already be logged out, and removing a cache entry never grants access.
+    """
+    token = authorization.split(" ")[-1]
+    if not token:
+        raise HTTPException(status_code=400, detail="Missing bearer token")
+    removed = auth_middleware.invalidate_token(token)
+    return {
+        "statusCode": 200,
+        "message": "Session invalidated" if removed else "Session was not cached"
+    }
+
+# This endpoint exposes the token verification and validated token cache statistics
+@router.get("/auth-stats")
+async def get_auth_stats():
+    """Token verification and validated token cache statistics"""
+    return {
+        "statusCode": 200,
+        "message": "Auth statistics fetched successfully",
+        "Data": auth_middleware.stats()
+    }